@@ -1,53 +1,439 @@
+import asyncio
+import time
 import httpx
-from typing import Optional, Dict, Any
+from collections import defaultdict
+from decimal import Decimal
+from typing import Optional, Dict, Any, AsyncIterator, Iterable
 from config import settings
+from utils.cache import CachePolicy, TTLCache, cached
+from utils.converters import bnb_to_wei
+from utils.singleflight import SingleFlight, coalesced
+from utils.resilience import CircuitBreaker, backoff_delay
+from utils.metrics import LatencyRecorder
+from utils.hedging import HedgeBudget, hedged
+from utils import deadline
+from utils.deadline import DeadlineExceeded
+from utils.priority import PriorityDispatcher, background, current_class, INTERACTIVE
+from utils.admission import AdmissionController
+from utils.balancing import ReplicaBalancer, Replica
 import logging
 
 logger = logging.getLogger(__name__)
 
+# gateway and server errors worth retrying; everything else is a real answer
+RETRYABLE_STATUSES = {500, 502, 503, 504}
+
+ENDPOINT_GROUPS = ("user", "token", "session", "price")
+
+# httpcore trace events that mean the request got a pool connection
+CONNECTION_ACQUIRED_EVENTS = ("connect_tcp.started", "send_request_headers.started")
+
+
+def _http2_available() -> bool:
+    try:
+        import h2  # noqa: F401
+    except ImportError:
+        return False
+    return True
+
+
+def _token_key(token_ca: str) -> str:
+    # contract addresses are case-insensitive, share entries across users
+    return token_ca.strip().lower()
+
 
 class BackendAPI:
     """Client for interacting with Rust backend API"""
     
+    cache_policies = {
+        # wallet address never changes for a user
+        "wallet": CachePolicy(max_entries=settings.wallet_cache_max_entries),
+        "balance": CachePolicy(
+            ttl=settings.balance_cache_ttl_seconds,
+            max_entries=settings.balance_cache_max_entries
+        ),
+        "token_supported": CachePolicy(
+            ttl=settings.token_cache_ttl_seconds,
+            max_entries=settings.token_cache_max_entries,
+            negative_ttl=settings.token_negative_cache_ttl_seconds,
+            is_negative=lambda data: not data.get("is_supported", False),
+            key=_token_key
+        ),
+        "token_pools": CachePolicy(
+            ttl=settings.token_cache_ttl_seconds,
+            max_entries=settings.token_cache_max_entries,
+            key=_token_key
+        ),
+        # depends only on pump amount, shared by every user
+        "max_swap": CachePolicy(
+            ttl=settings.max_swap_cache_ttl_seconds,
+            max_entries=settings.max_swap_cache_max_entries,
+            key=lambda pump_amount_wei: int(pump_amount_wei)
+        ),
+    }
+    
     def __init__(self):
-        self.base_url = settings.api_base_url
-        # increase timeout and add retries
+        self.balancer = ReplicaBalancer(
+            settings.api_base_urls or [settings.api_base_url],
+            settings.backend_balancing_strategy,
+            settings.backend_ejection_failures,
+            settings.backend_ejection_seconds
+        )
+        http2 = settings.backend_http2
+        if http2 and not _http2_available():
+            logger.warning("backend_http2 is on but the h2 package is missing, using HTTP/1.1")
+            http2 = False
         self.client = httpx.AsyncClient(
-            timeout=60.0,
-            limits=httpx.Limits(max_keepalive_connections=5, max_connections=10)
+            timeout=self._timeout_for(None),
+            limits=httpx.Limits(
+                max_connections=settings.backend_max_connections,
+                max_keepalive_connections=settings.backend_max_keepalive_connections,
+                keepalive_expiry=settings.backend_keepalive_expiry
+            ),
+            http2=http2
+        )
+        # interactive handler traffic goes ahead of poller and refresh jobs
+        self._dispatcher = PriorityDispatcher(
+            settings.backend_max_connections,
+            settings.backend_background_max_concurrency,
+            settings.backend_background_min_concurrency
+        )
+        # in-flight requests and latency decide when handlers shed low-value work
+        self.admission = AdmissionController(
+            settings.admission_latency_target_seconds,
+            settings.admission_min_limit,
+            settings.admission_max_limit,
+            settings.admission_backoff_ratio
+        )
+        self._pool_wait = LatencyRecorder()
+        self._latency: defaultdict[str, LatencyRecorder] = defaultdict(LatencyRecorder)
+        self._hedge_budget = HedgeBudget(
+            settings.backend_hedge_budget_ratio,
+            settings.backend_hedge_budget_burst
         )
+        # the bulk status route is skipped until then after a 404/405, and probed again after
+        self._bulk_status_retry_at = 0.0
+        self._caches = {
+            endpoint: TTLCache(policy.ttl, policy.max_entries)
+            for endpoint, policy in self.cache_policies.items()
+        }
+        self._singleflight = SingleFlight()
+        self._breakers = {
+            group: CircuitBreaker(
+                group,
+                settings.breaker_failure_threshold,
+                settings.breaker_recovery_seconds
+            )
+            for group in ENDPOINT_GROUPS
+        }
+        # poller and refresh jobs count their failures apart, a sick backend seen by
+        # the poller alone does not make handlers fail fast
+        self._background_breakers = {
+            group: CircuitBreaker(
+                f"{group}:background",
+                settings.breaker_failure_threshold,
+                settings.breaker_recovery_seconds
+            )
+            for group in ENDPOINT_GROUPS
+        }
     
     async def close(self):
         await self.client.aclose()
     
+    @staticmethod
+    def _timeout_for(group: Optional[str], budget: Optional[float] = None) -> httpx.Timeout:
+        """Timeouts for an endpoint group, read timeout from backend_read_timeouts, capped by budget"""
+        read_timeouts = settings.backend_read_timeouts
+        read = read_timeouts.get(group, max(read_timeouts.values(), default=60.0))
+        timeouts = [settings.backend_connect_timeout, read, settings.backend_write_timeout, settings.backend_pool_timeout]
+        if budget is not None:
+            timeouts = [min(timeout, budget) for timeout in timeouts]
+        connect, read, write, pool = timeouts
+        return httpx.Timeout(connect=connect, read=read, write=write, pool=pool)
+    
+    def pool_stats(self) -> Dict[str, float]:
+        """How long requests waited for a pool connection, in seconds"""
+        return self._pool_wait.stats()
+    
+    def dispatch_stats(self) -> Dict[str, Dict[str, float]]:
+        """Slots in use, queued requests and queue wait per traffic class"""
+        return self._dispatcher.stats()
+    
+    def replica_stats(self) -> Dict[str, Dict[str, float]]:
+        """Outstanding requests, EWMA latency and ejections per backend replica"""
+        return self.balancer.stats()
+    
+    async def check_replicas(self) -> None:
+        """Active health check of every replica through backend_health_path"""
+        async def probe(base_url: str) -> bool:
+            response = await self.client.get(
+                f"{base_url}{settings.backend_health_path}",
+                timeout=settings.backend_connect_timeout
+            )
+            return response.is_success
+        
+        await self.balancer.check(probe)
+    
+    def latency_stats(self) -> Dict[str, Dict[str, float]]:
+        """Observed latency per named endpoint, in seconds"""
+        return {endpoint: recorder.stats() for endpoint, recorder in self._latency.items()}
+    
+    def hedging_stats(self) -> Dict[str, int]:
+        """Hedges sent, won by the backup copy, and denied by the budget"""
+        return self._hedge_budget.stats()
+    
+    def _hedge_delay(self, endpoint: Optional[str]) -> Optional[float]:
+        """How long to wait before hedging a request, None if it is not hedged"""
+        if not settings.backend_hedging_enabled or endpoint not in settings.backend_hedge_endpoints:
+            return None
+        recorder = self._latency[endpoint]
+        if len(recorder) < settings.backend_hedge_min_samples:
+            return settings.backend_hedge_default_delay
+        return max(recorder.percentile(settings.backend_hedge_percentile), settings.backend_hedge_min_delay)
+    
+    def _breaker(self, group: str) -> CircuitBreaker:
+        """Breaker of the endpoint group for the current traffic class"""
+        breakers = self._breakers if current_class() == INTERACTIVE else self._background_breakers
+        return breakers[group]
+    
+    def breaker_states(self) -> Dict[str, str]:
+        """Circuit breaker state per endpoint group, for handler traffic"""
+        return {group: breaker.state for group, breaker in self._breakers.items()}
+    
+    def background_breaker_states(self) -> Dict[str, str]:
+        """Circuit breaker state per endpoint group, for poller and refresh jobs"""
+        return {group: breaker.state for group, breaker in self._background_breakers.items()}
+    
+    def is_degraded(self, *groups: str) -> bool:
+        """Check if any of the endpoint groups (all by default) is failing fast for handlers"""
+        return any(
+            self._breakers[group].state == CircuitBreaker.OPEN
+            for group in (groups or ENDPOINT_GROUPS)
+        )
+    
+    async def _request(
+        self,
+        group: str,
+        method: str,
+        path: str,
+        idempotent: bool = False,
+        endpoint: Optional[str] = None,
+        sticky_key: Optional[int] = None,
+        **kwargs
+    ) -> httpx.Response:
+        """
+        Send request through the endpoint group's circuit breaker
+        
+        Each attempt goes to a replica picked by the balancer, the same one per
+        sticky_key for groups in backend_sticky_groups. Idempotent requests are
+        retried with jittered exponential backoff on transport errors and 5xx
+        answers, on another replica when there is one. Named endpoints have
+        their latency recorded and may be hedged. The breaker sees one outcome
+        per call, after its retries. Raises CircuitOpenError while the group's
+        breaker for the current traffic class is open, httpx errors otherwise.
+        """
+        breaker = self._breaker(group)
+        attempts = max(1, settings.backend_retry_attempts) if idempotent else 1
+        explicit_timeout = kwargs.pop("timeout", httpx.USE_CLIENT_DEFAULT)
+        if group not in settings.backend_sticky_groups:
+            sticky_key = None
+        tried: set[Replica] = set()
+        
+        breaker.before_call()
+        try:
+            for attempt in range(attempts):
+                # the handler's remaining budget bounds every attempt
+                budget = deadline.remaining()
+                if budget is not None and budget <= 0:
+                    raise DeadlineExceeded(f"No time left for {method} {path}")
+                if explicit_timeout is httpx.USE_CLIENT_DEFAULT:
+                    timeout = self._timeout_for(group, budget)
+                elif budget is not None:
+                    timeout = min(explicit_timeout, budget)
+                else:
+                    timeout = explicit_timeout
+                
+                try:
+                    response = await self._send(
+                        endpoint, method, path, budget, sticky_key, tried, timeout=timeout, **kwargs
+                    )
+                except httpx.TransportError as e:
+                    error = e
+                except DeadlineExceeded:
+                    # the backend did not answer within the update's budget
+                    breaker.record_failure()
+                    raise
+                except asyncio.CancelledError as e:
+                    # same for a shared read given up by every caller waiting on it
+                    if deadline.cancelled_by_deadline(e):
+                        breaker.record_failure()
+                    raise
+                else:
+                    if response.status_code not in RETRYABLE_STATUSES:
+                        breaker.record_success()
+                        response.raise_for_status()
+                        return response
+                    error = httpx.HTTPStatusError(
+                        f"Server error '{response.status_code}' for url '{response.request.url}'",
+                        request=response.request,
+                        response=response
+                    )
+                
+                if attempt + 1 < attempts:
+                    delay = backoff_delay(attempt, settings.backend_retry_base_delay, settings.backend_retry_max_delay)
+                    budget = deadline.remaining()
+                    if budget is not None and budget <= delay:
+                        break
+                    logger.warning(f"{method} {path} failed ({error!r}), retrying in {delay:.2f}s")
+                    await asyncio.sleep(delay)
+        except BaseException:
+            breaker.release()
+            raise
+        
+        # retries exhausted: one failure for the whole call
+        breaker.record_failure()
+        raise error
+    
+    async def _send(
+        self,
+        endpoint: Optional[str],
+        method: str,
+        path: str,
+        budget: Optional[float],
+        sticky_key: Optional[int],
+        tried: set[Replica],
+        **kwargs
+    ) -> httpx.Response:
+        """
+        Send one attempt within budget, hedged with an identical backup request if the endpoint allows it
+        and the call is not pinned to a sticky replica
+        
+        Every copy goes to a replica not in tried if possible and is added to it.
+        """
+        async def send():
+            replica = self.balancer.pick(sticky_key, exclude=tried)
+            tried.add(replica)
+            async with self._dispatcher.slot():
+                # admission tracks what handlers are waiting on: background traffic and
+                # the wait for a dispatcher slot are left out of its in-flight count and latency
+                foreground = current_class() == INTERACTIVE
+                if foreground:
+                    self.admission.on_start()
+                self.balancer.on_start(replica)
+                started = time.monotonic()
+                ok = False
+                try:
+                    response = await self.client.request(
+                        method,
+                        f"{replica.base_url}{path}",
+                        extensions={"trace": self._pool_wait_tracer()},
+                        **kwargs
+                    )
+                    ok = response.status_code not in RETRYABLE_STATUSES
+                    return response
+                except asyncio.CancelledError:
+                    ok = None
+                    raise
+                finally:
+                    latency = time.monotonic() - started
+                    self.balancer.on_finish(replica, latency, ok)
+                    if foreground:
+                        self.admission.on_finish(latency, ok)
+        
+        started = time.monotonic()
+        # a backup copy would go to another replica and lose read-your-writes, so sticky calls aren't hedged
+        delay = self._hedge_delay(endpoint) if sticky_key is None else None
+        call = send() if delay is None else hedged(
+            send, delay, self._hedge_budget, is_failure=lambda response: response.status_code in RETRYABLE_STATUSES
+        )
+        if budget is None:
+            response = await call
+        else:
+            try:
+                response = await asyncio.wait_for(call, budget)
+            except asyncio.TimeoutError:
+                raise DeadlineExceeded(f"{method} {path} did not finish within the update's budget")
+        
+        if endpoint:
+            self._latency[endpoint].record(time.monotonic() - started)
+        return response
+    
+    def _pool_wait_tracer(self):
+        """httpcore trace callback recording how long the request waited for a connection"""
+        started = time.monotonic()
+        acquired = False
+        
+        async def trace(event_name: str, info: dict) -> None:
+            nonlocal acquired
+            if not acquired and event_name.endswith(CONNECTION_ACQUIRED_EVENTS):
+                acquired = True
+                self._pool_wait.record(time.monotonic() - started)
+        return trace
+    
+    def invalidate(self, endpoint: str, *key) -> None:
+        """Drop one cached response, key is the cached method's arguments"""
+        policy = self.cache_policies[endpoint]
+        self._caches[endpoint].invalidate(policy.key(*key) if policy.key else key)
+    
+    def cache_stats(self) -> Dict[str, Dict[str, int]]:
+        """Hit/miss counters and size per cached endpoint"""
+        return {endpoint: cache.stats() for endpoint, cache in self._caches.items()}
+    
+    def coalescing_stats(self) -> Dict[str, int]:
+        """How many read calls shared an identical in-flight request"""
+        return self._singleflight.stats()
+    
     # user endpoints
+    @cached("wallet")
+    @coalesced
     async def get_or_create_wallet(self, telegram_id: int) -> Dict[str, Any]:
         """Get or create user wallet"""
-        url = f"{self.base_url}/user/{telegram_id}/wallet"
-        logger.info(f"GET {url}")
-        response = await self.client.get(url)
-        response.raise_for_status()
+        path = f"/user/{telegram_id}/wallet"
+        logger.info(f"GET {path}")
+        response = await self._request(
+            "user", "GET", path, idempotent=True, endpoint="wallet", sticky_key=telegram_id
+        )
         return response.json()
     
-    async def check_wallet_balance(self, telegram_id: int) -> Dict[str, Any]:
-        """Check wallet balance"""
-        url = f"{self.base_url}/user/{telegram_id}/wallet/balance"
-        logger.info(f"GET {url}")
-        response = await self.client.get(url)
-        response.raise_for_status()
+    @cached("balance")
+    @coalesced
+    async def check_wallet_balance(self, telegram_id: int, max_age: Optional[float] = None) -> Dict[str, Any]:
+        """
+        Check wallet balance
+        
+        Args:
+            telegram_id: User telegram ID
+            max_age: Oldest cached balance acceptable, in seconds. None accepts anything within
+                balance_cache_ttl_seconds, 0 always asks the backend.
+        """
+        path = f"/user/{telegram_id}/wallet/balance"
+        logger.info(f"GET {path}")
+        response = await self._request(
+            "user", "GET", path, idempotent=True, endpoint="balance", sticky_key=telegram_id
+        )
         return response.json()
     
+    def invalidate_balance(self, telegram_id: int) -> None:
+        """Drop cached balance so the next read goes to the backend"""
+        self.invalidate("balance", telegram_id)
+    
     # token endpoints
+    @cached("token_supported")
+    @coalesced
     async def check_token_supported(self, token_ca: str) -> Dict[str, Any]:
         """Check if token is supported"""
-        response = await self.client.get(f"{self.base_url}/token/{token_ca}/is-supported")
-        response.raise_for_status()
+        response = await self._request(
+            "token", "GET", f"/token/{token_ca}/is-supported", idempotent=True, endpoint="token_supported"
+        )
         return response.json()
     
+    @cached("token_pools")
+    @coalesced
     async def get_token_pools(self, token_ca: str) -> Dict[str, Any]:
         """Get liquidity pools for token"""
-        response = await self.client.get(f"{self.base_url}/token/{token_ca}/pools")
-        response.raise_for_status()
+        response = await self._request(
+            "token", "GET", f"/token/{token_ca}/pools", idempotent=True, endpoint="token_pools"
+        )
         return response.json()
     
     async def start_session(
@@ -66,31 +452,141 @@ class BackendAPI:
             "swap_amount_wei": swap_amount_wei,
             "delay_millis": delay_millis
         }
-        response = await self.client.post(f"{self.base_url}/bot/session/run", json=payload)
-        response.raise_for_status()
+        try:
+            response = await self._request(
+                "session", "POST", "/bot/session/run", sticky_key=telegram_id, json=payload
+            )
+        finally:
+            self.invalidate_balance(telegram_id)
         return response.json()
     
+    @coalesced
     async def get_session_status(self, telegram_id: int) -> Dict[str, Any]:
         """Get session status"""
         payload = {"user_telegram_id": telegram_id}
-        response = await self.client.post(
-            f"{self.base_url}/bot/session/status",
+        response = await self._request(
+            "session",
+            "POST",
+            "/bot/session/status",
+            idempotent=True,
+            endpoint="session_status",
+            sticky_key=telegram_id,
             json=payload
         )
-        response.raise_for_status()
         return response.json()
     
+    async def get_session_statuses(
+        self,
+        telegram_ids: Iterable[int],
+        timeout: Optional[float] = None
+    ) -> Dict[int, Dict[str, Any]]:
+        """Get session statuses for many users, keyed by telegram ID. Failed users are left out."""
+        statuses = {}
+        async for chunk_statuses in self.iter_session_statuses(telegram_ids, timeout):
+            statuses.update(chunk_statuses)
+        return statuses
+    
+    async def iter_session_statuses(
+        self,
+        telegram_ids: Iterable[int],
+        timeout: Optional[float] = None
+    ) -> AsyncIterator[Dict[int, Dict[str, Any]]]:
+        """Yield session statuses chunk by chunk, in the order the chunks are answered"""
+        ids = list(telegram_ids)
+        size = max(1, settings.status_batch_size)
+        chunks = [ids[i:i + size] for i in range(0, len(ids), size)]
+        semaphore = asyncio.Semaphore(settings.poll_concurrency)
+        
+        for next_chunk in asyncio.as_completed(
+            [self._fetch_status_chunk(chunk, semaphore, timeout) for chunk in chunks]
+        ):
+            yield await next_chunk
+    
+    async def _fetch_status_chunk(
+        self,
+        telegram_ids: list[int],
+        semaphore: asyncio.Semaphore,
+        timeout: Optional[float]
+    ) -> Dict[int, Dict[str, Any]]:
+        """Fetch one chunk through the bulk route, or through single requests if it is missing"""
+        if time.monotonic() >= self._bulk_status_retry_at:
+            try:
+                async with semaphore:
+                    return await self._post_session_statuses(telegram_ids, timeout)
+            except httpx.HTTPStatusError as e:
+                if e.response.status_code not in (404, 405):
+                    logger.error(f"Error getting bulk session status: {e}")
+                    return {}
+                # may be a deploy in progress rather than a backend without the route
+                retry_after = settings.status_bulk_retry_seconds
+                logger.warning(
+                    f"Backend has no bulk session status route, using single requests for {retry_after:.0f}s"
+                )
+                self._bulk_status_retry_at = time.monotonic() + retry_after
+            except Exception as e:
+                logger.error(f"Error getting bulk session status: {e}")
+                return {}
+        
+        async def fetch_one(telegram_id: int) -> Dict[str, Any]:
+            async with semaphore:
+                return await asyncio.wait_for(self.get_session_status(telegram_id), timeout)
+        
+        results = await asyncio.gather(
+            *(fetch_one(telegram_id) for telegram_id in telegram_ids),
+            return_exceptions=True
+        )
+        
+        statuses = {}
+        for telegram_id, result in zip(telegram_ids, results):
+            if isinstance(result, BaseException):
+                logger.error(f"Error getting session status for user {telegram_id}: {result!r}")
+                continue
+            statuses[telegram_id] = result
+        return statuses
+    
+    async def _post_session_statuses(
+        self,
+        telegram_ids: list[int],
+        timeout: Optional[float]
+    ) -> Dict[int, Dict[str, Any]]:
+        """
+        Bulk status request. Expected response:
+        {"statuses": [{"user_telegram_id": 1, "status": ...}, ...]}
+        """
+        payload = {"user_telegram_ids": telegram_ids}
+        response = await self._request(
+            "session",
+            "POST",
+            "/bot/session/statuses",
+            idempotent=True,
+            endpoint="session_statuses",
+            json=payload,
+            timeout=timeout if timeout is not None else httpx.USE_CLIENT_DEFAULT
+        )
+        return {
+            int(item["user_telegram_id"]): {"status": item.get("status", "Not Started")}
+            for item in response.json().get("statuses", [])
+        }
+    
     async def pause_session(self, telegram_id: int) -> None:
         """Pause running session"""
         payload = {"user_telegram_id": telegram_id}
-        response = await self.client.post(f"{self.base_url}/bot/session/pause", json=payload)
-        response.raise_for_status()
+        try:
+            await self._request(
+                "session", "POST", "/bot/session/pause", sticky_key=telegram_id, json=payload
+            )
+        finally:
+            self.invalidate_balance(telegram_id)
     
     async def resume_session(self, telegram_id: int) -> None:
         """Resume paused session"""
         payload = {"user_telegram_id": telegram_id}
-        response = await self.client.post(f"{self.base_url}/bot/session/resume", json=payload)
-        response.raise_for_status()
+        try:
+            await self._request(
+                "session", "POST", "/bot/session/resume", sticky_key=telegram_id, json=payload
+            )
+        finally:
+            self.invalidate_balance(telegram_id)
     
     async def set_session_delay(self, telegram_id: int, delay_millis: int) -> None:
         """Update delay between swaps in running session"""
@@ -98,8 +594,7 @@ class BackendAPI:
             "user_telegram_id": telegram_id,
             "delay_millis": delay_millis
         }
-        response = await self.client.put(f"{self.base_url}/bot/session/delay", json=payload)
-        response.raise_for_status()
+        await self._request("session", "PUT", "/bot/session/delay", sticky_key=telegram_id, json=payload)
     
     async def set_session_swap_amount(self, telegram_id: int, swap_amount_wei: str) -> None:
         """Update swap amount in running session"""
@@ -107,21 +602,44 @@ class BackendAPI:
             "user_telegram_id": telegram_id,
             "swap_amount_wei": swap_amount_wei
         }
-        response = await self.client.put(f"{self.base_url}/bot/session/swap-amount", json=payload)
-        response.raise_for_status()
+        await self._request(
+            "session", "PUT", "/bot/session/swap-amount", sticky_key=telegram_id, json=payload
+        )
     
+    @cached("max_swap")
+    @coalesced
     async def estimate_max_swap_amount(self, pump_amount_wei: str) -> Dict[str, Any]:
         """Estimate maximum swap amount based on pump amount"""
         payload = {"pump_amount_wei": pump_amount_wei}
-        response = await self.client.post(f"{self.base_url}/bot/session/swap-amount/max", json=payload)
-        response.raise_for_status()
+        response = await self._request(
+            "session",
+            "POST",
+            "/bot/session/swap-amount/max",
+            idempotent=True,
+            endpoint="max_swap",
+            json=payload
+        )
         return response.json()
 
+    @background
+    async def prewarm_max_swap_amounts(self, pump_amounts_bnb: Iterable[Decimal]) -> None:
+        """Fill the max swap amount cache for common pump amounts"""
+        pump_amounts_wei = [bnb_to_wei(Decimal(str(amount))) for amount in pump_amounts_bnb]
+        results = await asyncio.gather(
+            *(self.estimate_max_swap_amount(amount_wei) for amount_wei in pump_amounts_wei),
+            return_exceptions=True
+        )
+        for amount_wei, result in zip(pump_amounts_wei, results):
+            if isinstance(result, Exception):
+                logger.warning(f"Unable to pre-warm max swap amount for {amount_wei} wei: {result}")
+    
+    @coalesced
     async def bnb_to_usd(self, amount_wei: str) -> Dict[str, Any]:
         """Convert BNB to USD"""
         payload = {"amount_wei": amount_wei}
-        response = await self.client.post(f"{self.base_url}/price/bnb-to-usd", json=payload)
-        response.raise_for_status()
+        response = await self._request(
+            "price", "POST", "/price/bnb-to-usd", idempotent=True, endpoint="price", json=payload
+        )
         return response.json()
 
 api = BackendAPI()
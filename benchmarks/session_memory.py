@@ -0,0 +1,82 @@
+"""
+Per-session memory and render-path cost, string-amount dataclass vs compact UserSession
+
+Run from the repository root:
+    TELEGRAM_BOT_TOKEN=x python -m benchmarks.session_memory
+"""
+
+import time
+import tracemalloc
+from dataclasses import dataclass
+
+from models.session import UserSession
+
+SESSIONS = 100_000
+
+
+@dataclass
+class LegacyUserSession:
+    """UserSession as it was: __dict__ per instance, amounts as decimal strings"""
+    token_ca: str = ""
+    pump_amount_wei: str = ""
+    swap_amount_wei: str = ""
+    delay_millis: int = 1000
+    backend_started: bool = False
+    is_paused: bool = False
+
+
+def legacy_render(session: LegacyUserSession) -> tuple:
+    pump_configured = session.pump_amount_wei and float(session.pump_amount_wei) > 0
+    swap_configured = session.swap_amount_wei and float(session.swap_amount_wei) > 0
+    pump = f"{float(session.pump_amount_wei) / 1e18:.4f}" if pump_configured else "0.0"
+    swap = f"{float(session.swap_amount_wei) / 1e18:.4f}" if swap_configured else "0.0"
+    return pump, swap, pump_configured, swap_configured
+
+
+def render(session: UserSession) -> tuple:
+    pump = f"{session.pump_amount_wei / 1e18:.4f}" if session.pump_configured else "0.0"
+    swap = f"{session.swap_amount_wei / 1e18:.4f}" if session.swap_configured else "0.0"
+    return pump, swap, session.pump_configured, session.swap_configured
+
+
+def build(make) -> tuple[list, float]:
+    """Sessions built by make(i) and bytes allocated per session"""
+    tracemalloc.start()
+    before = tracemalloc.get_traced_memory()[0]
+    sessions = [make(i) for i in range(SESSIONS)]
+    allocated = tracemalloc.get_traced_memory()[0] - before
+    tracemalloc.stop()
+    # the list itself is the same for both
+    return sessions, (allocated - 8 * SESSIONS) / SESSIONS
+
+
+def per_call(fn, sessions: list) -> float:
+    """Mean microseconds per call over every session"""
+    started = time.perf_counter()
+    for session in sessions:
+        fn(session)
+    return (time.perf_counter() - started) / len(sessions) * 1e6
+
+
+def main() -> None:
+    token = "0x718447E29B90D00461966D01E533Fa1b69574444"
+    legacy, legacy_bytes = build(lambda i: LegacyUserSession(
+        token_ca=token,
+        pump_amount_wei=str(10**18 + i),
+        swap_amount_wei=str(10**16 + i),
+        backend_started=True
+    ))
+    compact, compact_bytes = build(lambda i: UserSession(
+        token_ca=token,
+        pump_amount_wei=10**18 + i,
+        swap_amount_wei=10**16 + i,
+        backend_started=True
+    ))
+    
+    print(f"{SESSIONS} sessions")
+    print(f"legacy   {legacy_bytes:.0f} bytes/session  render {per_call(legacy_render, legacy):.2f}us")
+    print(f"compact  {compact_bytes:.0f} bytes/session  render {per_call(render, compact):.2f}us")
+
+
+if __name__ == "__main__":
+    main()
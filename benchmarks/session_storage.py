@@ -0,0 +1,59 @@
+"""
+Session storage get/save latency, in-memory vs SQLite
+
+Run from the repository root:
+    TELEGRAM_BOT_TOKEN=x python -m benchmarks.session_storage
+"""
+
+import asyncio
+import tempfile
+import time
+from pathlib import Path
+
+from models.session import SessionStorage
+from models.sqlite_storage import SqliteSessionStorage
+
+SESSIONS = 10_000
+ROUNDS = 100_000
+
+
+def measure(fn, rounds: int) -> float:
+    """Mean microseconds per call"""
+    started = time.perf_counter()
+    for i in range(rounds):
+        fn(i % SESSIONS)
+    return (time.perf_counter() - started) / rounds * 1e6
+
+
+async def bench(name: str, storage: SessionStorage) -> None:
+    for telegram_id in range(SESSIONS):
+        storage.create(telegram_id)
+    await storage.flush()
+    
+    def update(telegram_id: int) -> None:
+        session = storage.get(telegram_id)
+        session.delay_millis += 1
+        storage.save(telegram_id)
+    
+    get_us = measure(storage.get, ROUNDS)
+    update_us = measure(update, ROUNDS)
+    
+    started = time.perf_counter()
+    await storage.flush()
+    flush_ms = (time.perf_counter() - started) * 1000
+    
+    print(
+        f"{name:8} get {get_us:.2f}us  get+save {update_us:.2f}us  "
+        f"flush of {SESSIONS} dirty sessions {flush_ms:.1f}ms"
+    )
+    storage.close()
+
+
+async def main() -> None:
+    await bench("memory", SessionStorage())
+    with tempfile.TemporaryDirectory() as directory:
+        await bench("sqlite", SqliteSessionStorage(str(Path(directory) / "sessions.db")))
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -4,8 +4,131 @@ from pydantic_settings import BaseSettings, SettingsConfigDict
 class Settings(BaseSettings):
     telegram_bot_token: str
     api_base_url: str = "http://localhost:3000"
+    # several backend replicas balanced client-side, api_base_url is used when empty
+    api_base_urls: list[str] = []
+    backend_balancing_strategy: str = "least_outstanding"  # or "ewma"
+    # groups whose calls stick to one replica per user, e.g. ["session"] for read-your-writes
+    backend_sticky_groups: list[str] = []
+    backend_ejection_failures: int = 3
+    backend_ejection_seconds: float = 30.0
+    backend_health_path: str = "/health"
+    backend_health_interval_seconds: float = 10.0
     min_deposit_bnb: float = 0.1
     
+    # total time budget for backend calls made while handling one update
+    update_deadline_seconds: float = 20.0
+    
+    # outbound Bot API limits: messages/s overall, per private chat (with burst) and per group
+    telegram_global_rate: float = 30.0
+    telegram_chat_rate: float = 1.0
+    telegram_chat_burst: float = 3.0
+    telegram_group_rate: float = 20 / 60
+    telegram_max_retries: int = 3
+    
+    # "memory" or "sqlite"; sqlite keeps sessions across restarts
+    session_backend: str = "memory"
+    session_db_path: str = "sessions.db"
+    session_flush_interval_seconds: float = 1.0
+    
+    # completion notifications are written here first, failed sends retried with backoff
+    outbox_db_path: str = "outbox.db"
+    outbox_workers: int = 4
+    outbox_max_attempts: int = 10
+    outbox_retry_base_delay: float = 5.0
+    outbox_retry_max_delay: float = 600.0
+    outbox_interval_seconds: float = 5.0
+    outbox_retention_seconds: float = 7 * 86400.0
+    
+    # per-user state of users idle this long is dropped from memory (conversations end), running sessions excepted
+    idle_ttl_seconds: float = 86400.0
+    idle_eviction_interval_seconds: float = 3600.0
+    
+    # backend connection pool and timeouts (read timeouts per endpoint group)
+    backend_max_connections: int = 100
+    backend_max_keepalive_connections: int = 20
+    backend_keepalive_expiry: float = 30.0
+    backend_http2: bool = False
+    backend_connect_timeout: float = 5.0
+    backend_write_timeout: float = 10.0
+    backend_pool_timeout: float = 10.0
+    backend_read_timeouts: dict[str, float] = {"user": 15.0, "token": 30.0, "session": 15.0, "price": 10.0}
+    
+    # share of backend_max_connections for poller and refresh jobs; handlers get the rest first
+    backend_background_max_concurrency: int = 60
+    backend_background_min_concurrency: int = 10
+    
+    # AIMD limit on in-flight backend requests, refreshes are shed above it
+    admission_latency_target_seconds: float = 2.0
+    admission_min_limit: int = 10
+    admission_max_limit: int = 100
+    admission_backoff_ratio: float = 0.9
+    
+    # hedged reads: resend a slow read after the endpoint's observed latency percentile
+    backend_hedging_enabled: bool = False
+    backend_hedge_endpoints: list[str] = ["balance", "session_status"]
+    backend_hedge_percentile: float = 95.0
+    backend_hedge_min_samples: int = 50
+    backend_hedge_default_delay: float = 0.5
+    backend_hedge_min_delay: float = 0.02
+    backend_hedge_budget_ratio: float = 0.05
+    backend_hedge_budget_burst: float = 10.0
+    
+    # backend retries and circuit breakers
+    backend_retry_attempts: int = 3
+    backend_retry_base_delay: float = 0.2
+    backend_retry_max_delay: float = 2.0
+    breaker_failure_threshold: int = 5
+    breaker_recovery_seconds: float = 30.0
+    
+    # backend response caches
+    balance_cache_ttl_seconds: float = 15.0
+    balance_cache_max_entries: int = 100_000
+    wallet_cache_max_entries: int = 100_000
+    token_cache_ttl_seconds: float = 300.0
+    token_negative_cache_ttl_seconds: float = 60.0
+    token_cache_max_entries: int = 5_000
+    max_swap_cache_ttl_seconds: float = 600.0
+    max_swap_cache_max_entries: int = 1_000
+    max_swap_prewarm_bnb: list[float] = [0.1, 0.25, 0.5, 1.0]
+    backend_stats_interval_seconds: float = 300.0
+    
+    # BNB/USD price used for local conversions
+    price_refresh_interval_seconds: float = 30.0
+    price_max_age_seconds: float = 120.0
+    
+    # session completion poller
+    poll_tick_seconds: float = 1.0
+    poll_min_interval_seconds: float = 5.0
+    poll_max_interval_seconds: float = 60.0
+    poll_jitter: float = 0.2
+    poll_swap_overhead_millis: int = 3000
+    poll_max_per_tick: int = 500
+    poll_concurrency: int = 20
+    poll_session_timeout: float = 10.0
+    status_batch_size: int = 100
+    status_bulk_retry_seconds: float = 300.0  # bulk route probed again this long after a 404/405
+    
+    # pushed session events (polling becomes a slow reconciliation when enabled)
+    events_enabled: bool = False
+    events_host: str = "127.0.0.1"
+    events_port: int = 8081
+    events_secret: str = ""  # required when events_enabled
+    events_reconcile_interval_seconds: float = 120.0
+    
+    # how updates arrive: "polling" (getUpdates) or "webhook" (Telegram posts to webhook_url)
+    telegram_mode: str = "polling"
+    # update types subscribed to, only what the handlers use
+    telegram_allowed_updates: list[str] = ["message", "callback_query"]
+    webhook_url: str = ""  # public HTTPS URL forwarded to webhook_host:webhook_port + webhook_path
+    webhook_host: str = "0.0.0.0"
+    webhook_port: int = 8443
+    webhook_path: str = "/telegram/webhook"
+    webhook_secret: str = ""  # generated at startup when empty
+    webhook_queue_size: int = 1000
+    # how long shutdown waits for queued updates, the rest is dropped
+    webhook_drain_timeout_seconds: float = 10.0
+    webhook_max_connections: int = 40
+    
     model_config = SettingsConfigDict(
         env_file=".env",
         case_sensitive=False,
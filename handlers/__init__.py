@@ -1,6 +1,7 @@
 """Handlers module exports"""
 
 from .common import start, cancel, help_command, balance
+from .guards import track_activity, reject_if_degraded, shed_when_overloaded
 from .session import (
     receive_token_ca,
     receive_pump_amount,
@@ -23,6 +24,9 @@ __all__ = [
     'cancel',
     'help_command',
     'balance',
+    'track_activity',
+    'reject_if_degraded',
+    'shed_when_overloaded',
     'receive_token_ca',
     'receive_pump_amount',
     'receive_swap_amount',
@@ -1,6 +1,4 @@
 import logging
-import os
-from pathlib import Path
 from telegram import Update
 from telegram.ext import ContextTypes, ConversationHandler
 
@@ -9,30 +7,39 @@ from models import session_storage
 from states import ConversationState
 from keyboards.inline import get_refresh_keyboard
 from config import settings
+from services import media_cache, price_feed, WELCOME_IMAGE
+from utils import fetch_all, failed, with_deadline
 
 logger = logging.getLogger(__name__)
 
-WELCOME_IMAGE_PATH = Path(__file__).parent.parent / "assets" / "welcome.jpg"
-
 
+@with_deadline(settings.update_deadline_seconds)
 async def start(update: Update, context: ContextTypes.DEFAULT_TYPE):
     """/start command - bot initialization"""
     user = update.effective_user
     telegram_id = user.id
     
     try:
-        wallet_data = await api.get_or_create_wallet(telegram_id)
-        wallet_address = wallet_data["wallet_dto"]["evm_address"]
+        results = await fetch_all(
+            wallet=api.get_or_create_wallet(telegram_id),
+            balance=api.check_wallet_balance(telegram_id)
+        )
+        if failed(results["wallet"]):
+            raise results["wallet"]
+        wallet_address = results["wallet"]["wallet_dto"]["evm_address"]
         
-        balance_data = await api.check_wallet_balance(telegram_id)
-        balance_ui = balance_data["ui"]
-
-        try:
-            balance_formatted = f"{float(balance_ui):.3f}"
-            balance_float = float(balance_ui)
-        except:
-            balance_formatted = balance_ui
+        if failed(results["balance"]):
+            logger.error(f"Error checking balance in start command: {results['balance']}")
+            balance_formatted = "N/A"
             balance_float = 0.0
+        else:
+            balance_ui = results["balance"]["ui"]
+            try:
+                balance_formatted = f"{float(balance_ui):.3f}"
+                balance_float = float(balance_ui)
+            except:
+                balance_formatted = balance_ui
+                balance_float = 0.0
 
         min_deposit = settings.min_deposit_bnb
         if balance_float >= min_deposit - 0.003:
@@ -57,14 +64,14 @@ async def start(update: Update, context: ContextTypes.DEFAULT_TYPE):
         
         reply_markup = get_refresh_keyboard() if balance_float < min_deposit - 0.003 else None
         
-        if WELCOME_IMAGE_PATH.exists():
-            with open(WELCOME_IMAGE_PATH, 'rb') as photo:
-                await update.message.reply_photo(
-                    photo=photo,
-                    caption=welcome_text,
-                    parse_mode='Markdown',
-                    reply_markup=reply_markup
-                )
+        if media_cache.has(WELCOME_IMAGE):
+            await media_cache.reply_photo(
+                update.message,
+                WELCOME_IMAGE,
+                caption=welcome_text,
+                parse_mode='Markdown',
+                reply_markup=reply_markup
+            )
         else:
             await update.message.reply_text(
                 welcome_text,
@@ -121,7 +128,8 @@ async def help_command(update: Update, context: ContextTypes.DEFAULT_TYPE):
     await update.message.reply_text(help_text, parse_mode='Markdown')
 
 
-async def   balance(update: Update, context: ContextTypes.DEFAULT_TYPE):
+@with_deadline(settings.update_deadline_seconds)
+async def balance(update: Update, context: ContextTypes.DEFAULT_TYPE):
     """Check wallet balance"""
     telegram_id = update.effective_user.id
     
@@ -137,8 +145,7 @@ async def   balance(update: Update, context: ContextTypes.DEFAULT_TYPE):
             balance_formatted = balance_ui
         
         # сonvert to USD
-        usd_data = await api.bnb_to_usd(balance_wei)
-        balance_usd = usd_data["amount_usd"]
+        balance_usd = await price_feed.bnb_to_usd(balance_wei)
         
         await update.message.reply_text(
             f"💰 Your balance:\n\n"
@@ -0,0 +1,82 @@
+"""Handlers that run before the main ones"""
+
+import logging
+from telegram import Update
+from telegram.ext import ContextTypes, ApplicationHandlerStop
+
+from api_client import api
+from services import idle_evictor
+
+logger = logging.getLogger(__name__)
+
+# backend endpoint groups each button and command calls; an update is rejected only while one of
+# its own groups is failing fast. Anything not listed goes through: start/pause/resume and typed
+# config values report a failed call themselves, /help, /cancel, set_delay and cancel_start never
+# call the backend.
+CALLBACK_GROUPS = {
+    "refresh_balance": ("user",),
+    "refresh_session_status": ("session", "user"),
+    "set_pump_amount": ("session",),
+    "set_swap_amount": ("session",),
+}
+COMMAND_GROUPS = {
+    "/start": ("user",),
+    "/balance": ("user",),
+}
+
+DEGRADED_TEXT = "⚠️ Service is temporarily degraded. Please try again in a minute."
+
+# low-value refreshes dropped first when the backend is overloaded, the user just presses again;
+# /start (the only way in), config prompts, typed values and start/pause/resume always go through
+SHEDDABLE_CALLBACKS = ("refresh_balance", "refresh_session_status")
+SHEDDABLE_COMMANDS = ("/balance",)
+
+BUSY_TEXT = "⏳ Busy right now, please try again in a few seconds."
+
+
+async def track_activity(update: Update, context: ContextTypes.DEFAULT_TYPE):
+    """Record that the user is active, so their state is not evicted as idle"""
+    if update.effective_user:
+        idle_evictor.touch(update.effective_user.id)
+
+
+def _command(update: Update) -> str | None:
+    """Command of a message update without its @botname suffix, None for other updates"""
+    if not (update.message and update.message.text and update.message.text.startswith("/")):
+        return None
+    return update.message.text.split()[0].split("@")[0]
+
+
+async def reject_if_degraded(update: Update, context: ContextTypes.DEFAULT_TYPE):
+    """Answer right away while a backend group the update needs is failing fast, instead of letting its handler wait on it"""
+    if update.callback_query:
+        groups = CALLBACK_GROUPS.get(update.callback_query.data)
+    else:
+        groups = COMMAND_GROUPS.get(_command(update))
+    if not groups or not api.is_degraded(*groups):
+        return
+    
+    logger.warning(f"Backend degraded ({api.breaker_states()}), rejecting update {update.update_id}")
+    if update.callback_query:
+        await update.callback_query.answer(DEGRADED_TEXT, show_alert=True)
+    elif update.message:
+        await update.message.reply_text(DEGRADED_TEXT)
+    raise ApplicationHandlerStop
+
+
+async def shed_when_overloaded(update: Update, context: ContextTypes.DEFAULT_TYPE):
+    """Answer low-value refreshes right away while the backend is at its admission limit"""
+    query = update.callback_query
+    if query and query.data in SHEDDABLE_CALLBACKS:
+        if api.admission.try_admit():
+            return
+        await query.answer(BUSY_TEXT)
+    elif update.message and update.message.text and update.message.text.startswith(SHEDDABLE_COMMANDS):
+        if api.admission.try_admit():
+            return
+        await update.message.reply_text(BUSY_TEXT)
+    else:
+        return
+    
+    logger.info(f"Backend overloaded ({api.admission.stats()}), shed update {update.update_id}")
+    raise ApplicationHandlerStop
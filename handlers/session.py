@@ -1,7 +1,6 @@
 """Session creation handlers - token, amounts, confirmation"""
 
 import logging
-from pathlib import Path
 from decimal import Decimal
 from telegram import Update
 from telegram.ext import ContextTypes, ConversationHandler
@@ -10,12 +9,46 @@ from api_client import api
 from models import session_storage
 from states import ConversationState
 from keyboards import get_confirmation_keyboard, get_session_status_keyboard
-from utils import bnb_to_wei, wei_to_bnb
+from utils import bnb_to_wei, wei_to_bnb, fetch_all, failed, with_deadline
 from config import settings
+from services import media_cache, price_feed, schedule_poll, WELCOME_IMAGE
 
 logger = logging.getLogger(__name__)
 
-WELCOME_IMAGE_PATH = Path(__file__).parent.parent / "assets" / "welcome.jpg"
+
+async def _get_max_swap_amount_wei(pump_amount_wei: str) -> str:
+    """Maximum swap amount for pump amount, "0" if the backend can't estimate it"""
+    try:
+        max_swap_data = await api.estimate_max_swap_amount(pump_amount_wei)
+        return max_swap_data["swap_amount_wei"]
+    except Exception as e:
+        logger.error(f"Error estimating max swap amount: {e}")
+        return "0"
+
+
+def _describe_status(status_data) -> tuple:
+    """Status and its menu label from a fetch_all status result, "Not Started" if missing or failed"""
+    if status_data is None or failed(status_data):
+        return "Not Started", "⚪️ Not Started"
+    
+    status = status_data.get("status", "Not Started")
+    if status == "InProcess":
+        status_text = "🔄 In Progress"
+    elif isinstance(status, dict) and "Success" in status:
+        status_text = "✅ Completed"
+    elif isinstance(status, dict) and "Error" in status:
+        status_text = "❌ Error"
+    else:
+        status_text = "⚪️ Not Started"
+    return status, status_text
+
+
+def _format_balance(balance_data, digits: int = 4) -> str:
+    """Balance in BNB from a fetch_all balance result, "N/A" if it failed"""
+    try:
+        return f"{float(balance_data['ui']):.{digits}f}"
+    except:
+        return "N/A"
 
 
 async def _update_config_menu(context: ContextTypes.DEFAULT_TYPE, telegram_id: int, confirmation_text: str = None):
@@ -26,29 +59,13 @@ async def _update_config_menu(context: ContextTypes.DEFAULT_TYPE, telegram_id: i
     
     token_ca = session.token_ca
     
-    status = "Not Started"
-    status_text = "⚪️ Not Started"
-    
+    calls = {"balance": api.check_wallet_balance(telegram_id)}
     if session.backend_started:
-        try:
-            status_data = await api.get_session_status(telegram_id)
-            status = status_data.get("status", "Not Started")
-            if status == "InProcess":
-                status_text = "🔄 In Progress"
-            elif isinstance(status, dict) and "Success" in status:
-                status_text = "✅ Completed"
-            elif isinstance(status, dict) and "Error" in status:
-                status_text = "❌ Error"
-            else:
-                status_text = "⚪️ Not Started"
-        except:
-            pass
+        calls["status"] = api.get_session_status(telegram_id)
+    results = await fetch_all(**calls)
     
-    try:
-        balance_data = await api.check_wallet_balance(telegram_id)
-        balance_bnb = f"{float(balance_data['ui']):.4f}"
-    except:
-        balance_bnb = "N/A"
+    status, status_text = _describe_status(results.get("status"))
+    balance_bnb = _format_balance(results["balance"])
     
     pump_amount_bnb = "0.0"
     pump_indicator = "🔴"
@@ -57,13 +74,13 @@ async def _update_config_menu(context: ContextTypes.DEFAULT_TYPE, telegram_id: i
     delay_seconds = "1.0"
     delay_indicator = "🔴"
     
-    if session.pump_amount_wei and float(session.pump_amount_wei) > 0:
-        pump_amount_bnb = f"{float(session.pump_amount_wei) / 1e18:.4f}"
+    if session.pump_configured:
+        pump_amount_bnb = f"{session.pump_amount_wei / 1e18:.4f}"
         pump_indicator = "🟢"
-    if session.swap_amount_wei and float(session.swap_amount_wei) > 0:
-        swap_amount_bnb = f"{float(session.swap_amount_wei) / 1e18:.4f}"
+    if session.swap_configured:
+        swap_amount_bnb = f"{session.swap_amount_wei / 1e18:.4f}"
         swap_indicator = "🟢"
-    if hasattr(session, 'delay_millis') and session.delay_millis:
+    if session.delay_millis:
         delay_seconds = f"{session.delay_millis / 1000:.1f}"
         delay_indicator = "🟢"
     
@@ -85,19 +102,18 @@ async def _update_config_menu(context: ContextTypes.DEFAULT_TYPE, telegram_id: i
         f"👇 Configure amounts or start pumping:"
     )
     
-    message_id = context.user_data.get('config_message_id')
-    chat_id = context.user_data.get('config_chat_id')
+    record = session_storage.messages.get(telegram_id)
 
-    pump_configured = session.pump_amount_wei and float(session.pump_amount_wei) > 0
-    swap_configured = session.swap_amount_wei and float(session.swap_amount_wei) > 0
+    pump_configured = session.pump_configured
+    swap_configured = session.swap_configured
 
     display_status = "Paused" if session.is_paused else status
     
-    if message_id and chat_id:
+    if record and record.config_message_id:
         await context.bot.edit_message_text(
             text=config_text,
-            chat_id=chat_id,
-            message_id=message_id,
+            chat_id=record.chat_id,
+            message_id=record.config_message_id,
             parse_mode='Markdown',
             reply_markup=get_pump_config_keyboard(display_status, pump_configured, swap_configured),
             disable_web_page_preview=True
@@ -106,6 +122,7 @@ async def _update_config_menu(context: ContextTypes.DEFAULT_TYPE, telegram_id: i
     return config_text
 
 
+@with_deadline(settings.update_deadline_seconds)
 async def receive_token_ca(update: Update, context: ContextTypes.DEFAULT_TYPE):
     """Receiving token contract address"""
     telegram_id = update.effective_user.id
@@ -114,7 +131,21 @@ async def receive_token_ca(update: Update, context: ContextTypes.DEFAULT_TYPE):
     await update.message.reply_text("🔍 Checking token...")
     
     try:
-        support_data = await api.check_token_supported(token_ca)
+        session = session_storage.get(telegram_id)
+        
+        # token checks, status and balance don't depend on each other
+        calls = {
+            "support": api.check_token_supported(token_ca),
+            "pools": api.get_token_pools(token_ca),
+            "balance": api.check_wallet_balance(telegram_id),
+        }
+        if session and session.backend_started:
+            calls["status"] = api.get_session_status(telegram_id)
+        results = await fetch_all(**calls)
+        
+        if failed(results["support"]):
+            raise results["support"]
+        support_data = results["support"]
         
         if not support_data.get("is_supported", False):
             await update.message.reply_text(
@@ -126,41 +157,21 @@ async def receive_token_ca(update: Update, context: ContextTypes.DEFAULT_TYPE):
             )
             return ConversationState.WAITING_TOKEN_CA
         
-        pools_data = await api.get_token_pools(token_ca)
-        pools = pools_data.get("pools", {})
+        if failed(results["pools"]):
+            raise results["pools"]
+        pools = results["pools"].get("pools", {})
         if isinstance(pools, dict):
             pools_count = len(pools.get("pairs", []))
         else:
             # If pools is already a list
             pools_count = len(pools) if isinstance(pools, list) else 0
         
-        session = session_storage.get(telegram_id)
         if session:
             session.token_ca = token_ca
+            session_storage.save(telegram_id)
         
-        status = "Not Started"
-        status_text = "⚪️ Not Started"
-        
-        if session and session.backend_started:
-            try:
-                status_data = await api.get_session_status(telegram_id)
-                status = status_data.get("status", "Not Started")
-                if status == "InProcess":
-                    status_text = "🔄 In Progress"
-                elif isinstance(status, dict) and "Success" in status:
-                    status_text = "✅ Completed"
-                elif isinstance(status, dict) and "Error" in status:
-                    status_text = "❌ Error"
-                else:
-                    status_text = "⚪️ Not Started"
-            except:
-                pass
-        
-        try:
-            balance_data = await api.check_wallet_balance(telegram_id)
-            balance_bnb = f"{float(balance_data['ui']):.4f}"
-        except:
-            balance_bnb = "N/A"
+        status, status_text = _describe_status(results.get("status"))
+        balance_bnb = _format_balance(results["balance"])
         
         pump_amount_bnb = "0.0"
         pump_indicator = "🔴"
@@ -170,13 +181,13 @@ async def receive_token_ca(update: Update, context: ContextTypes.DEFAULT_TYPE):
         delay_indicator = "🔴"
         
         if session:
-            if session.pump_amount_wei and float(session.pump_amount_wei) > 0:
-                pump_amount_bnb = f"{float(session.pump_amount_wei) / 1e18:.4f}"
+            if session.pump_configured:
+                pump_amount_bnb = f"{session.pump_amount_wei / 1e18:.4f}"
                 pump_indicator = "🟢"
-            if session.swap_amount_wei and float(session.swap_amount_wei) > 0:
-                swap_amount_bnb = f"{float(session.swap_amount_wei) / 1e18:.4f}"
+            if session.swap_configured:
+                swap_amount_bnb = f"{session.swap_amount_wei / 1e18:.4f}"
                 swap_indicator = "🟢"
-            if hasattr(session, 'delay_millis') and session.delay_millis:
+            if session.delay_millis:
                 delay_seconds = f"{session.delay_millis / 1000:.1f}"
                 delay_indicator = "🟢"
         
@@ -199,17 +210,14 @@ async def receive_token_ca(update: Update, context: ContextTypes.DEFAULT_TYPE):
             parse_mode='Markdown',
             reply_markup=get_pump_config_keyboard(
                 status,
-                pump_configured=(session and session.pump_amount_wei and float(session.pump_amount_wei) > 0),
-                swap_configured=(session and session.swap_amount_wei and float(session.swap_amount_wei) > 0)
+                pump_configured=bool(session and session.pump_configured),
+                swap_configured=bool(session and session.swap_configured)
             ),
             disable_web_page_preview=True
         )
         
         # save for updates and background job
-        context.user_data['config_message_id'] = config_message.message_id
-        context.user_data['config_chat_id'] = config_message.chat_id
-        context.application.bot_data[f'config_message_{telegram_id}'] = config_message.message_id
-        context.application.bot_data[f'config_chat_{telegram_id}'] = config_message.chat_id
+        session_storage.messages.set_config_message(telegram_id, config_message.chat_id, config_message.message_id)
         
         return ConversationState.WAITING_TOKEN_CA
         
@@ -225,6 +233,7 @@ async def receive_token_ca(update: Update, context: ContextTypes.DEFAULT_TYPE):
         return ConversationState.WAITING_TOKEN_CA
 
 
+@with_deadline(settings.update_deadline_seconds)
 async def receive_pump_amount(update: Update, context: ContextTypes.DEFAULT_TYPE):
     """Receiving pump amount"""
     telegram_id = update.effective_user.id
@@ -261,7 +270,7 @@ async def receive_pump_amount(update: Update, context: ContextTypes.DEFAULT_TYPE
             return ConversationState.WAITING_PUMP_AMOUNT
         
         # сheck that pump amount doesn't exceed balance
-        balance_data = await api.check_wallet_balance(telegram_id)
+        balance_data = await api.check_wallet_balance(telegram_id, max_age=0)
         balance_bnb = Decimal(balance_data["ui"])
         
         if pump_amount_bnb > balance_bnb:
@@ -281,15 +290,12 @@ async def receive_pump_amount(update: Update, context: ContextTypes.DEFAULT_TYPE
         
         pump_amount_wei = bnb_to_wei(pump_amount_bnb)
         
-        usd_data = await api.bnb_to_usd(pump_amount_wei)
-        pump_amount_usd = usd_data["amount_usd"]
+        pump_amount_usd = await price_feed.bnb_to_usd(pump_amount_wei)
         
         session = session_storage.get(telegram_id)
         if session:
-            session.pump_amount_wei = pump_amount_wei
-        
-        # reset max swap amount cache when pump amount changes
-        context.user_data.pop('max_swap_amount_wei', None)
+            session.pump_amount_wei = int(pump_amount_wei)
+            session_storage.save(telegram_id)
         
         await _update_config_menu(
             context, 
@@ -316,6 +322,7 @@ async def receive_pump_amount(update: Update, context: ContextTypes.DEFAULT_TYPE
         return ConversationState.WAITING_PUMP_AMOUNT
 
 
+@with_deadline(settings.update_deadline_seconds)
 async def receive_swap_amount(update: Update, context: ContextTypes.DEFAULT_TYPE):
     """Receiving swap amount and launch confirmation"""
     telegram_id = update.effective_user.id
@@ -339,8 +346,13 @@ async def receive_swap_amount(update: Update, context: ContextTypes.DEFAULT_TYPE
             context.user_data['swap_amount_error_message_id'] = error_msg.message_id
             return ConversationState.WAITING_SWAP_AMOUNT
         
+        session = session_storage.get(telegram_id)
+        if not session:
+            await update.message.reply_text("❌ Session expired. Start over with /start")
+            return ConversationHandler.END
+        
         # check against maximum allowed swap amount
-        max_swap_amount_wei = context.user_data.get('max_swap_amount_wei', '0')
+        max_swap_amount_wei = await _get_max_swap_amount_wei(str(session.pump_amount_wei))
         max_allowed_bnb = Decimal(max_swap_amount_wei) / Decimal('1000000000000000000')
         
         if swap_amount_bnb > max_allowed_bnb:
@@ -361,15 +373,10 @@ async def receive_swap_amount(update: Update, context: ContextTypes.DEFAULT_TYPE
         
         swap_amount_wei = bnb_to_wei(swap_amount_bnb)
         
-        usd_data = await api.bnb_to_usd(swap_amount_wei)
-        swap_amount_usd = usd_data["amount_usd"]
+        swap_amount_usd = await price_feed.bnb_to_usd(swap_amount_wei)
         
-        session = session_storage.get(telegram_id)
-        if not session:
-            await update.message.reply_text("❌ Session expired. Start over with /start")
-            return ConversationHandler.END
-        
-        session.swap_amount_wei = swap_amount_wei
+        session.swap_amount_wei = int(swap_amount_wei)
+        session_storage.save(telegram_id)
         
         # if session is already running, update swap amount on backend
         if session.backend_started:
@@ -410,6 +417,7 @@ async def receive_swap_amount(update: Update, context: ContextTypes.DEFAULT_TYPE
         return ConversationState.WAITING_SWAP_AMOUNT
 
 
+@with_deadline(settings.update_deadline_seconds)
 async def confirm_start(update: Update, context: ContextTypes.DEFAULT_TYPE):
     """Handling START button press"""
     query = update.callback_query
@@ -426,22 +434,21 @@ async def confirm_start(update: Update, context: ContextTypes.DEFAULT_TYPE):
         result = await api.start_session(
             telegram_id=telegram_id,
             token_ca=session.token_ca,
-            pump_amount_wei=session.pump_amount_wei,
-            swap_amount_wei=session.swap_amount_wei,
+            pump_amount_wei=str(session.pump_amount_wei),
+            swap_amount_wei=str(session.swap_amount_wei),
             delay_millis=session.delay_millis
         )
         
         if result.get("created", False):
-            try:
-                status_data = await api.get_session_status(telegram_id)
-                status = status_data.get("status", "InProcess")
-                
-                balance_data = await api.check_wallet_balance(telegram_id)
-                balance_ui = balance_data["ui"]
-                balance_formatted = f"{float(balance_ui):.3f}"
-            except:
+            results = await fetch_all(
+                status=api.get_session_status(telegram_id),
+                balance=api.check_wallet_balance(telegram_id)
+            )
+            if failed(results["status"]):
                 status = "InProcess"
-                balance_formatted = "N/A"
+            else:
+                status = results["status"].get("status", "InProcess")
+            balance_formatted = _format_balance(results["balance"], digits=3)
             
             if status == "InProcess":
                 status_text = "🔄 In Progress"
@@ -462,6 +469,7 @@ async def confirm_start(update: Update, context: ContextTypes.DEFAULT_TYPE):
                 "Press Refresh to update data.",
                 reply_markup=get_session_status_keyboard()
             )
+            session_storage.messages.set_status_message(telegram_id, query.message.chat_id, query.message.message_id)
         else:
             await query.edit_message_text(
                 "⚠️ You already have an active session.\n"
@@ -494,6 +502,7 @@ async def cancel_start(update: Update, context: ContextTypes.DEFAULT_TYPE):
     )
 
 
+@with_deadline(settings.update_deadline_seconds)
 async def refresh_balance(update: Update, context: ContextTypes.DEFAULT_TYPE):
     """Handle Refresh button press to check balance"""
     query = update.callback_query
@@ -502,11 +511,15 @@ async def refresh_balance(update: Update, context: ContextTypes.DEFAULT_TYPE):
     telegram_id = update.effective_user.id
     
     try:
-        wallet_data = await api.get_or_create_wallet(telegram_id)
-        wallet_address = wallet_data["wallet_dto"]["evm_address"]
-        
-        balance_data = await api.check_wallet_balance(telegram_id)
-        balance_ui = balance_data["ui"]
+        results = await fetch_all(
+            wallet=api.get_or_create_wallet(telegram_id),
+            balance=api.check_wallet_balance(telegram_id, max_age=0)
+        )
+        for result in results.values():
+            if failed(result):
+                raise result
+        wallet_address = results["wallet"]["wallet_dto"]["evm_address"]
+        balance_ui = results["balance"]["ui"]
         
         try:
             balance_formatted = f"{float(balance_ui):.3f}"
@@ -528,16 +541,16 @@ async def refresh_balance(update: Update, context: ContextTypes.DEFAULT_TYPE):
                 f"Example: `0x718447E29B90D00461966D01E533Fa1b69574444`"
             )
             
-            if WELCOME_IMAGE_PATH.exists():
+            if media_cache.has(WELCOME_IMAGE):
                 logger.info("Deleting old message and sending new one with photo")
                 await query.message.delete()
-                with open(WELCOME_IMAGE_PATH, 'rb') as photo:
-                    await context.bot.send_photo(
-                        chat_id=telegram_id,
-                        photo=photo,
-                        caption=welcome_text,
-                        parse_mode='Markdown'
-                    )
+                await media_cache.send_photo(
+                    context.bot,
+                    WELCOME_IMAGE,
+                    chat_id=telegram_id,
+                    caption=welcome_text,
+                    parse_mode='Markdown'
+                )
             else:
                 logger.info("Photo not found, editing message text")
                 try:
@@ -584,6 +597,7 @@ async def refresh_balance(update: Update, context: ContextTypes.DEFAULT_TYPE):
         await query.answer("❌ Unable to refresh balance. Contact our support: @sullydevx", show_alert=True)
 
 
+@with_deadline(settings.update_deadline_seconds)
 async def refresh_session_status(update: Update, context: ContextTypes.DEFAULT_TYPE):
     """Handle Refresh Session Status button press"""
     query = update.callback_query
@@ -594,12 +608,14 @@ async def refresh_session_status(update: Update, context: ContextTypes.DEFAULT_T
     try:
         from telegram.error import BadRequest
         
-        status_data = await api.get_session_status(telegram_id)
-        status = status_data.get("status", "Unknown")
-        
-        balance_data = await api.check_wallet_balance(telegram_id)
-        balance_ui = balance_data["ui"]
-        balance_formatted = f"{float(balance_ui):.3f}"
+        results = await fetch_all(
+            status=api.get_session_status(telegram_id),
+            balance=api.check_wallet_balance(telegram_id, max_age=0)
+        )
+        if failed(results["status"]):
+            raise results["status"]
+        status = results["status"].get("status", "Unknown")
+        balance_formatted = _format_balance(results["balance"], digits=3)
         
         if status == "InProcess":
             status_text = "🔄 In Progress"
@@ -633,6 +649,7 @@ async def refresh_session_status(update: Update, context: ContextTypes.DEFAULT_T
                 message_text,
                 reply_markup=get_session_status_keyboard()
             )
+            session_storage.messages.set_status_message(telegram_id, query.message.chat_id, query.message.message_id)
         except BadRequest as e:
             if "not modified" in str(e).lower():
                 pass
@@ -653,6 +670,7 @@ async def refresh_session_status(update: Update, context: ContextTypes.DEFAULT_T
             await query.answer("❌ Unable to get status. Contact our support: @sullydevx", show_alert=True)
 
 
+@with_deadline(settings.update_deadline_seconds)
 async def set_pump_amount_callback(update: Update, context: ContextTypes.DEFAULT_TYPE):
     """Handle Pump Amount button"""
     query = update.callback_query
@@ -672,8 +690,7 @@ async def set_pump_amount_callback(update: Update, context: ContextTypes.DEFAULT
     
     await query.answer()
     
-    context.user_data['config_message_id'] = query.message.message_id
-    context.user_data['config_chat_id'] = query.message.chat_id
+    session_storage.messages.set_config_message(telegram_id, query.message.chat_id, query.message.message_id)
     
     await query.edit_message_text(
         "💰 **What is Pump Amount?**\n\n"
@@ -690,6 +707,7 @@ async def set_pump_amount_callback(update: Update, context: ContextTypes.DEFAULT
     return ConversationState.WAITING_PUMP_AMOUNT
 
 
+@with_deadline(settings.update_deadline_seconds)
 async def set_swap_amount_callback(update: Update, context: ContextTypes.DEFAULT_TYPE):
     """Handle Swap Amount button"""
     query = update.callback_query
@@ -697,31 +715,17 @@ async def set_swap_amount_callback(update: Update, context: ContextTypes.DEFAULT
     
     # check if pump amount is set first
     session = session_storage.get(telegram_id)
-    if not session or not session.pump_amount_wei or float(session.pump_amount_wei) <= 0:
+    if not session or not session.pump_configured:
         await query.answer("⚠️ Please set Pump Amount first!", show_alert=True)
         return ConversationState.WAITING_TOKEN_CA
     
     await query.answer()
 
-    # use cached max swap amount if available, otherwise fetch from backend
-    max_swap_amount_wei = context.user_data.get('max_swap_amount_wei')
-    
-    if not max_swap_amount_wei:
-        try:
-            max_swap_data = await api.estimate_max_swap_amount(session.pump_amount_wei)
-            max_swap_amount_wei = max_swap_data["swap_amount_wei"]
-            
-            # save max swap amount in context for future use
-            context.user_data['max_swap_amount_wei'] = max_swap_amount_wei
-        except Exception as e:
-            logger.error(f"Error estimating max swap amount: {e}")
-            max_swap_amount_wei = "0"
-            context.user_data['max_swap_amount_wei'] = "0"
-    
+    # shared across users by pump amount, usually answered from cache
+    max_swap_amount_wei = await _get_max_swap_amount_wei(str(session.pump_amount_wei))
     max_swap_amount_bnb = float(max_swap_amount_wei) / 1e18
     
-    context.user_data['config_message_id'] = query.message.message_id
-    context.user_data['config_chat_id'] = query.message.chat_id
+    session_storage.messages.set_config_message(telegram_id, query.message.chat_id, query.message.message_id)
     
     await query.edit_message_text(
         "💱 **Set Swap Amount**\n\n"
@@ -741,10 +745,10 @@ async def set_delay_callback(update: Update, context: ContextTypes.DEFAULT_TYPE)
     """Handle Set Delay button"""
     query = update.callback_query
     await query.answer()
+    telegram_id = update.effective_user.id
     
     # save message_id to update it later
-    context.user_data['config_message_id'] = query.message.message_id
-    context.user_data['config_chat_id'] = query.message.chat_id
+    session_storage.messages.set_config_message(telegram_id, query.message.chat_id, query.message.message_id)
     
     await query.edit_message_text(
         "⏱️ **Set Transaction Delay**\n\n"
@@ -757,6 +761,7 @@ async def set_delay_callback(update: Update, context: ContextTypes.DEFAULT_TYPE)
     return ConversationState.WAITING_DELAY
 
 
+@with_deadline(settings.update_deadline_seconds)
 async def receive_delay(update: Update, context: ContextTypes.DEFAULT_TYPE):
     """Receiving delay value"""
     telegram_id = update.effective_user.id
@@ -790,6 +795,7 @@ async def receive_delay(update: Update, context: ContextTypes.DEFAULT_TYPE):
         session = session_storage.get(telegram_id)
         if session:
             session.delay_millis = delay_millis
+            session_storage.save(telegram_id)
             
             # if session is already running, update delay on backend
             if session.backend_started:
@@ -830,6 +836,7 @@ async def receive_delay(update: Update, context: ContextTypes.DEFAULT_TYPE):
         return ConversationState.WAITING_DELAY
 
 
+@with_deadline(settings.update_deadline_seconds)
 async def start_pump_callback(update: Update, context: ContextTypes.DEFAULT_TYPE):
     """Handle START button"""
     query = update.callback_query
@@ -841,11 +848,11 @@ async def start_pump_callback(update: Update, context: ContextTypes.DEFAULT_TYPE
             await query.answer("❌ Session not found. Please start over with /start", show_alert=True)
             return ConversationState.WAITING_TOKEN_CA
         
-        if not session.pump_amount_wei or float(session.pump_amount_wei) <= 0:
+        if not session.pump_configured:
             await query.answer("⚠️ Please configure Pump Amount first!", show_alert=True)
             return ConversationState.WAITING_TOKEN_CA
         
-        if not session.swap_amount_wei or float(session.swap_amount_wei) <= 0:
+        if not session.swap_configured:
             await query.answer("⚠️ Please configure Swap Amount first!", show_alert=True)
             return ConversationState.WAITING_TOKEN_CA
         
@@ -854,15 +861,13 @@ async def start_pump_callback(update: Update, context: ContextTypes.DEFAULT_TYPE
         result = await api.start_session(
             telegram_id=telegram_id,
             token_ca=session.token_ca,
-            pump_amount_wei=session.pump_amount_wei,
-            swap_amount_wei=session.swap_amount_wei
+            pump_amount_wei=str(session.pump_amount_wei),
+            swap_amount_wei=str(session.swap_amount_wei)
         )
         
-        session.backend_started = True
-        
-        import main
-        if telegram_id in main.notified_completions:
-            main.notified_completions.remove(telegram_id)
+        session.start()
+        session_storage.save(telegram_id)
+        schedule_poll(telegram_id, session)
         
         await _update_config_menu(
             context, 
@@ -878,6 +883,7 @@ async def start_pump_callback(update: Update, context: ContextTypes.DEFAULT_TYPE
         return ConversationState.WAITING_TOKEN_CA
 
 
+@with_deadline(settings.update_deadline_seconds)
 async def pause_pump_callback(update: Update, context: ContextTypes.DEFAULT_TYPE):
     """Handle Pause button"""
     query = update.callback_query
@@ -890,7 +896,9 @@ async def pause_pump_callback(update: Update, context: ContextTypes.DEFAULT_TYPE
         
         session = session_storage.get(telegram_id)
         if session:
-            session.is_paused = True
+            session.set_paused(True)
+            session_storage.save(telegram_id)
+            schedule_poll(telegram_id, session)
         
         await _update_config_menu(
             context, 
@@ -903,6 +911,7 @@ async def pause_pump_callback(update: Update, context: ContextTypes.DEFAULT_TYPE
         await query.answer("❌ Unable to pause pump. Contact our support: @sullydevx", show_alert=True)
 
 
+@with_deadline(settings.update_deadline_seconds)
 async def resume_pump_callback(update: Update, context: ContextTypes.DEFAULT_TYPE):
     """Handle Resume button"""
     query = update.callback_query
@@ -915,7 +924,9 @@ async def resume_pump_callback(update: Update, context: ContextTypes.DEFAULT_TYP
         
         session = session_storage.get(telegram_id)
         if session:
-            session.is_paused = False
+            session.set_paused(False)
+            session_storage.save(telegram_id)
+            schedule_poll(telegram_id, session)
         
         await _update_config_menu(
             context, 
@@ -3,7 +3,10 @@ Telegram bot for managing BSC pump bot
 Maximum simple UI: paste contract -> press start
 """
 
+import asyncio
 import logging
+import secrets
+import signal
 from telegram import Update
 from telegram.ext import (
     Application,
@@ -11,16 +14,22 @@ from telegram.ext import (
     MessageHandler,
     CallbackQueryHandler,
     ConversationHandler,
+    TypeHandler,
     filters
 )
 
 from config import settings
+from api_client import api
+from models import session_storage
 from states import ConversationState
 from handlers import (
     start,
     cancel,
     help_command,
     balance,
+    track_activity,
+    reject_if_degraded,
+    shed_when_overloaded,
     receive_token_ca,
     receive_pump_amount,
     receive_swap_amount,
@@ -36,9 +45,20 @@ from handlers import (
     pause_pump_callback,
     resume_pump_callback
 )
-from models.session import session_storage
-from api_client import api
-from pathlib import Path
+from services import (
+    check_session_completions,
+    schedule_started_sessions,
+    poll_scheduler,
+    SessionEventReceiver,
+    WebhookReceiver,
+    media_cache,
+    WELCOME_IMAGE,
+    refresh_price,
+    evict_idle_users,
+    create_rate_limiter,
+    notification_outbox,
+    deliver_notifications
+)
 
 # Logging setup
 logging.basicConfig(
@@ -47,11 +67,11 @@ logging.basicConfig(
 )
 logger = logging.getLogger(__name__)
 
-# Path to welcome image
-WELCOME_IMAGE_PATH = Path(__file__).parent / "assets" / "welcome.jpg"
+# Embedded receiver for backend session events, started in post_init when enabled
+event_receiver: SessionEventReceiver | None = None
 
-# Track which users we've already notified about completion
-notified_completions = set()
+# Paces every outbound Bot API request, interactive replies ahead of notifications
+rate_limiter = create_rate_limiter()
 
 
 def create_conversation_handler() -> ConversationHandler:
@@ -89,77 +109,17 @@ def create_conversation_handler() -> ConversationHandler:
     )
 
 
-async def check_session_completions(context):
-    """Background job to check for completed pump sessions"""
-    global notified_completions
-    
-    # Get all active sessions
-    for telegram_id, session in list(session_storage._sessions.items()):
-        # Skip if not started on backend or already notified
-        if not session.backend_started or telegram_id in notified_completions:
-            continue
-        
-        try:
-            # Check status from backend
-            status_data = await api.get_session_status(telegram_id)
-            status = status_data.get("status", "Not Started")
-            
-            # If completed successfully
-            if isinstance(status, dict) and "Success" in status:
-                # Get config message info to delete it
-                message_id = context.bot_data.get(f'config_message_{telegram_id}')
-                chat_id = context.bot_data.get(f'config_chat_{telegram_id}')
-                
-                # Delete old config message if exists
-                if message_id and chat_id:
-                    try:
-                        await context.bot.delete_message(chat_id=chat_id, message_id=message_id)
-                    except:
-                        pass
-                
-                success_stats = status.get("Success", {})
-                pumped_bnb = float(success_stats.get("pumped_amount_wei", "0")) / 1e18
-                pumped_usd = success_stats.get("pumped_amount_usd", "0")
-                time_spent = int(success_stats.get("time_spent_millis", 0)) / 1000
-                
-                completion_text = (
-                    "🎉 **Volume Pumping Completed!**\n\n"
-                    f"✅ Successfully generated volume for your token\n"
-                    f"💰 Total Pumped: **{pumped_bnb:.4f} BNB** (~${pumped_usd})\n"
-                    f"⏱ Time: **{time_spent:.0f}s**\n\n"
-                    f"🔗 Token: `{session.token_ca}`\n\n"
-                    "Ready to start a new session? Use /start"
-                )
-                
-                # Send completion message with image
-                if WELCOME_IMAGE_PATH.exists():
-                    with open(WELCOME_IMAGE_PATH, 'rb') as photo:
-                        await context.bot.send_photo(
-                            chat_id=telegram_id,
-                            photo=photo,
-                            caption=completion_text,
-                            parse_mode='Markdown'
-                        )
-                else:
-                    await context.bot.send_message(
-                        chat_id=telegram_id,
-                        text=completion_text,
-                        parse_mode='Markdown'
-                    )
-                
-                # Mark as notified
-                notified_completions.add(telegram_id)
-                
-                # Clean up session
-                session.backend_started = False
-                session.is_paused = False
-                
-        except Exception as e:
-            logger.error(f"Error checking session completion for user {telegram_id}: {e}")
-
-
 def register_handlers(application: Application) -> None:
     """Register all bot handlers"""
+    # Last activity per user, idle users' state is evicted
+    application.add_handler(TypeHandler(Update, track_activity), group=-3)
+    
+    # Fast reply while backend circuit breakers are open
+    application.add_handler(TypeHandler(Update, reject_if_degraded), group=-1)
+    
+    # Drop balance and status refreshes while the backend is at its admission limit
+    application.add_handler(TypeHandler(Update, shed_when_overloaded), group=-2)
+    
     # Main conversation handler
     conv_handler = create_conversation_handler()
     application.add_handler(conv_handler)
@@ -183,24 +143,255 @@ def register_handlers(application: Application) -> None:
     application.add_handler(CommandHandler("help", help_command))
 
 
+async def log_backend_stats(context) -> None:
+    """Background job to report backend, outbound queue and outbox stats"""
+    for endpoint, stats in api.cache_stats().items():
+        lookups = stats["hits"] + stats["misses"]
+        hit_rate = stats["hits"] / lookups * 100 if lookups else 0.0
+        logger.info(
+            f"Cache {endpoint}: {stats['size']} entries, {stats['hits']} hits, "
+            f"{stats['misses']} misses ({hit_rate:.1f}% hit rate), {stats['evictions']} evictions"
+        )
+    
+    coalescing = api.coalescing_stats()
+    logger.info(f"Coalesced {coalescing['coalesced']} of {coalescing['calls']} backend reads")
+    
+    pool = api.pool_stats()
+    logger.info(
+        f"Backend pool wait: {pool['count']} requests, p50 {pool['p50'] * 1000:.1f}ms, "
+        f"p95 {pool['p95'] * 1000:.1f}ms, max {pool['max'] * 1000:.1f}ms"
+    )
+    
+    for traffic_class, dispatch in api.dispatch_stats().items():
+        logger.info(
+            f"Backend {traffic_class} traffic: {dispatch['in_flight']}/{dispatch['limit']} slots in use, "
+            f"{dispatch['waiting']} queued, queue wait p95 {dispatch['p95'] * 1000:.1f}ms"
+        )
+    
+    admission = api.admission.stats()
+    logger.info(
+        f"Backend admission: limit {admission['limit']}, {admission['in_flight']} in flight, "
+        f"{admission['shed']} updates shed"
+    )
+    
+    logger.info(
+        f"Backend breakers: handlers {api.breaker_states()}, background {api.background_breaker_states()}"
+    )
+    
+    for base_url, replica in api.replica_stats().items():
+        logger.info(
+            f"Backend replica {base_url}: {replica['outstanding']} outstanding, "
+            f"EWMA {replica['ewma'] * 1000:.1f}ms, {replica['ejections']} ejections"
+            + (", ejected" if replica['ejected'] else "")
+        )
+    
+    for endpoint, latency in api.latency_stats().items():
+        logger.info(
+            f"Backend {endpoint}: {latency['count']} requests, p50 {latency['p50'] * 1000:.1f}ms, "
+            f"p95 {latency['p95'] * 1000:.1f}ms"
+        )
+    
+    if settings.backend_hedging_enabled:
+        hedging = api.hedging_stats()
+        logger.info(
+            f"Hedged {hedging['hedges']} reads ({hedging['wins']} won by the backup), "
+            f"{hedging['denied']} denied by budget"
+        )
+    
+    for priority, outbound in rate_limiter.stats().items():
+        logger.info(
+            f"Telegram {priority} sends: {outbound['queued']} queued, "
+            f"wait p50 {outbound['p50'] * 1000:.1f}ms, p95 {outbound['p95'] * 1000:.1f}ms"
+        )
+    if rate_limiter.retries:
+        logger.info(f"Telegram flood limits hit: {rate_limiter.retries} requests retried")
+    
+    outbox = notification_outbox.stats()
+    logger.info(
+        f"Notification outbox: {await notification_outbox.pending()} pending, {outbox['delivered']} delivered, "
+        f"{outbox['retried']} retries, {outbox['failed']} failed"
+    )
+
+
+async def prewarm_max_swap_amounts(context) -> None:
+    """One-off job to cache max swap estimates for common pump amounts"""
+    await api.prewarm_max_swap_amounts(settings.max_swap_prewarm_bnb)
+
+
+async def check_backend_health(context) -> None:
+    """Background job to eject unhealthy backend replicas and bring recovered ones back"""
+    await api.check_replicas()
+
+
+async def flush_sessions(context) -> None:
+    """Background job to write batched session changes to durable storage"""
+    try:
+        await session_storage.flush()
+    except Exception as e:
+        logger.error(f"Error flushing sessions: {e}")
+
+
+async def post_init(application: Application) -> None:
+    """Start services that share the application's event loop"""
+    global event_receiver
+    
+    # sessions started before a restart; new ones are added as they start
+    scheduled = schedule_started_sessions()
+    logger.info(f"Polling {scheduled} running sessions")
+    
+    if settings.events_enabled:
+        if not settings.events_secret:
+            raise ValueError("EVENTS_SECRET is required when EVENTS_ENABLED is set")
+        event_receiver = SessionEventReceiver(
+            application,
+            settings.events_host,
+            settings.events_port,
+            settings.events_secret
+        )
+        await event_receiver.start()
+        
+        # backend pushes status changes, polling only reconciles missed events
+        reconcile_interval = settings.events_reconcile_interval_seconds
+        poll_scheduler.min_interval = max(poll_scheduler.min_interval, reconcile_interval)
+        poll_scheduler.max_interval = max(poll_scheduler.max_interval, reconcile_interval)
+
+
+async def post_shutdown(application: Application) -> None:
+    """Stop services started in post_init and write out pending session changes"""
+    if event_receiver:
+        await event_receiver.stop()
+    
+    await session_storage.flush()
+    session_storage.close()
+    notification_outbox.close()
+
+
+async def run_webhook(application: Application) -> None:
+    """Serve updates posted by Telegram until SIGINT/SIGTERM, with the same lifecycle as run_polling"""
+    if not settings.webhook_url:
+        raise ValueError("WEBHOOK_URL is required when TELEGRAM_MODE is webhook")
+    
+    secret = settings.webhook_secret or secrets.token_urlsafe(32)
+    receiver = WebhookReceiver(
+        application,
+        settings.webhook_host,
+        settings.webhook_port,
+        settings.webhook_path,
+        secret,
+        queue_size=settings.webhook_queue_size,
+        drain_timeout=settings.webhook_drain_timeout_seconds
+    )
+    
+    stop = asyncio.Event()
+    loop = asyncio.get_running_loop()
+    for sig in (signal.SIGINT, signal.SIGTERM):
+        loop.add_signal_handler(sig, stop.set)
+    
+    await application.initialize()
+    try:
+        if application.post_init:
+            await application.post_init(application)
+        await application.start()
+        await receiver.start()
+        # the webhook is left set on shutdown, Telegram holds updates until the bot is back
+        await application.bot.set_webhook(
+            url=settings.webhook_url,
+            secret_token=secret,
+            allowed_updates=settings.telegram_allowed_updates,
+            max_connections=settings.webhook_max_connections
+        )
+        logger.info(f"Receiving updates on {settings.webhook_url}")
+        await stop.wait()
+    finally:
+        await receiver.stop()
+        if application.running:
+            await application.stop()
+        await application.shutdown()
+        if application.post_shutdown:
+            await application.post_shutdown(application)
+
+
 def main():
     """Start the bot"""
     # Create application
-    application = Application.builder().token(settings.telegram_bot_token).build()
+    application = (
+        Application.builder()
+        .token(settings.telegram_bot_token)
+        .rate_limiter(rate_limiter)
+        .post_init(post_init)
+        .post_shutdown(post_shutdown)
+        .build()
+    )
     
     # Register all handlers
     register_handlers(application)
     
-    # Add background job to check session completions every 10 seconds
+    # Read media into memory once, handlers send it from there
+    media_cache.preload(WELCOME_IMAGE)
+    
+    # common pump amounts, so the Swap Amount prompt renders without a backend round trip;
+    # a job rather than post_init so a slow backend does not hold up handling updates
+    if settings.max_swap_prewarm_bnb:
+        application.job_queue.run_once(prewarm_max_swap_amounts, when=0)
+    
+    # Add background job to check session completions
+    # overlapping runs are let through so the job can detect and report overruns itself
     application.job_queue.run_repeating(
         check_session_completions,
-        interval=10,
-        first=5
+        interval=settings.poll_tick_seconds,
+        first=5,
+        job_kwargs={"max_instances": 2, "coalesce": True}
+    )
+    
+    # Keep BNB/USD rate fresh for local conversions
+    application.job_queue.run_repeating(
+        refresh_price,
+        interval=settings.price_refresh_interval_seconds,
+        first=0
+    )
+    
+    # Active health checks only matter when there is a replica to fail over to
+    if len(settings.api_base_urls) > 1 and settings.backend_health_interval_seconds > 0:
+        application.job_queue.run_repeating(
+            check_backend_health,
+            interval=settings.backend_health_interval_seconds,
+            first=settings.backend_health_interval_seconds
+        )
+    
+    # Session changes are batched, written out off the hot path
+    if settings.session_backend == "sqlite":
+        application.job_queue.run_repeating(
+            flush_sessions,
+            interval=settings.session_flush_interval_seconds,
+            first=settings.session_flush_interval_seconds
+        )
+    
+    # Retry completion notifications that failed or were pending at the last shutdown
+    application.job_queue.run_repeating(
+        deliver_notifications,
+        interval=settings.outbox_interval_seconds,
+        first=settings.outbox_interval_seconds
+    )
+    
+    # Drop state of users who went idle so memory stays flat
+    application.job_queue.run_repeating(
+        evict_idle_users,
+        interval=settings.idle_eviction_interval_seconds,
+        first=settings.idle_eviction_interval_seconds
+    )
+    
+    application.job_queue.run_repeating(
+        log_backend_stats,
+        interval=settings.backend_stats_interval_seconds,
+        first=settings.backend_stats_interval_seconds
     )
     
     # Start the bot
-    logger.info("Starting bot...")
-    application.run_polling(allowed_updates=Update.ALL_TYPES)
+    logger.info(f"Starting bot ({settings.telegram_mode})...")
+    if settings.telegram_mode == "webhook":
+        asyncio.run(run_webhook(application))
+    else:
+        application.run_polling(allowed_updates=settings.telegram_allowed_updates)
 
 
 if __name__ == "__main__":
@@ -1,5 +1,7 @@
 """Models module exports"""
 
-from .session import UserSession, SessionStorage, session_storage
+from .session import UserSession, SessionStorage, create_session_storage, session_storage
+from .messages import MessageRecord, MessageRegistry
+from .sqlite_storage import SqliteSessionStorage
 
-__all__ = ['UserSession', 'SessionStorage', 'session_storage']
+__all__ = ['MessageRecord', 'MessageRegistry', 'UserSession', 'SessionStorage', 'SqliteSessionStorage', 'create_session_storage', 'session_storage']
@@ -0,0 +1,97 @@
+"""Per-user registry of the bot messages handlers and the poller update later"""
+
+from dataclasses import dataclass
+from typing import Callable, Iterator
+
+
+@dataclass(slots=True)
+class MessageRecord:
+    """Chat and message IDs kept for one user, 0 = none"""
+    chat_id: int = 0
+    config_message_id: int = 0
+    status_message_id: int = 0
+
+
+class MessageRegistry:
+    """
+    telegram ID -> MessageRecord
+    
+    on_change(telegram_id) is called after every change so a persistent
+    storage can batch the write; loader fills the registry on first use.
+    """
+    
+    def __init__(
+        self,
+        on_change: Callable[[int], None] | None = None,
+        loader: Callable[[], dict[int, MessageRecord]] | None = None
+    ):
+        self._on_change = on_change
+        self._loader = loader
+        self._loaded: dict[int, MessageRecord] | None = None if loader else {}
+    
+    @property
+    def _records(self) -> dict[int, MessageRecord]:
+        if self._loaded is None:
+            self._loaded = self._loader()
+        return self._loaded
+    
+    def __contains__(self, telegram_id: int) -> bool:
+        return telegram_id in self._records
+    
+    def __len__(self) -> int:
+        return len(self._records)
+    
+    def get(self, telegram_id: int) -> MessageRecord | None:
+        return self._records.get(telegram_id)
+    
+    def items(self) -> Iterator[tuple[int, MessageRecord]]:
+        """Snapshot of (telegram ID, record) pairs"""
+        return iter(list(self._records.items()))
+    
+    def _record(self, telegram_id: int) -> MessageRecord:
+        record = self._records.get(telegram_id)
+        if record is None:
+            record = self._records[telegram_id] = MessageRecord()
+        return record
+    
+    def _changed(self, telegram_id: int) -> None:
+        if self._on_change:
+            self._on_change(telegram_id)
+    
+    def set_config_message(self, telegram_id: int, chat_id: int, message_id: int) -> None:
+        """Remember the configuration menu message"""
+        record = self._record(telegram_id)
+        record.chat_id = chat_id
+        record.config_message_id = message_id
+        self._changed(telegram_id)
+    
+    def set_status_message(self, telegram_id: int, chat_id: int, message_id: int) -> None:
+        """Remember the session status message"""
+        record = self._record(telegram_id)
+        record.chat_id = chat_id
+        record.status_message_id = message_id
+        self._changed(telegram_id)
+    
+    def clear_config_message(self, telegram_id: int) -> None:
+        record = self._records.get(telegram_id)
+        if record and record.config_message_id:
+            record.config_message_id = 0
+            self._changed(telegram_id)
+    
+    def clear_status_message(self, telegram_id: int) -> None:
+        record = self._records.get(telegram_id)
+        if record and record.status_message_id:
+            record.status_message_id = 0
+            self._changed(telegram_id)
+    
+    def delete(self, telegram_id: int) -> None:
+        if self._records.pop(telegram_id, None) is not None:
+            self._changed(telegram_id)
+    
+    def evict(self, telegram_id: int) -> None:
+        """Forget a record in memory only, persistent storage keeps it"""
+        self._records.pop(telegram_id, None)
+    
+    def restore(self, telegram_id: int, record: MessageRecord) -> None:
+        """Put back a record read from persistent storage, unless it changed since"""
+        self._records.setdefault(telegram_id, record)
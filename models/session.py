@@ -1,17 +1,58 @@
 """User session model"""
 
+import time
 from dataclasses import dataclass
+from typing import Iterator
 
+from config import settings
+from .messages import MessageRegistry
 
-@dataclass
+
+@dataclass(slots=True)
 class UserSession:
-    """Temporary storage for user data during session setup"""
+    """Temporary storage for user data during session setup, amounts in wei as ints (0 = not set)"""
     token_ca: str = ""
-    pump_amount_wei: str = ""
-    swap_amount_wei: str = ""
+    pump_amount_wei: int = 0
+    swap_amount_wei: int = 0
     delay_millis: int = 1000
     backend_started: bool = False  # track if session was started on backend
     is_paused: bool = False  # track if session is currently paused
+    started_at_millis: int = 0  # when the running session was started, identifies its completion
+    paused_millis: int = 0  # time spent paused in earlier pauses of the running session
+    paused_at_millis: int = 0  # when the current pause began, 0 = not paused
+    
+    def start(self, now_millis: int | None = None) -> None:
+        """Mark the session started on the backend"""
+        self.backend_started = True
+        self.is_paused = False
+        self.started_at_millis = int(time.time() * 1000) if now_millis is None else now_millis
+        self.paused_millis = 0
+        self.paused_at_millis = 0
+    
+    def set_paused(self, paused: bool, now_millis: int | None = None) -> None:
+        """Pause or resume, keeping track of how long the session was paused"""
+        now_millis = int(time.time() * 1000) if now_millis is None else now_millis
+        if paused and not self.is_paused:
+            self.paused_at_millis = now_millis
+        elif not paused and self.is_paused and self.paused_at_millis:
+            self.paused_millis += now_millis - self.paused_at_millis
+            self.paused_at_millis = 0
+        self.is_paused = paused
+    
+    def active_seconds(self, now_millis: int) -> float | None:
+        """Seconds the session has been running, pauses excluded; None if its start time is unknown"""
+        if not self.started_at_millis:
+            return None
+        until = self.paused_at_millis if self.is_paused and self.paused_at_millis else now_millis
+        return max(until - self.started_at_millis - self.paused_millis, 0) / 1000
+    
+    @property
+    def pump_configured(self) -> bool:
+        return self.pump_amount_wei > 0
+    
+    @property
+    def swap_configured(self) -> bool:
+        return self.swap_amount_wei > 0
 
 
 class SessionStorage:
@@ -19,6 +60,8 @@ class SessionStorage:
     
     def __init__(self):
         self._sessions: dict[int, UserSession] = {}
+        # config/status message IDs per user, kept with the sessions
+        self.messages = MessageRegistry()
     
     def get(self, telegram_id: int) -> UserSession | None:
         """Get user session by telegram ID"""
@@ -30,13 +73,46 @@ class SessionStorage:
         self._sessions[telegram_id] = session
         return session
     
+    def save(self, telegram_id: int) -> None:
+        """Record changes made to a session in place, a no-op in memory"""
+    
     def delete(self, telegram_id: int) -> None:
         """Delete user session"""
         if telegram_id in self._sessions:
             del self._sessions[telegram_id]
     
+    def evict(self, telegram_id: int) -> bool:
+        """
+        Drop a user's session and message record from memory
+        
+        Unlike delete() this is not a change to the user's state: a persistent
+        storage keeps its rows. Returns False if the user was kept instead.
+        """
+        self._sessions.pop(telegram_id, None)
+        self.messages.evict(telegram_id)
+        return True
+    
     def exists(self, telegram_id: int) -> bool:
         """Check if user session exists"""
         return telegram_id in self._sessions
+    
+    def items(self) -> Iterator[tuple[int, UserSession]]:
+        """Snapshot of (telegram ID, session) pairs, safe to use while sessions change"""
+        return iter(list(self._sessions.items()))
+    
+    async def flush(self) -> None:
+        """Write pending changes to durable storage, a no-op in memory"""
+    
+    def close(self) -> None:
+        """Release storage resources"""
+
+
+def create_session_storage() -> SessionStorage:
+    """Session storage backend chosen by settings.session_backend"""
+    if settings.session_backend == "sqlite":
+        from .sqlite_storage import SqliteSessionStorage
+        return SqliteSessionStorage(settings.session_db_path)
+    return SessionStorage()
+
 
-session_storage = SessionStorage()
+session_storage = create_session_storage()
@@ -0,0 +1,200 @@
+"""SQLite-backed session storage that survives restarts"""
+
+import asyncio
+import dataclasses
+import json
+import logging
+import sqlite3
+
+from .messages import MessageRecord, MessageRegistry
+from .session import UserSession, SessionStorage
+
+logger = logging.getLogger(__name__)
+
+SESSION_FIELDS = tuple(field.name for field in dataclasses.fields(UserSession))
+
+
+def _dump(session: UserSession) -> str:
+    return json.dumps({name: getattr(session, name) for name in SESSION_FIELDS})
+
+
+def _restore(data: str) -> UserSession:
+    fields = json.loads(data)
+    session = UserSession(**{name: fields[name] for name in SESSION_FIELDS if name in fields})
+    # rows written before amounts became ints hold decimal strings, "" for unset
+    session.pump_amount_wei = int(session.pump_amount_wei or 0)
+    session.swap_amount_wei = int(session.swap_amount_wei or 0)
+    return session
+
+
+class SqliteSessionStorage(SessionStorage):
+    """
+    Sessions and message records served from memory and written to SQLite (WAL) in batches
+    
+    Reads never touch the database once it is loaded, which happens on first
+    use. create/save/delete and registry changes only mark the user dirty;
+    flush() writes every pending change in one transaction off the event loop.
+    """
+    
+    def __init__(self, path: str):
+        self.path = path
+        self._loaded: dict[int, UserSession] | None = None
+        self._dirty: set[int] = set()
+        self._deleted: set[int] = set()
+        self._messages_changed: set[int] = set()
+        # evicted from memory, rows still in the database
+        self._evicted: set[int] = set()
+        self.messages = MessageRegistry(on_change=self._messages_changed.add, loader=self._load_messages)
+        self._flush_lock = asyncio.Lock()
+        # flushes run in a worker thread, one at a time
+        self._db = sqlite3.connect(path, check_same_thread=False)
+        self._db.execute("PRAGMA journal_mode=WAL")
+        self._db.execute("PRAGMA synchronous=NORMAL")
+        self._db.execute(
+            "CREATE TABLE IF NOT EXISTS sessions (telegram_id INTEGER PRIMARY KEY, data TEXT NOT NULL)"
+        )
+        self._db.execute(
+            "CREATE TABLE IF NOT EXISTS messages ("
+            "telegram_id INTEGER PRIMARY KEY, chat_id INTEGER NOT NULL, "
+            "config_message_id INTEGER NOT NULL, status_message_id INTEGER NOT NULL)"
+        )
+        self._db.commit()
+    
+    @property
+    def _sessions(self) -> dict[int, UserSession]:
+        if self._loaded is None:
+            self._loaded = self._load()
+        return self._loaded
+    
+    def _load(self) -> dict[int, UserSession]:
+        sessions = {}
+        for telegram_id, data in self._db.execute("SELECT telegram_id, data FROM sessions"):
+            try:
+                sessions[telegram_id] = _restore(data)
+            except (ValueError, TypeError) as e:
+                logger.error(f"Skipping unreadable session for user {telegram_id}: {e}")
+        logger.info(f"Loaded {len(sessions)} sessions from {self.path}")
+        return sessions
+    
+    def _load_messages(self) -> dict[int, MessageRecord]:
+        rows = self._db.execute(
+            "SELECT telegram_id, chat_id, config_message_id, status_message_id FROM messages"
+        )
+        return {telegram_id: MessageRecord(*ids) for telegram_id, *ids in rows}
+    
+    def _reload(self, telegram_id: int) -> None:
+        """Read back the rows of a user evicted from memory"""
+        self._evicted.discard(telegram_id)
+        row = self._db.execute("SELECT data FROM sessions WHERE telegram_id = ?", (telegram_id,)).fetchone()
+        if row and telegram_id not in self._sessions:
+            self._sessions[telegram_id] = _restore(row[0])
+        row = self._db.execute(
+            "SELECT chat_id, config_message_id, status_message_id FROM messages WHERE telegram_id = ?",
+            (telegram_id,)
+        ).fetchone()
+        if row:
+            self.messages.restore(telegram_id, MessageRecord(*row))
+    
+    def get(self, telegram_id: int) -> UserSession | None:
+        if telegram_id in self._evicted:
+            self._reload(telegram_id)
+        return super().get(telegram_id)
+    
+    def exists(self, telegram_id: int) -> bool:
+        if telegram_id in self._evicted:
+            self._reload(telegram_id)
+        return super().exists(telegram_id)
+    
+    def create(self, telegram_id: int) -> UserSession:
+        self._evicted.discard(telegram_id)
+        session = super().create(telegram_id)
+        self.save(telegram_id)
+        return session
+    
+    def save(self, telegram_id: int) -> None:
+        self._deleted.discard(telegram_id)
+        self._dirty.add(telegram_id)
+    
+    def delete(self, telegram_id: int) -> None:
+        self._evicted.discard(telegram_id)
+        super().delete(telegram_id)
+        self._dirty.discard(telegram_id)
+        self._deleted.add(telegram_id)
+    
+    def evict(self, telegram_id: int) -> bool:
+        """Drop a user from memory only, reloaded from the database on their next get()"""
+        if telegram_id in self._dirty or telegram_id in self._messages_changed:
+            # not written yet, kept until a flush has stored it
+            return False
+        super().evict(telegram_id)
+        self._evicted.add(telegram_id)
+        return True
+    
+    @property
+    def pending(self) -> int:
+        """Changes not yet written"""
+        return len(self._dirty) + len(self._deleted) + len(self._messages_changed)
+    
+    async def flush(self) -> None:
+        async with self._flush_lock:
+            if not self.pending:
+                return
+            # snapshot on the event loop, write in a thread
+            upserts = [
+                (telegram_id, _dump(self._sessions[telegram_id]))
+                for telegram_id in self._dirty
+                if telegram_id in self._sessions
+            ]
+            deletes = [(telegram_id,) for telegram_id in self._deleted]
+            messages = []
+            message_deletes = []
+            for telegram_id in self._messages_changed:
+                record = self.messages.get(telegram_id)
+                if record is None:
+                    message_deletes.append((telegram_id,))
+                else:
+                    messages.append(
+                        (telegram_id, record.chat_id, record.config_message_id, record.status_message_id)
+                    )
+            changed_messages = set(self._messages_changed)
+            self._dirty.clear()
+            self._deleted.clear()
+            self._messages_changed.clear()
+            try:
+                await asyncio.to_thread(self._write, upserts, deletes, messages, message_deletes)
+            except Exception:
+                # keep the changes for the next flush unless they were superseded meanwhile
+                self._messages_changed |= changed_messages
+                for telegram_id, _ in upserts:
+                    if telegram_id not in self._deleted:
+                        self._dirty.add(telegram_id)
+                for (telegram_id,) in deletes:
+                    if telegram_id not in self._dirty:
+                        self._deleted.add(telegram_id)
+                raise
+    
+    def _write(
+        self,
+        upserts: list[tuple[int, str]],
+        deletes: list[tuple[int]],
+        messages: list[tuple[int, int, int, int]],
+        message_deletes: list[tuple[int]]
+    ) -> None:
+        with self._db:
+            self._db.executemany(
+                "INSERT INTO sessions (telegram_id, data) VALUES (?, ?) "
+                "ON CONFLICT(telegram_id) DO UPDATE SET data = excluded.data",
+                upserts
+            )
+            self._db.executemany("DELETE FROM sessions WHERE telegram_id = ?", deletes)
+            self._db.executemany(
+                "INSERT INTO messages (telegram_id, chat_id, config_message_id, status_message_id) "
+                "VALUES (?, ?, ?, ?) ON CONFLICT(telegram_id) DO UPDATE SET "
+                "chat_id = excluded.chat_id, config_message_id = excluded.config_message_id, "
+                "status_message_id = excluded.status_message_id",
+                messages
+            )
+            self._db.executemany("DELETE FROM messages WHERE telegram_id = ?", message_deletes)
+    
+    def close(self) -> None:
+        self._db.close()
@@ -0,0 +1,46 @@
+"""Services module exports"""
+
+from .completions import (
+    check_session_completions,
+    handle_session_event,
+    notify_completion,
+    schedule_poll,
+    schedule_started_sessions
+)
+from .scheduling import PollScheduler, poll_scheduler
+from .events import SessionEventReceiver
+from .webhook import WebhookReceiver
+from .media import MediaCache, media_cache, WELCOME_IMAGE
+from .pricing import PriceFeed, price_feed, refresh_price
+from .eviction import IdleEvictor, idle_evictor, evict_idle_users
+from .outbox import NotificationOutbox, notification_outbox, deliver_notifications
+from .outbound import PriorityRateLimiter, create_rate_limiter, INTERACTIVE, COMPLETION, BROADCAST
+
+__all__ = [
+    'check_session_completions',
+    'handle_session_event',
+    'notify_completion',
+    'schedule_poll',
+    'schedule_started_sessions',
+    'PollScheduler',
+    'poll_scheduler',
+    'SessionEventReceiver',
+    'WebhookReceiver',
+    'MediaCache',
+    'media_cache',
+    'WELCOME_IMAGE',
+    'PriceFeed',
+    'price_feed',
+    'refresh_price',
+    'IdleEvictor',
+    'idle_evictor',
+    'evict_idle_users',
+    'NotificationOutbox',
+    'notification_outbox',
+    'deliver_notifications',
+    'PriorityRateLimiter',
+    'create_rate_limiter',
+    'INTERACTIVE',
+    'COMPLETION',
+    'BROADCAST'
+]
@@ -0,0 +1,198 @@
+"""Background checks for completed pump sessions"""
+
+import asyncio
+import logging
+import time
+
+from api_client import api
+from config import settings
+from models.session import session_storage
+from utils.priority import background
+from .scheduling import poll_scheduler
+from .outbox import notification_outbox
+
+logger = logging.getLogger(__name__)
+
+# replaces the last session status message once the completion is sent
+STATUS_FINISHED_TEXT = "🏁 Volume pumping session finished, see the summary below."
+
+
+async def notify_completion(context, telegram_id: int, session, status: dict) -> None:
+    """Record the completion in the outbox, reset local session flags, then try to send it"""
+    success_stats = status.get("Success", {})
+    pumped_bnb = float(success_stats.get("pumped_amount_wei", "0")) / 1e18
+    pumped_usd = success_stats.get("pumped_amount_usd", "0")
+    time_spent = int(success_stats.get("time_spent_millis", 0)) / 1000
+    
+    completion_text = (
+        "🎉 **Volume Pumping Completed!**\n\n"
+        f"✅ Successfully generated volume for your token\n"
+        f"💰 Total Pumped: **{pumped_bnb:.4f} BNB** (~${pumped_usd})\n"
+        f"⏱ Time: **{time_spent:.0f}s**\n\n"
+        f"🔗 Token: `{session.token_ca}`\n\n"
+        "Ready to start a new session? Use /start"
+    )
+    
+    # the old config menu is deleted and the status message loses its Refresh button along with the send
+    payload = {"chat_id": telegram_id, "text": completion_text}
+    record = session_storage.messages.get(telegram_id)
+    if record and record.config_message_id:
+        payload["delete_chat_id"] = record.chat_id
+        payload["delete_message_id"] = record.config_message_id
+    if record and record.status_message_id:
+        payload["edit_chat_id"] = record.chat_id
+        payload["edit_message_id"] = record.status_message_id
+        payload["edit_text"] = STATUS_FINISHED_TEXT
+    
+    # one key per session run, a repeated report of the same completion is not sent twice
+    key = f"completion:{telegram_id}:{session.started_at_millis}"
+    await notification_outbox.enqueue(key, telegram_id, payload)
+    
+    # Clean up session
+    session_storage.messages.clear_config_message(telegram_id)
+    session_storage.messages.clear_status_message(telegram_id)
+    session.backend_started = False
+    session.is_paused = False
+    session_storage.save(telegram_id)
+    
+    await notification_outbox.deliver(context.bot, key)
+
+
+def schedule_poll(telegram_id: int, session) -> None:
+    """Poll a session that was started, paused or resumed on the backend, by its current state"""
+    now = time.monotonic()
+    if telegram_id in poll_scheduler:
+        poll_scheduler.reschedule(telegram_id, session, now)
+    else:
+        poll_scheduler.add(telegram_id, session, now)
+
+
+def schedule_started_sessions() -> int:
+    """Track every session running on the backend, at startup; returns how many"""
+    now = time.monotonic()
+    scheduled = 0
+    for telegram_id, session in session_storage.items():
+        if session.backend_started:
+            poll_scheduler.add(telegram_id, session, now)
+            scheduled += 1
+    return scheduled
+
+
+async def _notify_safely(context, telegram_id: int, session, status: dict) -> None:
+    """Send completion message without letting one failure affect the others"""
+    try:
+        await notify_completion(context, telegram_id, session, status)
+    except Exception as e:
+        logger.error(f"Error notifying user {telegram_id} about completion: {e}")
+
+
+async def handle_session_event(context, telegram_id: int, status) -> bool:
+    """
+    Apply a session status pushed by the backend
+    
+    Args:
+        context: Anything with bot (job context or Application)
+        telegram_id: User whose session changed
+        status: Status in the same shape as the status endpoint returns
+        
+    Returns:
+        True if the event was applied, False if there is no matching active session
+    """
+    session = session_storage.get(telegram_id)
+    if not session or not session.backend_started:
+        return False
+    
+    now = time.monotonic()
+    if isinstance(status, dict) and "Success" in status:
+        poll_scheduler.discard(telegram_id)
+        await notify_completion(context, telegram_id, session, status)
+    elif status == "Paused":
+        session.set_paused(True)
+        session_storage.save(telegram_id)
+        poll_scheduler.reschedule(telegram_id, session, now)
+    elif status == "InProcess":
+        session.set_paused(False)
+        session_storage.save(telegram_id)
+        poll_scheduler.reschedule(telegram_id, session, now)
+    else:
+        # errors and unknown states are left for the poller to reconcile
+        logger.warning(f"Session event for user {telegram_id}: {status}")
+        poll_scheduler.retry_soon(telegram_id, now)
+    return True
+
+
+@background
+async def check_session_completions(context):
+    """Background job to check pump sessions whose poll is due"""
+    if poll_scheduler.running:
+        poll_scheduler.overruns += 1
+        logger.warning(
+            f"Poll cycle overrun: previous cycle still running "
+            f"({poll_scheduler.overruns} overruns so far, lag {poll_scheduler.lag(time.monotonic()):.1f}s)"
+        )
+        return
+    
+    poll_scheduler.running = True
+    try:
+        await _run_poll_cycle(context)
+    finally:
+        poll_scheduler.running = False
+
+
+async def _run_poll_cycle(context) -> None:
+    """
+    Check every due session and reschedule it by its estimated completion time
+    
+    Sessions are added to the scheduler when they start (schedule_poll) or
+    at startup (schedule_started_sessions), not looked up here, so a tick
+    costs only the sessions that are due.
+    """
+    cycle_started = time.monotonic()
+    
+    pending = {}
+    for telegram_id in poll_scheduler.pop_due(cycle_started, settings.poll_max_per_tick):
+        session = session_storage.get(telegram_id)
+        if not session or not session.backend_started:
+            poll_scheduler.discard(telegram_id)
+        elif session.is_paused:
+            # paused sessions cannot complete, check back later
+            poll_scheduler.reschedule(telegram_id, session, cycle_started)
+        else:
+            pending[telegram_id] = session
+    
+    if not pending:
+        return
+    
+    checked = set()
+    notifications = []
+    async for statuses in api.iter_session_statuses(pending, timeout=settings.poll_session_timeout):
+        now = time.monotonic()
+        for telegram_id, status_data in statuses.items():
+            session = pending.get(telegram_id)
+            if session is None:
+                continue
+            checked.add(telegram_id)
+            status = status_data.get("status", "Not Started")
+            
+            # If completed successfully, notify right away
+            if isinstance(status, dict) and "Success" in status:
+                poll_scheduler.discard(telegram_id)
+                notifications.append(
+                    asyncio.create_task(_notify_safely(context, telegram_id, session, status))
+                )
+            else:
+                poll_scheduler.reschedule(telegram_id, session, now)
+    
+    now = time.monotonic()
+    for telegram_id in pending.keys() - checked:
+        poll_scheduler.retry_soon(telegram_id, now)
+    
+    if notifications:
+        await asyncio.gather(*notifications)
+    
+    duration = time.monotonic() - cycle_started
+    failed = len(pending) - len(checked)
+    logger.debug(
+        f"Poll cycle: checked {len(pending)} sessions, {failed} failed, took {duration:.2f}s, "
+        f"{len(poll_scheduler)} scheduled, lag {poll_scheduler.lag(time.monotonic()):.1f}s"
+    )
@@ -0,0 +1,73 @@
+"""Receiver for session status events pushed by the backend"""
+
+import asyncio
+import hmac
+import logging
+
+from utils.http_server import HttpServer, HttpRequest, HttpResponse
+from .completions import handle_session_event
+
+logger = logging.getLogger(__name__)
+
+EVENTS_PATH = "/events/session"
+
+
+class SessionEventReceiver:
+    """
+    Embedded HTTP endpoint accepting session status changes
+    
+    Expected request: POST /events/session with
+    {"user_telegram_id": 1, "status": {"Success": {...}} | {"Error": "..."} | "Paused" | "InProcess"}
+    and the shared secret in the X-Events-Secret header. Events are answered
+    with 202 and applied in a task, so a slow Telegram send does not hold the
+    backend's request open.
+    """
+    
+    def __init__(self, application, host: str, port: int, secret: str):
+        if not secret:
+            raise ValueError("A shared secret is required to accept session events")
+        self.application = application
+        self.secret = secret
+        self.server = HttpServer(host, port, max_body_bytes=64 * 1024)
+        self.server.route("POST", EVENTS_PATH, self._handle_event)
+        self._tasks: set[asyncio.Task] = set()
+    
+    @property
+    def port(self) -> int:
+        return self.server.port
+    
+    async def start(self) -> None:
+        await self.server.start()
+    
+    async def stop(self) -> None:
+        await self.server.stop()
+        await self.join()
+    
+    async def join(self) -> None:
+        """Wait until every accepted event has been applied"""
+        while self._tasks:
+            await asyncio.gather(*self._tasks, return_exceptions=True)
+    
+    async def _handle_event(self, request: HttpRequest) -> HttpResponse:
+        if not hmac.compare_digest(request.headers.get("x-events-secret", ""), self.secret):
+            return HttpResponse(401, {"error": "invalid secret"})
+        
+        try:
+            payload = request.json()
+            telegram_id = int(payload["user_telegram_id"])
+            status = payload["status"]
+        except (ValueError, KeyError, TypeError):
+            return HttpResponse(400, {"error": "expected user_telegram_id and status"})
+        
+        task = asyncio.create_task(self._apply(telegram_id, status))
+        self._tasks.add(task)
+        task.add_done_callback(self._tasks.discard)
+        return HttpResponse(202, {"accepted": True})
+    
+    async def _apply(self, telegram_id: int, status) -> None:
+        try:
+            applied = await handle_session_event(self.application, telegram_id, status)
+        except Exception as e:
+            logger.error(f"Error applying session event for user {telegram_id}: {e}")
+            return
+        logger.info(f"Session event for user {telegram_id}: {status!r} ({'applied' if applied else 'ignored'})")
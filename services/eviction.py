@@ -0,0 +1,173 @@
+"""Eviction of per-user state for users who have gone idle"""
+
+import functools
+import logging
+import sys
+import time
+
+import telegram
+from telegram.ext import ConversationHandler
+
+from config import settings
+from models.session import session_storage
+
+logger = logging.getLogger(__name__)
+
+
+def _sizeof(obj) -> int:
+    """Approximate deep size of plain containers, dataclasses and scalars, in bytes"""
+    size = sys.getsizeof(obj)
+    if isinstance(obj, dict):
+        size += sum(_sizeof(key) + _sizeof(value) for key, value in obj.items())
+    elif isinstance(obj, (list, tuple, set, frozenset)):
+        size += sum(_sizeof(item) for item in obj)
+    elif hasattr(obj, "__slots__"):
+        size += sum(_sizeof(getattr(obj, name)) for name in obj.__slots__ if hasattr(obj, name))
+    elif hasattr(obj, "__dict__"):
+        size += _sizeof(vars(obj))
+    return size
+
+
+# PTB has no public way to end one user's conversation; these versions keep it in the private
+# ConversationHandler._conversations dict keyed by (chat_id, user_id, message_id)
+CONVERSATION_STORE_VERSIONS = ((20, 0), (23, 0))
+
+
+def _conversation_store(handler: ConversationHandler) -> dict | None:
+    """The handler's conversation dict, None on a PTB version not known to keep one"""
+    low, high = CONVERSATION_STORE_VERSIONS
+    if not low <= tuple(telegram.__version_info__[:2]) < high:
+        return None
+    store = getattr(handler, "_conversations", None)
+    return store if isinstance(store, dict) else None
+
+
+@functools.cache
+def _warn_no_conversation_store() -> None:
+    logger.warning(
+        f"python-telegram-bot {telegram.__version__} is not known to keep conversations in "
+        f"ConversationHandler._conversations, conversations of idle users are not evicted"
+    )
+
+
+def _conversation_handlers(application) -> list[ConversationHandler]:
+    return [
+        handler
+        for handlers in application.handlers.values()
+        for handler in handlers
+        if isinstance(handler, ConversationHandler)
+    ]
+
+
+def _end_conversations(application, telegram_id: int) -> int:
+    """
+    Drop the conversation state kept for one user, returns bytes released
+    
+    No conversation_timeout is set, since that would also end the conversation
+    of a user whose session is running and leave its pause button dead.
+    """
+    reclaimed = 0
+    for handler in _conversation_handlers(application):
+        conversations = _conversation_store(handler)
+        if conversations is None:
+            _warn_no_conversation_store()
+            continue
+        if not handler.per_user:
+            continue
+        # parts of the key that are disabled are left out
+        user_index = 1 if handler.per_chat else 0
+        for key in [key for key in conversations if key[user_index] == telegram_id]:
+            reclaimed += _sizeof(key) + _sizeof(conversations.pop(key))
+    return reclaimed
+
+
+class IdleEvictor:
+    """Last activity per user; users idle longer than ttl have their state dropped"""
+    
+    def __init__(self, ttl: float):
+        self.ttl = ttl
+        self._last_seen: dict[int, float] = {}
+        self.evicted = 0
+        self.reclaimed_bytes = 0
+    
+    def __len__(self) -> int:
+        return len(self._last_seen)
+    
+    def touch(self, telegram_id: int, now: float | None = None) -> None:
+        """Record activity from a user"""
+        self._last_seen[telegram_id] = time.monotonic() if now is None else now
+    
+    def evict(self, application, now: float | None = None) -> tuple[int, int]:
+        """
+        Drop state of every idle user from session storage, the message registry, user_data and conversations
+        
+        Users with a session running on the backend are kept. Users found in any
+        store without recorded activity (e.g. sessions loaded after a restart)
+        start their idle period now.
+        
+        Returns:
+            Number of users evicted and approximate bytes reclaimed
+        """
+        now = time.monotonic() if now is None else now
+        known = (
+            set(self._last_seen)
+            | {telegram_id for telegram_id, _ in session_storage.items()}
+            | {telegram_id for telegram_id, _ in session_storage.messages.items()}
+            | set(application.user_data)
+        )
+        
+        evicted = reclaimed = 0
+        for telegram_id in known:
+            last_seen = self._last_seen.setdefault(telegram_id, now)
+            if now - last_seen < self.ttl:
+                continue
+            session = session_storage.get(telegram_id)
+            if session and session.backend_started:
+                continue
+            
+            dropped = self._drop(application, telegram_id, session)
+            if not dropped:
+                # kept until its changes are written, or nothing was held for it
+                continue
+            reclaimed += dropped
+            evicted += 1
+        
+        self.evicted += evicted
+        self.reclaimed_bytes += reclaimed
+        return evicted, reclaimed
+    
+    def _drop(self, application, telegram_id: int, session) -> int | None:
+        """
+        Forget everything kept in memory for one user, returns bytes released
+        
+        Persisted sessions and message records stay in the database. Returns
+        None if the storage keeps the user until its pending changes are written,
+        0 if nothing was held for the user.
+        """
+        record = session_storage.messages.get(telegram_id)
+        if not session_storage.evict(telegram_id):
+            return None
+        reclaimed = 0
+        if session:
+            reclaimed += _sizeof(session)
+        if record:
+            reclaimed += _sizeof(record)
+        if telegram_id in application.user_data:
+            reclaimed += _sizeof(application.user_data[telegram_id])
+            application.drop_user_data(telegram_id)
+        reclaimed += _end_conversations(application, telegram_id)
+        del self._last_seen[telegram_id]
+        return reclaimed
+
+
+async def evict_idle_users(context) -> None:
+    """Background job to drop state of users idle longer than idle_ttl_seconds"""
+    evicted, reclaimed = idle_evictor.evict(context.application)
+    if evicted:
+        logger.info(
+            f"Evicted {evicted} idle users, reclaimed ~{reclaimed / 1024:.1f} KiB "
+            f"({idle_evictor.evicted} users, ~{idle_evictor.reclaimed_bytes / 1024:.1f} KiB since start)"
+        )
+
+
+idle_evictor = IdleEvictor(ttl=settings.idle_ttl_seconds)
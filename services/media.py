@@ -0,0 +1,78 @@
+"""In-memory media assets with Telegram file_id reuse"""
+
+import logging
+from pathlib import Path
+from typing import Awaitable, Callable
+
+from telegram import InputFile, Message
+from telegram.error import BadRequest
+
+logger = logging.getLogger(__name__)
+
+ASSETS_DIR = Path(__file__).parent.parent / "assets"
+
+WELCOME_IMAGE = "welcome.jpg"
+
+# BadRequest messages meaning the cached file_id itself was refused
+STALE_FILE_ID_ERRORS = ("file identifier", "file_id", "file reference")
+
+
+def _stale_file_id(error: BadRequest) -> bool:
+    message = error.message.lower()
+    return any(marker in message for marker in STALE_FILE_ID_ERRORS)
+
+
+class MediaCache:
+    """Keeps asset bytes in memory and reuses the file_id Telegram returns after the first upload"""
+    
+    def __init__(self):
+        self._data: dict[str, bytes] = {}
+        self._file_ids: dict[str, str] = {}
+    
+    def preload(self, name: str, path: Path | None = None) -> bool:
+        """Read asset into memory, call once at startup. Returns False if the file is missing."""
+        path = path or ASSETS_DIR / name
+        try:
+            self._data[name] = path.read_bytes()
+        except FileNotFoundError:
+            logger.warning(f"Media asset not found: {path}")
+            return False
+        self._file_ids.pop(name, None)
+        return True
+    
+    def has(self, name: str) -> bool:
+        """Check if asset is loaded"""
+        return name in self._data
+    
+    def file_id(self, name: str) -> str | None:
+        """Cached Telegram file_id of asset, if it was uploaded already"""
+        return self._file_ids.get(name)
+    
+    async def send_photo(self, bot, name: str, **kwargs) -> Message:
+        """bot.send_photo with the cached asset"""
+        return await self._send(name, lambda photo: bot.send_photo(photo=photo, **kwargs))
+    
+    async def reply_photo(self, message: Message, name: str, **kwargs) -> Message:
+        """message.reply_photo with the cached asset"""
+        return await self._send(name, lambda photo: message.reply_photo(photo=photo, **kwargs))
+    
+    async def _send(self, name: str, send: Callable[[object], Awaitable[Message]]) -> Message:
+        file_id = self._file_ids.get(name)
+        if file_id:
+            try:
+                return await send(file_id)
+            except BadRequest as e:
+                # other errors (caption, chat) would fail the upload the same way
+                if not _stale_file_id(e):
+                    raise
+                # file_id no longer valid for this bot, upload the bytes again
+                logger.warning(f"Cached file_id for {name} rejected ({e}), re-uploading")
+                self._file_ids.pop(name, None)
+        
+        message = await send(InputFile(self._data[name], filename=name))
+        if message and message.photo:
+            self._file_ids[name] = message.photo[-1].file_id
+        return message
+
+
+media_cache = MediaCache()
@@ -0,0 +1,191 @@
+"""Rate limiting of outbound Telegram requests with priorities"""
+
+import asyncio
+import itertools
+import logging
+import time
+from datetime import timedelta
+from typing import Any, Callable, Coroutine, Dict, Optional
+
+from telegram.error import RetryAfter
+from telegram.ext import BaseRateLimiter
+
+from config import settings
+from utils.metrics import LatencyRecorder
+
+logger = logging.getLogger(__name__)
+
+# rate_limit_args values, lower goes first
+INTERACTIVE = 0
+COMPLETION = 1
+BROADCAST = 2
+
+PRIORITY_NAMES = {INTERACTIVE: "interactive", COMPLETION: "completion", BROADCAST: "broadcast"}
+
+
+class TokenBucket:
+    """rate tokens per second, up to burst"""
+    
+    def __init__(self, rate: float, burst: float, now: float):
+        self.rate = rate
+        self.burst = burst
+        self.tokens = burst
+        self.updated = now
+    
+    def refill(self, now: float) -> None:
+        self.tokens = min(self.burst, self.tokens + (now - self.updated) * self.rate)
+        self.updated = now
+    
+    def wait_time(self) -> float:
+        """Seconds until a token is available, after refill"""
+        return 0.0 if self.tokens >= 1 else (1 - self.tokens) / self.rate
+    
+    @property
+    def full(self) -> bool:
+        return self.tokens >= self.burst
+
+
+class PriorityRateLimiter(BaseRateLimiter[int]):
+    """
+    Global and per-chat token buckets in front of every Bot API request
+    
+    Waiting requests are granted in priority order (rate_limit_args, interactive
+    by default); one whose chat bucket is empty does not hold up requests to
+    other chats. A RetryAfter pauses all requests for retry_after seconds and
+    the request is queued again, up to max_retries times.
+    """
+    
+    def __init__(
+        self,
+        global_rate: float,
+        chat_rate: float,
+        chat_burst: float,
+        group_rate: float,
+        max_retries: int = 3
+    ):
+        self.global_rate = global_rate
+        self.chat_rate = chat_rate
+        self.chat_burst = chat_burst
+        self.group_rate = group_rate
+        self.max_retries = max_retries
+        self._global: TokenBucket | None = None
+        self._chats: dict[int | str, TokenBucket] = {}
+        # entries are [priority, seq, chat_id, future]
+        self._queue: list[list] = []
+        self._seq = itertools.count()
+        self._paused_until = 0.0
+        self._timer: asyncio.TimerHandle | None = None
+        self._wait = {priority: LatencyRecorder() for priority in PRIORITY_NAMES}
+        self.retries = 0
+    
+    async def initialize(self) -> None:
+        self._global = TokenBucket(self.global_rate, self.global_rate, time.monotonic())
+    
+    async def shutdown(self) -> None:
+        if self._timer:
+            self._timer.cancel()
+        for *_, future in self._queue:
+            future.cancel()
+        self._queue.clear()
+    
+    def _chat_bucket(self, chat_id: int | str, now: float) -> TokenBucket:
+        bucket = self._chats.get(chat_id)
+        if bucket is None:
+            # negative IDs and @usernames are groups and channels, which have the stricter limit
+            is_group = isinstance(chat_id, str) or chat_id < 0
+            rate = self.group_rate if is_group else self.chat_rate
+            bucket = self._chats[chat_id] = TokenBucket(rate, 1 if is_group else self.chat_burst, now)
+        bucket.refill(now)
+        return bucket
+    
+    def _dispatch(self) -> None:
+        """Grant queued requests that have tokens, then wake up again when the next one can go"""
+        self._timer = None
+        loop = asyncio.get_running_loop()
+        now = time.monotonic()
+        if now < self._paused_until:
+            self._timer = loop.call_at(loop.time() + self._paused_until - now, self._dispatch)
+            return
+        
+        self._global.refill(now)
+        next_wait = None
+        waiting = []
+        for entry in sorted(self._queue):
+            priority, _, chat_id, future = entry
+            if future.done():
+                continue
+            chat = self._chat_bucket(chat_id, now) if chat_id is not None else None
+            wait = max(self._global.wait_time(), chat.wait_time() if chat else 0.0)
+            if wait > 0:
+                waiting.append(entry)
+                next_wait = wait if next_wait is None else min(next_wait, wait)
+                continue
+            self._global.tokens -= 1
+            if chat:
+                chat.tokens -= 1
+            future.set_result(None)
+        
+        self._queue = waiting
+        if next_wait is not None:
+            self._timer = loop.call_at(loop.time() + next_wait, self._dispatch)
+        elif len(self._chats) > 1000:
+            # idle buckets hold no state worth keeping
+            self._chats = {chat_id: bucket for chat_id, bucket in self._chats.items() if not bucket.full}
+    
+    async def _acquire(self, priority: int, chat_id: int | str | None) -> None:
+        future = asyncio.get_running_loop().create_future()
+        self._queue.append([priority, next(self._seq), chat_id, future])
+        # a pending timer may be waiting on another chat, this request might go now
+        if self._timer:
+            self._timer.cancel()
+        self._dispatch()
+        await future
+    
+    async def process_request(
+        self,
+        callback: Callable[..., Coroutine[Any, Any, Any]],
+        args: Any,
+        kwargs: Dict[str, Any],
+        endpoint: str,
+        data: Dict[str, Any],
+        rate_limit_args: Optional[int],
+    ) -> Any:
+        priority = INTERACTIVE if rate_limit_args is None else rate_limit_args
+        chat_id = data.get("chat_id")
+        
+        for attempt in range(self.max_retries + 1):
+            started = time.monotonic()
+            await self._acquire(priority, chat_id)
+            self._wait[priority].record(time.monotonic() - started)
+            try:
+                return await callback(*args, **kwargs)
+            except RetryAfter as e:
+                if attempt == self.max_retries:
+                    raise
+                retry_after = e.retry_after
+                if isinstance(retry_after, timedelta):
+                    retry_after = retry_after.total_seconds()
+                self.retries += 1
+                self._paused_until = max(self._paused_until, time.monotonic() + float(retry_after))
+                logger.warning(f"Flood limit on {endpoint}, pausing outbound requests for {retry_after}s")
+    
+    def stats(self) -> dict[str, dict[str, float]]:
+        """Queued requests and wait for a send slot (seconds) per priority"""
+        depth = {priority: 0 for priority in PRIORITY_NAMES}
+        for priority, *_ in self._queue:
+            depth[priority] += 1
+        return {
+            name: {"queued": depth[priority], **self._wait[priority].stats()}
+            for priority, name in PRIORITY_NAMES.items()
+        }
+
+
+def create_rate_limiter() -> PriorityRateLimiter:
+    """Rate limiter configured from settings"""
+    return PriorityRateLimiter(
+        global_rate=settings.telegram_global_rate,
+        chat_rate=settings.telegram_chat_rate,
+        chat_burst=settings.telegram_chat_burst,
+        group_rate=settings.telegram_group_rate,
+        max_retries=settings.telegram_max_retries
+    )
@@ -0,0 +1,242 @@
+"""Durable outbox for completion notifications"""
+
+import asyncio
+import json
+import logging
+import sqlite3
+import threading
+import time
+
+from telegram.error import BadRequest, Forbidden
+
+from config import settings
+from utils.resilience import backoff_delay
+from .media import media_cache, WELCOME_IMAGE
+from .outbound import COMPLETION
+
+logger = logging.getLogger(__name__)
+
+PENDING = "pending"
+DELIVERED = "delivered"
+FAILED = "failed"
+
+
+async def _send(bot, payload: dict) -> None:
+    """Send one notification: remove the stale config menu, close the status message, then the message itself"""
+    if payload.get("delete_message_id"):
+        try:
+            await bot.delete_message(
+                chat_id=payload["delete_chat_id"],
+                message_id=payload["delete_message_id"],
+                rate_limit_args=COMPLETION
+            )
+        except Exception:
+            pass
+    
+    if payload.get("edit_message_id"):
+        # drops the Refresh button along with the old text
+        try:
+            await bot.edit_message_text(
+                payload["edit_text"],
+                chat_id=payload["edit_chat_id"],
+                message_id=payload["edit_message_id"],
+                rate_limit_args=COMPLETION
+            )
+        except Exception:
+            pass
+    
+    if media_cache.has(WELCOME_IMAGE):
+        await media_cache.send_photo(
+            bot,
+            WELCOME_IMAGE,
+            chat_id=payload["chat_id"],
+            caption=payload["text"],
+            parse_mode='Markdown',
+            rate_limit_args=COMPLETION
+        )
+    else:
+        await bot.send_message(
+            chat_id=payload["chat_id"],
+            text=payload["text"],
+            parse_mode='Markdown',
+            rate_limit_args=COMPLETION
+        )
+
+
+class NotificationOutbox:
+    """
+    Notifications written to SQLite before they are sent
+    
+    enqueue() stores a rendered message under an idempotent delivery key, so
+    a repeated report of the same completion is stored and sent once, and a
+    failed send or a restart does not lose it. deliver() makes one attempt;
+    run_due() retries pending messages from a pool of workers with exponential
+    backoff until max_attempts. Delivery is at least once: a crash between a
+    send and its record repeats that message.
+    """
+    
+    def __init__(
+        self,
+        path: str,
+        workers: int = 4,
+        max_attempts: int = 10,
+        base_delay: float = 5.0,
+        max_delay: float = 600.0,
+        retention: float = 7 * 86400
+    ):
+        self.path = path
+        self.workers = workers
+        self.max_attempts = max_attempts
+        self.base_delay = base_delay
+        self.max_delay = max_delay
+        self.retention = retention
+        self._db: sqlite3.Connection | None = None
+        # database calls run in worker threads, one at a time
+        self._lock = threading.Lock()
+        self._in_flight: set[str] = set()
+        self.delivered = 0
+        self.retried = 0
+        self.failed = 0
+    
+    def _connect(self) -> sqlite3.Connection:
+        if self._db is None:
+            self._db = sqlite3.connect(self.path, check_same_thread=False)
+            self._db.execute("PRAGMA journal_mode=WAL")
+            self._db.execute(
+                "CREATE TABLE IF NOT EXISTS outbox ("
+                "key TEXT PRIMARY KEY, telegram_id INTEGER NOT NULL, payload TEXT NOT NULL, "
+                "state TEXT NOT NULL, attempts INTEGER NOT NULL, next_attempt_at REAL NOT NULL, "
+                "updated_at REAL NOT NULL, last_error TEXT)"
+            )
+            self._db.execute("CREATE INDEX IF NOT EXISTS outbox_due ON outbox (state, next_attempt_at)")
+            self._db.commit()
+        return self._db
+    
+    def _execute(self, sql: str, params: tuple = ()) -> sqlite3.Cursor:
+        with self._lock:
+            db = self._connect()
+            with db:
+                return db.execute(sql, params)
+    
+    def _query(self, sql: str, params: tuple = ()) -> list[tuple]:
+        with self._lock:
+            return self._connect().execute(sql, params).fetchall()
+    
+    async def enqueue(self, key: str, telegram_id: int, payload: dict) -> bool:
+        """Store a notification for delivery, False if the key was already stored"""
+        now = time.time()
+        cursor = await asyncio.to_thread(
+            self._execute,
+            "INSERT OR IGNORE INTO outbox "
+            "(key, telegram_id, payload, state, attempts, next_attempt_at, updated_at) "
+            "VALUES (?, ?, ?, ?, 0, ?, ?)",
+            (key, telegram_id, json.dumps(payload), PENDING, now, now)
+        )
+        return cursor.rowcount == 1
+    
+    async def deliver(self, bot, key: str) -> bool:
+        """
+        Attempt one pending notification and record the outcome
+        
+        Returns:
+            True if it was sent now, False if it failed, is not pending or is being sent already
+        """
+        if key in self._in_flight:
+            return False
+        self._in_flight.add(key)
+        try:
+            rows = await asyncio.to_thread(
+                self._query, "SELECT payload, attempts FROM outbox WHERE key = ? AND state = ?", (key, PENDING)
+            )
+            if not rows:
+                return False
+            payload, attempts = json.loads(rows[0][0]), rows[0][1] + 1
+            
+            try:
+                await _send(bot, payload)
+            except (Forbidden, BadRequest) as e:
+                # bot blocked or chat gone, another attempt would fail the same way
+                await self._record(key, FAILED, attempts, time.time(), repr(e))
+                self.failed += 1
+                logger.warning(f"Dropping notification {key}: {e}")
+                return False
+            except Exception as e:
+                if attempts >= self.max_attempts:
+                    await self._record(key, FAILED, attempts, time.time(), repr(e))
+                    self.failed += 1
+                    logger.error(f"Giving up on notification {key} after {attempts} attempts: {e}")
+                    return False
+                delay = backoff_delay(attempts - 1, self.base_delay, self.max_delay)
+                await self._record(key, PENDING, attempts, time.time() + delay, repr(e))
+                self.retried += 1
+                logger.warning(f"Notification {key} failed ({e!r}), retrying in {delay:.1f}s")
+                return False
+            
+            await self._record(key, DELIVERED, attempts, time.time(), None)
+            self.delivered += 1
+            return True
+        finally:
+            self._in_flight.discard(key)
+    
+    async def _record(self, key: str, state: str, attempts: int, next_attempt_at: float, error: str | None) -> None:
+        await asyncio.to_thread(
+            self._execute,
+            "UPDATE outbox SET state = ?, attempts = ?, next_attempt_at = ?, updated_at = ?, last_error = ? "
+            "WHERE key = ?",
+            (state, attempts, next_attempt_at, time.time(), error, key)
+        )
+    
+    async def run_due(self, bot, limit: int = 1000) -> int:
+        """Deliver pending notifications whose next attempt is due, returns how many were sent"""
+        now = time.time()
+        rows = await asyncio.to_thread(
+            self._query,
+            "SELECT key FROM outbox WHERE state = ? AND next_attempt_at <= ? ORDER BY next_attempt_at LIMIT ?",
+            (PENDING, now, limit)
+        )
+        keys = iter([key for key, in rows if key not in self._in_flight])
+        sent = 0
+        
+        async def worker() -> None:
+            nonlocal sent
+            for key in keys:
+                if await self.deliver(bot, key):
+                    sent += 1
+        
+        await asyncio.gather(*(worker() for _ in range(self.workers)))
+        
+        await asyncio.to_thread(
+            self._execute,
+            "DELETE FROM outbox WHERE state != ? AND updated_at < ?",
+            (PENDING, now - self.retention)
+        )
+        return sent
+    
+    async def pending(self) -> int:
+        rows = await asyncio.to_thread(self._query, "SELECT COUNT(*) FROM outbox WHERE state = ?", (PENDING,))
+        return rows[0][0]
+    
+    def stats(self) -> dict[str, int]:
+        return {"delivered": self.delivered, "retried": self.retried, "failed": self.failed}
+    
+    def close(self) -> None:
+        if self._db is not None:
+            self._db.close()
+            self._db = None
+
+
+async def deliver_notifications(context) -> None:
+    """Background job to retry notifications that could not be sent, including those left by a restart"""
+    sent = await notification_outbox.run_due(context.bot)
+    if sent:
+        logger.info(f"Delivered {sent} queued notifications")
+
+
+notification_outbox = NotificationOutbox(
+    settings.outbox_db_path,
+    workers=settings.outbox_workers,
+    max_attempts=settings.outbox_max_attempts,
+    base_delay=settings.outbox_retry_base_delay,
+    max_delay=settings.outbox_retry_max_delay,
+    retention=settings.outbox_retention_seconds
+)
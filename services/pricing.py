@@ -0,0 +1,58 @@
+"""BNB/USD price kept in memory for local conversions"""
+
+import logging
+import time
+from decimal import Decimal
+
+from api_client import api
+from config import settings
+from utils.converters import wei_to_bnb
+from utils.priority import background
+
+logger = logging.getLogger(__name__)
+
+ONE_BNB_WEI = "1000000000000000000"  # 10^18
+
+
+class PriceFeed:
+    """Refreshes the BNB/USD rate in the background and converts amounts locally"""
+    
+    def __init__(self, max_age: float):
+        self.max_age = max_age
+        self._price: Decimal | None = None
+        self._updated_at = 0.0
+    
+    def price(self) -> Decimal | None:
+        """Current BNB/USD rate, None if never fetched or older than max_age"""
+        if self._price is None or time.monotonic() - self._updated_at > self.max_age:
+            return None
+        return self._price
+    
+    async def refresh(self) -> Decimal:
+        """Fetch the rate from backend by converting exactly one BNB"""
+        usd_data = await api.bnb_to_usd(ONE_BNB_WEI)
+        self._price = Decimal(str(usd_data["amount_usd"]))
+        self._updated_at = time.monotonic()
+        return self._price
+    
+    async def bnb_to_usd(self, amount_wei: str) -> Decimal:
+        """Convert wei to USD, through the backend only if the cached rate is stale"""
+        price = self.price()
+        if price is not None:
+            return wei_to_bnb(amount_wei) * price
+        
+        logger.info("BNB price is stale, converting through backend")
+        usd_data = await api.bnb_to_usd(amount_wei)
+        return Decimal(str(usd_data["amount_usd"]))
+
+
+@background
+async def refresh_price(context) -> None:
+    """Background job to keep the BNB/USD rate fresh"""
+    try:
+        await price_feed.refresh()
+    except Exception as e:
+        logger.error(f"Error refreshing BNB price: {e}")
+
+
+price_feed = PriceFeed(max_age=settings.price_max_age_seconds)
@@ -0,0 +1,122 @@
+"""Adaptive per-session poll scheduling"""
+
+import heapq
+import random
+import time
+
+from config import settings
+
+
+class PollScheduler:
+    """Min-heap of sessions keyed by the time their next status check is due"""
+    
+    def __init__(
+        self,
+        min_interval: float,
+        max_interval: float,
+        jitter: float = 0.0,
+        swap_overhead_millis: int = 0,
+        rng: random.Random | None = None,
+        clock=time.time
+    ):
+        self.min_interval = min_interval
+        self.max_interval = max_interval
+        self.jitter = jitter
+        self.swap_overhead_millis = swap_overhead_millis
+        self._rng = rng or random.Random()
+        # wall clock for persisted session start times, the now arguments are monotonic
+        self._clock = clock
+        # heap entries are (due_at, telegram_id); stale entries are skipped lazily
+        self._heap: list[tuple[float, int]] = []
+        self._due: dict[int, float] = {}
+        # first seen, for sessions without a recorded start time
+        self._started_at: dict[int, float] = {}
+        self.running = False
+        self.overruns = 0
+    
+    def __len__(self) -> int:
+        return len(self._due)
+    
+    def __contains__(self, telegram_id: int) -> bool:
+        return telegram_id in self._due
+    
+    def estimate_eta(self, session) -> float:
+        """Estimate total session duration in seconds from its amounts and delay"""
+        pump_amount = session.pump_amount_wei
+        swap_amount = session.swap_amount_wei
+        if pump_amount <= 0 or swap_amount <= 0:
+            return 0.0
+        
+        swaps = -(-pump_amount // swap_amount)
+        return swaps * (session.delay_millis + self.swap_overhead_millis) / 1000
+    
+    def next_interval(self, telegram_id: int, session, now: float) -> float:
+        """Seconds until the next check: long while far from the ETA, short when close"""
+        if session.is_paused:
+            interval = self.max_interval
+        else:
+            remaining = self.estimate_eta(session) - self._elapsed(telegram_id, session, now)
+            interval = min(max(remaining / 2, self.min_interval), self.max_interval)
+        
+        if self.jitter:
+            interval *= self._rng.uniform(1 - self.jitter, 1 + self.jitter)
+        return max(interval, 0.0)
+    
+    def _elapsed(self, telegram_id: int, session, now: float) -> float:
+        """Seconds the session has been running, from its persisted start and pauses when known"""
+        elapsed = session.active_seconds(int(self._clock() * 1000))
+        if elapsed is None:
+            elapsed = now - self._started_at.get(telegram_id, now)
+        return elapsed
+    
+    def add(self, telegram_id: int, session, now: float) -> None:
+        """Start tracking a session; the first check is spread randomly over its interval"""
+        if telegram_id in self._due:
+            return
+        self._started_at[telegram_id] = now
+        interval = self.next_interval(telegram_id, session, now)
+        self._push(telegram_id, now + self._rng.uniform(0, interval))
+    
+    def reschedule(self, telegram_id: int, session, now: float) -> None:
+        """Schedule the next check of a session"""
+        self._push(telegram_id, now + self.next_interval(telegram_id, session, now))
+    
+    def retry_soon(self, telegram_id: int, now: float) -> None:
+        """Schedule a failed check to run again after the minimum interval"""
+        self._push(telegram_id, now + self.min_interval)
+    
+    def discard(self, telegram_id: int) -> None:
+        """Stop tracking a session"""
+        self._due.pop(telegram_id, None)
+        self._started_at.pop(telegram_id, None)
+    
+    def pop_due(self, now: float, limit: int | None = None) -> list[int]:
+        """Pop sessions whose check is due, earliest first"""
+        due = []
+        while self._heap and self._heap[0][0] <= now and (limit is None or len(due) < limit):
+            due_at, telegram_id = heapq.heappop(self._heap)
+            if self._due.get(telegram_id) != due_at:
+                continue
+            del self._due[telegram_id]
+            due.append(telegram_id)
+        return due
+    
+    def lag(self, now: float) -> float:
+        """How many seconds the most overdue check is behind schedule"""
+        while self._heap and self._due.get(self._heap[0][1]) != self._heap[0][0]:
+            heapq.heappop(self._heap)
+        if not self._heap:
+            return 0.0
+        return max(now - self._heap[0][0], 0.0)
+    
+    def _push(self, telegram_id: int, due_at: float) -> None:
+        self._due[telegram_id] = due_at
+        heapq.heappush(self._heap, (due_at, telegram_id))
+
+
+poll_scheduler = PollScheduler(
+    min_interval=settings.poll_min_interval_seconds,
+    max_interval=settings.poll_max_interval_seconds,
+    jitter=settings.poll_jitter,
+    swap_overhead_millis=settings.poll_swap_overhead_millis
+)
@@ -0,0 +1,103 @@
+"""Webhook receiver for Telegram updates, an alternative to getUpdates polling"""
+
+import asyncio
+import hmac
+import logging
+
+from telegram import Update
+
+from utils.http_server import HttpServer, HttpRequest, HttpResponse
+
+logger = logging.getLogger(__name__)
+
+SECRET_HEADER = "x-telegram-bot-api-secret-token"
+
+
+class WebhookReceiver:
+    """
+    Embedded HTTP endpoint Telegram posts updates to
+    
+    Requests without the secret token set on setWebhook are refused. Accepted
+    updates go to a bounded queue and are answered at once; when the queue is
+    full the update gets 503 and Telegram delivers it again later. Workers hand
+    queued updates to the application's update processor, so concurrent_updates
+    applies as with polling.
+    """
+    
+    def __init__(
+        self,
+        application,
+        host: str,
+        port: int,
+        path: str,
+        secret: str,
+        queue_size: int = 1000,
+        drain_timeout: float = 10.0
+    ):
+        self.application = application
+        self.path = path
+        self.secret = secret
+        self.drain_timeout = drain_timeout
+        self.queue: asyncio.Queue[Update] = asyncio.Queue(maxsize=queue_size)
+        self.server = HttpServer(host, port, max_body_bytes=1024 * 1024)
+        self.server.route("POST", path, self._handle_update)
+        self._workers: list[asyncio.Task] = []
+        self.rejected = 0
+    
+    @property
+    def port(self) -> int:
+        return self.server.port
+    
+    async def start(self) -> None:
+        workers = max(1, self.application.update_processor.max_concurrent_updates)
+        self._workers = [asyncio.create_task(self._work()) for _ in range(workers)]
+        await self.server.start()
+    
+    async def stop(self) -> None:
+        """Stop accepting updates, finish the queued ones for up to drain_timeout, then stop the workers"""
+        await self.server.stop()
+        try:
+            await asyncio.wait_for(self.queue.join(), self.drain_timeout)
+        except asyncio.TimeoutError:
+            logger.warning(
+                f"Webhook queue not drained within {self.drain_timeout}s, "
+                f"dropping {self.queue.qsize()} acknowledged updates"
+            )
+        for worker in self._workers:
+            worker.cancel()
+        await asyncio.gather(*self._workers, return_exceptions=True)
+        self._workers = []
+    
+    async def _handle_update(self, request: HttpRequest) -> HttpResponse:
+        if not hmac.compare_digest(request.headers.get(SECRET_HEADER, ""), self.secret):
+            return HttpResponse(403, {"error": "invalid secret token"})
+        
+        try:
+            update = Update.de_json(request.json(), self.application.bot)
+        except (ValueError, KeyError, TypeError):
+            return HttpResponse(400, {"error": "invalid update"})
+        if update is None:
+            return HttpResponse(400, {"error": "invalid update"})
+        
+        try:
+            self.queue.put_nowait(update)
+        except asyncio.QueueFull:
+            self.rejected += 1
+            logger.warning(f"Webhook queue full, update {update.update_id} left for Telegram to redeliver")
+            return HttpResponse(503, {"error": "busy"})
+        return HttpResponse(200)
+    
+    async def _work(self) -> None:
+        while True:
+            update = await self.queue.get()
+            try:
+                await self.application.update_processor.process_update(
+                    update, self.application.process_update(update)
+                )
+            except Exception as e:
+                logger.error(f"Error processing update {update.update_id}: {e}", exc_info=True)
+            finally:
+                self.queue.task_done()
+    
+    def stats(self) -> dict[str, int]:
+        return {"queued": self.queue.qsize(), "capacity": self.queue.maxsize, "rejected": self.rejected}
@@ -0,0 +1,18 @@
+"""
+Fixtures shared by the test modules
+"""
+
+import httpx
+import pytest
+
+from api_client import BackendAPI
+
+
+@pytest.fixture
+def make_api():
+    """Factory of BackendAPI clients talking to an in-process fake backend"""
+    def make(handler) -> BackendAPI:
+        api = BackendAPI()
+        api.client = httpx.AsyncClient(transport=httpx.MockTransport(handler))
+        return api
+    return make
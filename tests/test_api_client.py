@@ -0,0 +1,839 @@
+"""
+Tests for BackendAPI client behaviour
+Backend is replaced with an in-process httpx.MockTransport
+"""
+
+import asyncio
+import json
+import httpx
+import pytest
+from unittest.mock import patch
+
+from api_client import BackendAPI
+from config import settings
+from utils.cache import TTLCache
+from utils.resilience import CircuitBreaker, CircuitOpenError
+from utils.http_server import HttpServer, HttpRequest, HttpResponse
+from utils.deadline import DeadlineExceeded, with_deadline
+from utils.priority import PriorityDispatcher, INTERACTIVE, BACKGROUND, background
+from utils.admission import AdmissionController
+from utils.balancing import ReplicaBalancer
+from utils.hedging import HedgeBudget, hedged
+
+
+class TestBalanceCache:
+    """Test per-user wallet balance caching"""
+    
+    @pytest.mark.asyncio
+    async def test_cached_within_ttl_and_fresh_on_demand(self, make_api):
+        """Test: repeated reads hit the cache, max_age=0 goes to the backend"""
+        calls = []
+        
+        def handler(request):
+            calls.append(request.url.path)
+            return httpx.Response(200, json={"ui": str(len(calls)), "raw": "0"})
+        
+        api = make_api(handler)
+        assert (await api.check_wallet_balance(1))["ui"] == "1"
+        assert (await api.check_wallet_balance(1))["ui"] == "1"
+        assert (await api.check_wallet_balance(2))["ui"] == "2"
+        assert (await api.check_wallet_balance(1, max_age=0))["ui"] == "3"
+        assert (await api.check_wallet_balance(1))["ui"] == "3"
+        assert len(calls) == 3
+        
+        # positional max_age is honoured too
+        assert (await api.check_wallet_balance(1, 0))["ui"] == "4"
+        assert len(calls) == 4
+    
+    @pytest.mark.asyncio
+    async def test_session_actions_invalidate(self, make_api):
+        """Test: start, pause and resume drop the cached balance"""
+        balance_calls = 0
+        
+        def handler(request):
+            nonlocal balance_calls
+            if request.url.path.endswith("/wallet/balance"):
+                balance_calls += 1
+                return httpx.Response(200, json={"ui": "1.0", "raw": "0"})
+            return httpx.Response(200, json={"created": True})
+        
+        api = make_api(handler)
+        await api.check_wallet_balance(1)
+        await api.pause_session(1)
+        await api.check_wallet_balance(1)
+        await api.resume_session(1)
+        await api.check_wallet_balance(1)
+        await api.start_session(1, "0x123", "1", "1")
+        await api.check_wallet_balance(1)
+        assert balance_calls == 4
+    
+    @pytest.mark.asyncio
+    async def test_read_racing_invalidation_is_not_reused(self, make_api):
+        """Test: a read in flight across a pause neither serves a forced-fresh read nor refills the cache"""
+        balance = "1.0"
+        release = asyncio.Event()
+        
+        async def handler(request):
+            if request.url.path.endswith("/wallet/balance"):
+                answer = balance
+                if answer == "1.0":
+                    await release.wait()
+                return httpx.Response(200, json={"ui": answer, "raw": "0"})
+            return httpx.Response(200)
+        
+        api = make_api(handler)
+        stale_read = asyncio.create_task(api.check_wallet_balance(1))
+        await asyncio.sleep(0.01)
+        
+        await api.pause_session(1)
+        balance = "2.0"
+        assert (await api.check_wallet_balance(1, max_age=0))["ui"] == "2.0"
+        
+        release.set()
+        assert (await stale_read)["ui"] == "1.0"
+        assert (await api.check_wallet_balance(1))["ui"] == "2.0"
+
+
+class TestResponseCache:
+    """Test per-endpoint cache policies"""
+    
+    @pytest.mark.asyncio
+    async def test_token_lookups_shared_and_negative_cached(self, make_api):
+        """Test: token answers are shared across callers, unsupported answers cached too"""
+        calls = []
+        
+        def handler(request):
+            calls.append(request.url.path)
+            return httpx.Response(200, json={"is_supported": "0xaaa" in request.url.path.lower()})
+        
+        api = make_api(handler)
+        assert (await api.check_token_supported("0xAAA"))["is_supported"]
+        assert (await api.check_token_supported("0xaaa"))["is_supported"]
+        assert not (await api.check_token_supported("0xbbb"))["is_supported"]
+        assert not (await api.check_token_supported("0xbbb"))["is_supported"]
+        assert len(calls) == 2
+        
+        stats = api.cache_stats()["token_supported"]
+        assert stats["hits"] == 2 and stats["misses"] == 2
+    
+    @pytest.mark.asyncio
+    async def test_wallet_cached_and_invalidated(self, make_api):
+        """Test: wallet is cached per user until explicitly invalidated"""
+        calls = []
+        
+        def handler(request):
+            calls.append(request.url.path)
+            return httpx.Response(200, json={"wallet_dto": {"evm_address": "0xabc"}})
+        
+        api = make_api(handler)
+        await api.get_or_create_wallet(1)
+        await api.get_or_create_wallet(telegram_id=1)
+        await api.get_or_create_wallet(2)
+        api.invalidate("wallet", 1)
+        await api.get_or_create_wallet(1)
+        assert calls == ["/user/1/wallet", "/user/2/wallet", "/user/1/wallet"]
+    
+    @pytest.mark.asyncio
+    async def test_errors_are_not_cached(self, make_api):
+        """Test: failed requests are retried on the next call"""
+        responses = [httpx.Response(500), httpx.Response(200, json={"pools": []})]
+        api = make_api(lambda request: responses.pop(0))
+        
+        with patch('api_client.settings.backend_retry_attempts', 1), pytest.raises(httpx.HTTPStatusError):
+            await api.get_token_pools("0xaaa")
+        assert await api.get_token_pools("0xaaa") == {"pools": []}
+
+
+class TestTTLCache:
+    """Test LRU eviction"""
+    
+    def test_lru_eviction(self):
+        cache = TTLCache(max_entries=2)
+        cache.set("a", 1)
+        cache.set("b", 2)
+        cache.get("a")
+        cache.set("c", 3)
+        
+        assert cache.get("b") is None
+        assert cache.get("a") == 1 and cache.get("c") == 3
+        assert cache.stats()["evictions"] == 1
+    
+    def test_fill_started_before_invalidate_is_dropped(self):
+        """Test: set() with a generation taken before invalidate() stores nothing"""
+        cache = TTLCache(max_entries=1)
+        generation = cache.generation("a")
+        cache.invalidate("a")
+        cache.set("a", 1, generation=generation)
+        assert cache.get("a") is None
+        
+        cache.set("a", 2, generation=cache.generation("a"))
+        assert cache.get("a") == 2
+        
+        # still dropped once tracking of "a" gives way to "b"
+        generation = cache.generation("a")
+        cache.invalidate("a")
+        cache.invalidate("b")
+        cache.set("a", 3, generation=generation)
+        assert cache.get("a") is None
+
+
+class TestMaxSwapMemo:
+    """Test the shared max swap amount memo"""
+    
+    @pytest.mark.asyncio
+    async def test_prewarmed_amounts_need_no_round_trip(self, make_api):
+        """Test: pre-warmed pump amounts are answered from the shared cache"""
+        calls = []
+        
+        def handler(request):
+            pump_amount_wei = json.loads(request.content)["pump_amount_wei"]
+            calls.append(pump_amount_wei)
+            return httpx.Response(200, json={"swap_amount_wei": str(int(pump_amount_wei) // 10)})
+        
+        api = make_api(handler)
+        await api.prewarm_max_swap_amounts([0.1, 0.5])
+        assert len(calls) == 2
+        
+        result = await api.estimate_max_swap_amount("500000000000000000")
+        assert result == {"swap_amount_wei": "50000000000000000"}
+        assert len(calls) == 2
+
+
+class TestCoalescing:
+    """Test single-flight sharing of identical reads"""
+    
+    @pytest.mark.asyncio
+    async def test_concurrent_identical_reads_share_one_request(self, make_api):
+        """Test: double-tapped refresh sends one status request"""
+        calls = []
+        
+        async def handler(request):
+            calls.append(json.loads(request.content)["user_telegram_id"])
+            await asyncio.sleep(0.05)
+            return httpx.Response(200, json={"status": "InProcess"})
+        
+        api = make_api(handler)
+        results = await asyncio.gather(
+            api.get_session_status(1),
+            api.get_session_status(1),
+            api.get_session_status(telegram_id=1),
+            api.get_session_status(2)
+        )
+        
+        assert all(result == {"status": "InProcess"} for result in results)
+        assert sorted(calls) == [1, 2]
+        assert api.coalescing_stats()["coalesced"] == 2
+    
+    @pytest.mark.asyncio
+    async def test_cancelled_caller_does_not_cancel_others(self, make_api):
+        """Test: one caller giving up leaves the shared request running for the rest"""
+        async def handler(request):
+            await asyncio.sleep(0.05)
+            return httpx.Response(200, json={"status": "InProcess"})
+        
+        api = make_api(handler)
+        impatient = asyncio.create_task(api.get_session_status(1))
+        patient = asyncio.create_task(api.get_session_status(1))
+        await asyncio.sleep(0.01)
+        impatient.cancel()
+        
+        assert await patient == {"status": "InProcess"}
+        assert impatient.cancelled()
+        assert api.coalescing_stats()["in_flight"] == 0
+
+
+    @pytest.mark.asyncio
+    async def test_shared_call_does_not_inherit_first_deadline(self, make_api):
+        """Test: a caller out of budget gives up alone, the shared request still serves the others"""
+        async def handler(request):
+            await asyncio.sleep(0.1)
+            return httpx.Response(200, json={"status": "InProcess"})
+        
+        api = make_api(handler)
+        
+        @with_deadline(0.02)
+        async def hurried():
+            return await api.get_session_status(1)
+        
+        first = asyncio.create_task(hurried())
+        await asyncio.sleep(0.005)
+        patient = asyncio.create_task(api.get_session_status(1))
+        
+        with pytest.raises(DeadlineExceeded):
+            await first
+        assert await patient == {"status": "InProcess"}
+        assert api.coalescing_stats()["coalesced"] == 1
+    
+    @pytest.mark.asyncio
+    async def test_background_and_interactive_are_not_shared(self, make_api):
+        """Test: a poller read and a handler read of the same key go out separately"""
+        calls = 0
+        
+        async def handler(request):
+            nonlocal calls
+            calls += 1
+            await asyncio.sleep(0.02)
+            return httpx.Response(200, json={"status": "InProcess"})
+        
+        api = make_api(handler)
+        await asyncio.gather(background(api.get_session_status)(1), api.get_session_status(1))
+        
+        assert calls == 2
+        assert api.coalescing_stats()["coalesced"] == 0
+
+
+@pytest.fixture
+def fast_retries():
+    with patch('api_client.settings.backend_retry_base_delay', 0.001), \
+            patch('api_client.settings.backend_retry_max_delay', 0.001):
+        yield
+
+
+class TestResilience:
+    """Test retries and circuit breakers"""
+    
+    @pytest.mark.asyncio
+    async def test_idempotent_reads_are_retried(self, fast_retries, make_api):
+        """Test: transient 502 and connection errors are retried for reads"""
+        responses = [
+            httpx.ConnectError("refused"),
+            httpx.Response(502),
+            httpx.Response(200, json={"status": "InProcess"})
+        ]
+        
+        def handler(request):
+            response = responses.pop(0)
+            if isinstance(response, Exception):
+                raise response
+            return response
+        
+        api = make_api(handler)
+        assert await api.get_session_status(1) == {"status": "InProcess"}
+        assert responses == []
+    
+    @pytest.mark.asyncio
+    async def test_writes_and_client_errors_are_not_retried(self, fast_retries, make_api):
+        """Test: pause is sent once, 4xx answers are final"""
+        calls = []
+        
+        def handler(request):
+            calls.append(request.url.path)
+            return httpx.Response(502 if "pause" in request.url.path else 404)
+        
+        api = make_api(handler)
+        with pytest.raises(httpx.HTTPStatusError):
+            await api.pause_session(1)
+        with pytest.raises(httpx.HTTPStatusError):
+            await api.get_token_pools("0xaaa")
+        assert len(calls) == 2
+    
+    @pytest.mark.asyncio
+    async def test_breaker_fails_fast_and_recovers(self, fast_retries, make_api):
+        """Test: open breaker skips the backend, half-open probe closes it"""
+        healthy = False
+        calls = 0
+        
+        def handler(request):
+            nonlocal calls
+            calls += 1
+            return httpx.Response(200, json={"ui": "1.0"}) if healthy else httpx.Response(503)
+        
+        api = make_api(handler)
+        api._breakers["user"] = CircuitBreaker("user", failure_threshold=2, recovery_timeout=0.05)
+        
+        # one failure per call, not per retried attempt
+        with pytest.raises(httpx.HTTPStatusError):
+            await api.check_wallet_balance(1)
+        assert calls == 3
+        assert api.breaker_states()["user"] == CircuitBreaker.CLOSED
+        with pytest.raises(httpx.HTTPStatusError):
+            await api.check_wallet_balance(1, max_age=0)
+        assert api.breaker_states()["user"] == CircuitBreaker.OPEN
+        assert api.is_degraded("user") and not api.is_degraded("session")
+        
+        calls = 0
+        with pytest.raises(CircuitOpenError):
+            await api.check_wallet_balance(1)
+        assert calls == 0
+        
+        await asyncio.sleep(0.06)
+        assert api.breaker_states()["user"] == CircuitBreaker.HALF_OPEN
+        healthy = True
+        assert await api.check_wallet_balance(1) == {"ui": "1.0"}
+        assert api.breaker_states()["user"] == CircuitBreaker.CLOSED
+    
+    @pytest.mark.asyncio
+    async def test_background_failures_do_not_trip_handlers(self, fast_retries, make_api):
+        """Test: a poller hitting a failing backend opens only its own breaker"""
+        api = make_api(lambda request: httpx.Response(503))
+        
+        @background
+        async def poll(telegram_id):
+            await api.get_session_status(telegram_id)
+        
+        for telegram_id in range(settings.breaker_failure_threshold):
+            with pytest.raises(httpx.HTTPStatusError):
+                await poll(telegram_id)
+        
+        assert api.background_breaker_states()["session"] == CircuitBreaker.OPEN
+        assert api.breaker_states()["session"] == CircuitBreaker.CLOSED
+        assert not api.is_degraded("session")
+
+
+class TestConnectionPool:
+    """Test pool configuration and pool-wait instrumentation against a local server"""
+    
+    @pytest.mark.asyncio
+    async def test_pool_wait_is_recorded(self):
+        """Test: with one connection, the second request's wait for it is measured"""
+        async def status(request: HttpRequest) -> HttpResponse:
+            await asyncio.sleep(0.1)
+            return HttpResponse(200, {"status": "InProcess"})
+        
+        server = HttpServer("127.0.0.1", 0)
+        server.route("POST", "/bot/session/status", status)
+        await server.start()
+        try:
+            with patch('api_client.settings.backend_max_connections', 1), \
+                    patch('api_client.settings.backend_read_timeouts', {"session": 2.0}):
+                api = BackendAPI()
+            api.balancer = ReplicaBalancer([f"http://127.0.0.1:{server.port}"])
+            # let both requests past the dispatcher so they contend for the pool
+            api._dispatcher = PriorityDispatcher(capacity=2, background_max=2, background_min=0)
+            
+            await asyncio.gather(api.get_session_status(1), api.get_session_status(2))
+            await api.close()
+        finally:
+            await server.stop()
+        
+        stats = api.pool_stats()
+        assert stats["count"] == 2
+        assert stats["max"] >= 0.08
+        assert api.client.timeout.read == 2.0
+
+
+class TestHedging:
+    """Test hedged reads"""
+    
+    @pytest.fixture
+    def hedging(self):
+        with patch('api_client.settings.backend_hedging_enabled', True), \
+                patch('api_client.settings.backend_hedge_default_delay', 0.02):
+            yield
+    
+    @pytest.mark.asyncio
+    async def test_slow_read_is_hedged_and_loser_cancelled(self, hedging, make_api):
+        """Test: backup request answers first, the stalled one is cancelled"""
+        calls = 0
+        cancelled = False
+        
+        async def handler(request):
+            nonlocal calls, cancelled
+            calls += 1
+            if calls == 1:
+                try:
+                    await asyncio.sleep(5)
+                except asyncio.CancelledError:
+                    cancelled = True
+                    raise
+            return httpx.Response(200, json={"status": "InProcess"})
+        
+        api = make_api(handler)
+        started = asyncio.get_running_loop().time()
+        assert await api.get_session_status(1) == {"status": "InProcess"}
+        
+        assert asyncio.get_running_loop().time() - started < 1
+        await asyncio.sleep(0)
+        assert calls == 2 and cancelled
+        assert api.hedging_stats() == {"hedges": 1, "wins": 1, "denied": 0}
+    
+    @pytest.mark.asyncio
+    async def test_retryable_status_loses_the_race(self):
+        """Test: a fast 503 from the primary does not beat a slower 200 from the backup"""
+        copies = 0
+        
+        async def send():
+            nonlocal copies
+            copies += 1
+            if copies == 1:
+                await asyncio.sleep(0.03)
+                return httpx.Response(503)
+            await asyncio.sleep(0.05)
+            return httpx.Response(200)
+        
+        budget = HedgeBudget(ratio=1, burst=1)
+        response = await hedged(send, 0.01, budget, is_failure=lambda response: response.status_code == 503)
+        
+        assert response.status_code == 200
+        assert budget.wins == 1
+    
+    @pytest.mark.asyncio
+    async def test_cancelled_caller_cancels_primary(self):
+        """Test: a caller cancelled before the hedge delay does not leave the primary running"""
+        primary_cancelled = asyncio.Event()
+        
+        async def send():
+            try:
+                await asyncio.sleep(5)
+            except asyncio.CancelledError:
+                primary_cancelled.set()
+                raise
+        
+        call = asyncio.create_task(hedged(send, 1, HedgeBudget(ratio=1, burst=1)))
+        await asyncio.sleep(0.01)
+        call.cancel()
+        
+        await asyncio.wait_for(primary_cancelled.wait(), timeout=1)
+    
+    @pytest.mark.asyncio
+    async def test_budget_caps_hedges(self, hedging, make_api):
+        """Test: hedges stop once the budget is spent"""
+        async def handler(request):
+            await asyncio.sleep(0.04)
+            return httpx.Response(200, json={"ui": "1.0"})
+        
+        with patch('api_client.settings.backend_hedge_budget_burst', 1), \
+                patch('api_client.settings.backend_hedge_budget_ratio', 0):
+            api = make_api(handler)
+        
+        for _ in range(3):
+            await api.check_wallet_balance(1, max_age=0)
+        
+        assert api.hedging_stats()["hedges"] == 1
+        assert api.hedging_stats()["denied"] == 2
+    
+    @pytest.mark.asyncio
+    async def test_sticky_reads_are_not_hedged(self, hedging, make_api):
+        """Test: a read pinned to the user's replica is never copied to another one"""
+        hosts = []
+        
+        async def handler(request):
+            hosts.append(request.url.host)
+            await asyncio.sleep(0.05)
+            return httpx.Response(200, json={"status": "InProcess"})
+        
+        with patch('api_client.settings.api_base_urls', ["http://a", "http://b"]), \
+                patch('api_client.settings.backend_sticky_groups', ["session"]):
+            api = make_api(handler)
+            await api.get_session_status(1)
+        
+        assert len(hosts) == 1
+        assert api.hedging_stats()["hedges"] == 0
+    
+    @pytest.mark.asyncio
+    async def test_writes_are_never_hedged(self, hedging, make_api):
+        """Test: pause is not an idempotent read and is sent once"""
+        calls = 0
+        
+        async def handler(request):
+            nonlocal calls
+            calls += 1
+            await asyncio.sleep(0.05)
+            return httpx.Response(200)
+        
+        api = make_api(handler)
+        await api.pause_session(1)
+        assert calls == 1
+
+
+class TestDeadline:
+    """Tests for per-update deadline propagation"""
+    
+    @pytest.mark.asyncio
+    async def test_slow_call_is_cut_at_deadline(self, make_api):
+        """Test: a call runs no longer than the remaining budget, and a backend that hangs past it counts as failing"""
+        async def handler(request):
+            await asyncio.sleep(1)
+            return httpx.Response(200, json={"status": "InProcess"})
+        
+        api = make_api(handler)
+        api._breakers["session"] = CircuitBreaker("session", failure_threshold=1, recovery_timeout=60)
+        
+        @with_deadline(0.05)
+        async def handle():
+            await api.get_session_status(1)
+        
+        started = asyncio.get_running_loop().time()
+        with pytest.raises(DeadlineExceeded):
+            await handle()
+        assert asyncio.get_running_loop().time() - started < 0.5
+        # the abandoned shared read winds down on the next loop iterations
+        await asyncio.sleep(0.01)
+        assert api.breaker_states()["session"] == CircuitBreaker.OPEN
+    
+    @pytest.mark.asyncio
+    async def test_explicit_timeout_is_capped_by_budget(self, make_api):
+        """Test: an explicit timeout applies as the smaller of itself and the remaining budget"""
+        api = make_api(lambda request: httpx.Response(200))
+        timeouts = []
+        
+        async def send(endpoint, method, path, budget, sticky_key, tried, timeout, **kwargs):
+            timeouts.append(timeout)
+            return httpx.Response(200, request=httpx.Request(method, path))
+        
+        api._send = send
+        await api._request("session", "GET", "/x", timeout=5.0)
+        
+        @with_deadline(1.0)
+        async def handle(timeout):
+            await api._request("session", "GET", "/x", timeout=timeout)
+        
+        await handle(5.0)
+        await handle(0.5)
+        assert timeouts[0] == 5.0
+        assert 0.9 < timeouts[1] <= 1.0
+        assert timeouts[2] == 0.5
+    
+    @pytest.mark.asyncio
+    async def test_calls_after_deadline_are_skipped(self, make_api):
+        """Test: once the budget is spent later calls never reach the backend"""
+        calls = 0
+        
+        async def handler(request):
+            nonlocal calls
+            calls += 1
+            await asyncio.sleep(0.06)
+            return httpx.Response(200, json={"ui": "1.0", "raw": "1"})
+        
+        api = make_api(handler)
+        
+        @with_deadline(0.05)
+        async def handle():
+            with pytest.raises(DeadlineExceeded):
+                await api.check_wallet_balance(1)
+            with pytest.raises(DeadlineExceeded):
+                await api.pause_session(1)
+        
+        await handle()
+        assert calls == 1
+    
+    @pytest.mark.asyncio
+    async def test_no_deadline_outside_handlers(self, make_api):
+        """Test: background calls are not bounded by any update's budget"""
+        async def handler(request):
+            return httpx.Response(200, json={"status": "Success"})
+        
+        api = make_api(handler)
+        assert await api.get_session_status(1) == {"status": "Success"}
+
+
+class TestPriorityDispatch:
+    """Tests for interactive/background request dispatch"""
+    
+    @pytest.mark.asyncio
+    async def test_interactive_waiters_go_first(self):
+        """Test: a freed slot goes to a queued interactive request before earlier background ones"""
+        dispatcher = PriorityDispatcher(capacity=2, background_max=2, background_min=0)
+        await dispatcher.acquire(BACKGROUND)
+        await dispatcher.acquire(BACKGROUND)
+        
+        order = []
+        
+        async def run(traffic_class):
+            async with dispatcher.slot(traffic_class):
+                order.append(traffic_class)
+        
+        queued = [asyncio.create_task(run(BACKGROUND)), asyncio.create_task(run(BACKGROUND))]
+        await asyncio.sleep(0)
+        queued.append(asyncio.create_task(run(INTERACTIVE)))
+        await asyncio.sleep(0)
+        
+        dispatcher.release(BACKGROUND)
+        dispatcher.release(BACKGROUND)
+        await asyncio.gather(*queued)
+        assert order[0] == INTERACTIVE
+    
+    @pytest.mark.asyncio
+    async def test_neither_class_starves(self):
+        """Test: background keeps its reserved share and never takes the interactive headroom"""
+        dispatcher = PriorityDispatcher(capacity=4, background_max=3, background_min=1)
+        for _ in range(3):
+            await dispatcher.acquire(INTERACTIVE)
+        
+        # fourth interactive would eat the background reserve
+        blocked = asyncio.create_task(dispatcher.acquire(INTERACTIVE))
+        await asyncio.sleep(0)
+        assert not blocked.done()
+        await asyncio.wait_for(dispatcher.acquire(BACKGROUND), 0.1)
+        
+        blocked.cancel()
+        for _ in range(3):
+            dispatcher.release(INTERACTIVE)
+        dispatcher.release(BACKGROUND)
+        
+        for _ in range(3):
+            await dispatcher.acquire(BACKGROUND)
+        background_blocked = asyncio.create_task(dispatcher.acquire(BACKGROUND))
+        await asyncio.wait_for(dispatcher.acquire(INTERACTIVE), 0.1)
+        await asyncio.sleep(0)
+        assert not background_blocked.done()
+        background_blocked.cancel()
+    
+    @pytest.mark.asyncio
+    async def test_cancelled_waiter_does_not_leak_slot(self):
+        """Test: giving up while queued leaves slot counts intact"""
+        dispatcher = PriorityDispatcher(capacity=1, background_max=1, background_min=0)
+        await dispatcher.acquire(INTERACTIVE)
+        waiter = asyncio.create_task(dispatcher.acquire(INTERACTIVE))
+        await asyncio.sleep(0)
+        waiter.cancel()
+        await asyncio.sleep(0)
+        
+        dispatcher.release(INTERACTIVE)
+        await asyncio.wait_for(dispatcher.acquire(INTERACTIVE), 0.1)
+        assert dispatcher.stats()[INTERACTIVE]["in_flight"] == 1
+    
+    @pytest.mark.asyncio
+    async def test_handler_call_skips_poll_backlog(self, make_api):
+        """Test: a pause press is sent ahead of a queued backlog of background status checks"""
+        async def handler(request):
+            await asyncio.sleep(0.02)
+            return httpx.Response(200, json={"status": "InProcess"})
+        
+        with patch('api_client.settings.backend_max_connections', 2), \
+                patch('api_client.settings.backend_background_max_concurrency', 2), \
+                patch('api_client.settings.backend_background_min_concurrency', 1):
+            api = make_api(handler)
+        
+        @background
+        async def poll(telegram_id):
+            await api.get_session_status(telegram_id)
+        
+        backlog = [asyncio.create_task(poll(telegram_id)) for telegram_id in range(20)]
+        await asyncio.sleep(0.01)
+        
+        started = asyncio.get_running_loop().time()
+        await api.pause_session(1)
+        assert asyncio.get_running_loop().time() - started < 0.1
+        assert not all(task.done() for task in backlog)
+        await asyncio.gather(*backlog)
+
+
+class TestAdmission:
+    """Tests for the AIMD admission limit"""
+    
+    def test_slow_answers_cut_limit_once_per_window(self):
+        """Test: a burst of slow answers is one decrease, fast answers grow it back"""
+        admission = AdmissionController(latency_target=10.0, min_limit=2, max_limit=20, backoff_ratio=0.5)
+        for _ in range(5):
+            admission.on_start()
+        for _ in range(5):
+            admission.on_finish(latency=30.0, ok=True)
+        assert admission.stats()["limit"] == 10
+        
+        for _ in range(50):
+            admission.on_start()
+            admission.on_finish(latency=0.1, ok=True)
+        assert 10 < admission.limit <= 20
+    
+    @pytest.mark.asyncio
+    async def test_backend_errors_lower_limit(self, fast_retries, make_api):
+        """Test: 5xx answers count as overload signals, in-flight returns to zero"""
+        api = make_api(lambda request: httpx.Response(503))
+        limit = api.admission.limit
+        
+        with pytest.raises(httpx.HTTPStatusError):
+            await api.get_token_pools("0xaaa")
+        assert api.admission.limit < limit
+        assert api.admission.in_flight == 0
+    
+    @pytest.mark.asyncio
+    async def test_only_foreground_requests_are_admitted(self, make_api):
+        """Test: background calls and the wait for a dispatcher slot are not counted"""
+        in_flight = []
+        
+        async def handler(request):
+            in_flight.append(api.admission.in_flight)
+            await asyncio.sleep(0.02)
+            return httpx.Response(200, json={"status": "InProcess"})
+        
+        with patch('api_client.settings.backend_max_connections', 1), \
+                patch('api_client.settings.backend_background_max_concurrency', 1), \
+                patch('api_client.settings.backend_background_min_concurrency', 1):
+            api = make_api(handler)
+        
+        @background
+        async def poll(telegram_id):
+            await api.get_session_status(telegram_id)
+        
+        await asyncio.gather(poll(1), api.get_session_status(2), api.get_session_status(3))
+        
+        # one slot: the interactive calls run one at a time, never counted while queued
+        assert sorted(in_flight) == [0, 1, 1]
+        assert api.admission.in_flight == 0
+
+
+class TestLoadBalancing:
+    """Tests for client-side balancing over backend replicas"""
+    
+    @pytest.fixture
+    def replicas(self):
+        with patch('api_client.settings.api_base_urls', ["http://a", "http://b"]):
+            yield
+    
+    @pytest.mark.asyncio
+    async def test_spreads_by_outstanding_requests(self, replicas, make_api):
+        """Test: concurrent requests go to the replica with fewer in flight"""
+        hosts = []
+        
+        async def handler(request):
+            hosts.append(request.url.host)
+            await asyncio.sleep(0.02)
+            return httpx.Response(200, json={"is_supported": True})
+        
+        api = make_api(handler)
+        await asyncio.gather(*(api.check_token_supported(f"0x{i}") for i in range(4)))
+        assert sorted(hosts) == ["a", "a", "b", "b"]
+    
+    @pytest.mark.asyncio
+    async def test_failing_replica_is_ejected_and_retried_elsewhere(self, replicas, fast_retries, make_api):
+        """Test: retries move to the other replica and a failing one stops getting traffic"""
+        hosts = []
+        
+        def handler(request):
+            hosts.append(request.url.host)
+            if request.url.host == "a":
+                return httpx.Response(503)
+            return httpx.Response(200, json={"pools": []})
+        
+        with patch('api_client.settings.backend_ejection_failures', 1):
+            api = make_api(handler)
+        for i in range(4):
+            assert await api.get_token_pools(f"0x{i}") == {"pools": []}
+        
+        assert hosts.count("a") == 1
+        assert api.replica_stats()["http://a"]["ejected"]
+        assert api.breaker_states()["token"] == "closed"
+    
+    @pytest.mark.asyncio
+    async def test_active_check_restores_replica(self, replicas, make_api):
+        """Test: a replica answering the health route is taken back"""
+        def handler(request):
+            return httpx.Response(200 if request.url.host == "a" else 503)
+        
+        api = make_api(handler)
+        api.balancer.eject(api.balancer.replicas[0])
+        await api.check_replicas()
+        
+        stats = api.replica_stats()
+        assert not stats["http://a"]["ejected"]
+        assert stats["http://b"]["ejected"]
+    
+    @pytest.mark.asyncio
+    async def test_sticky_session_calls(self, replicas, make_api):
+        """Test: with the session group sticky, one user's session calls share a replica"""
+        hosts = {1: set(), 2: set(), 3: set(), 4: set()}
+        
+        def handler(request):
+            telegram_id = json.loads(request.content)["user_telegram_id"]
+            hosts[telegram_id].add(request.url.host)
+            return httpx.Response(200, json={"status": "InProcess"})
+        
+        with patch('api_client.settings.backend_sticky_groups', ["session"]):
+            api = make_api(handler)
+            for telegram_id in hosts:
+                await api.start_session(telegram_id, "0x1", "1", "1")
+                await api.get_session_status(telegram_id)
+                await api.pause_session(telegram_id)
+        
+        assert all(len(used) == 1 for used in hosts.values())
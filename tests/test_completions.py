@@ -0,0 +1,322 @@
+"""
+Tests for the background session completion poller
+"""
+
+import asyncio
+import json
+import httpx
+import pytest
+from unittest.mock import AsyncMock, Mock, patch
+
+from api_client import BackendAPI
+from models.session import UserSession, SessionStorage
+from services import completions, PollScheduler, NotificationOutbox, COMPLETION
+
+
+@pytest.fixture
+def storage(scheduler):
+    """Storage with a few sessions running on backend, all tracked by the scheduler"""
+    storage = SessionStorage()
+    for telegram_id in (1, 2, 3, 4):
+        session = storage.create(telegram_id)
+        session.token_ca = "0x123"
+        session.backend_started = True
+        scheduler.add(telegram_id, session, now=0)
+    return storage
+
+
+@pytest.fixture
+def mock_context():
+    """Mock job context"""
+    context = Mock()
+    context.bot_data = {}
+    context.bot.send_photo = AsyncMock()
+    context.bot.send_message = AsyncMock()
+    context.bot.delete_message = AsyncMock()
+    context.bot.edit_message_text = AsyncMock()
+    return context
+
+
+@pytest.fixture(autouse=True)
+def outbox(tmp_path):
+    """Outbox in a temporary database"""
+    outbox = NotificationOutbox(str(tmp_path / "outbox.db"))
+    with patch.object(completions, 'notification_outbox', outbox):
+        yield outbox
+    outbox.close()
+
+
+def notified(context) -> set[int]:
+    return {call.kwargs["chat_id"] for call in context.bot.send_message.await_args_list}
+
+
+@pytest.fixture(autouse=True)
+def scheduler():
+    """Scheduler that makes every tracked session due immediately"""
+    scheduler = PollScheduler(min_interval=0, max_interval=0)
+    with patch.object(completions, 'poll_scheduler', scheduler):
+        yield scheduler
+
+
+SUCCESS = {"Success": {"pumped_amount_wei": "1000000000000000000"}}
+
+
+class TestGetSessionStatuses:
+    """Test bulk session status requests"""
+    
+    @pytest.mark.asyncio
+    async def test_bulk_route_is_chunked(self, make_api):
+        """Test: one request per chunk of status_batch_size users"""
+        requests = []
+        
+        def handler(request):
+            ids = json.loads(request.content)["user_telegram_ids"]
+            requests.append(ids)
+            return httpx.Response(200, json={
+                "statuses": [{"user_telegram_id": i, "status": "InProcess"} for i in ids]
+            })
+        
+        api = make_api(handler)
+        with patch('api_client.settings.status_batch_size', 2):
+            statuses = await api.get_session_statuses([1, 2, 3, 4, 5])
+        
+        assert sorted(len(ids) for ids in requests) == [1, 2, 2]
+        assert statuses == {i: {"status": "InProcess"} for i in range(1, 6)}
+    
+    @pytest.mark.asyncio
+    async def test_falls_back_to_single_requests(self, make_api):
+        """Test: missing bulk route falls back to single status requests"""
+        paths = []
+        
+        def handler(request):
+            paths.append(request.url.path)
+            if request.url.path == "/bot/session/statuses":
+                return httpx.Response(404)
+            telegram_id = json.loads(request.content)["user_telegram_id"]
+            if telegram_id == 2:
+                return httpx.Response(502)
+            return httpx.Response(200, json={"status": "InProcess"})
+        
+        api = make_api(handler)
+        statuses = await api.get_session_statuses([1, 2, 3])
+        assert statuses == {1: {"status": "InProcess"}, 3: {"status": "InProcess"}}
+        
+        # bulk route is not retried while known to be missing
+        paths.clear()
+        await api.get_session_statuses([1])
+        assert paths == ["/bot/session/status"]
+        
+        # but probed again once the retry delay has passed
+        paths.clear()
+        later = api._bulk_status_retry_at + 1
+        with patch('api_client.time.monotonic', return_value=later):
+            await api.get_session_statuses([1])
+        assert paths[0] == "/bot/session/statuses"
+
+
+class TestCheckSessionCompletions:
+    """Test polling of active sessions"""
+    
+    @pytest.mark.asyncio
+    async def test_single_request_concurrency_is_bounded(self, storage, mock_context):
+        """Test: no more than poll_concurrency status requests run at once"""
+        in_flight = 0
+        max_in_flight = 0
+        
+        async def get_status(telegram_id):
+            nonlocal in_flight, max_in_flight
+            in_flight += 1
+            max_in_flight = max(max_in_flight, in_flight)
+            await asyncio.sleep(0.01)
+            in_flight -= 1
+            return {"status": "InProcess"}
+        
+        api = BackendAPI()
+        api._bulk_status_retry_at = float("inf")
+        api.get_session_status = AsyncMock(side_effect=get_status)
+        
+        with patch.object(completions, 'session_storage', storage), \
+                patch.object(completions, 'api', api), \
+                patch.object(completions.settings, 'poll_concurrency', 2):
+            await completions.check_session_completions(mock_context)
+        
+        assert api.get_session_status.await_count == 4
+        assert max_in_flight == 2
+    
+    @pytest.mark.asyncio
+    async def test_failures_do_not_block_notifications(self, storage, mock_context, caplog):
+        """Test: one slow or failing session does not stop others being notified"""
+        async def get_status(telegram_id):
+            if telegram_id == 1:
+                await asyncio.sleep(1)
+            if telegram_id == 2:
+                raise RuntimeError("backend down")
+            return {"status": SUCCESS}
+        
+        api = BackendAPI()
+        api._bulk_status_retry_at = float("inf")
+        api.get_session_status = AsyncMock(side_effect=get_status)
+        
+        with patch.object(completions, 'session_storage', storage), \
+                patch.object(completions, 'api', api), \
+                patch.object(completions.settings, 'status_batch_size', 1), \
+                patch.object(completions.settings, 'poll_session_timeout', 0.05):
+            with caplog.at_level("DEBUG", logger="services.completions"):
+                await completions.check_session_completions(mock_context)
+        
+        assert notified(mock_context) == {3, 4}
+        assert mock_context.bot.send_message.await_count == 2
+        assert not storage.get(3).backend_started
+        assert storage.get(1).backend_started
+        assert "checked 4 sessions, 2 failed" in caplog.text
+    
+    @pytest.mark.asyncio
+    async def test_poll_cycle_uses_bulk_route(self, storage, mock_context, make_api):
+        """Test: one HTTP round trip per chunk of active sessions"""
+        requests = []
+        
+        def handler(request):
+            ids = json.loads(request.content)["user_telegram_ids"]
+            requests.append(ids)
+            return httpx.Response(200, json={
+                "statuses": [
+                    {"user_telegram_id": i, "status": SUCCESS if i == 4 else "InProcess"} for i in ids
+                ]
+            })
+        
+        storage.messages.set_config_message(4, chat_id=40, message_id=400)
+        storage.messages.set_status_message(4, chat_id=40, message_id=401)
+        
+        with patch.object(completions, 'session_storage', storage), \
+                patch.object(completions, 'api', make_api(handler)):
+            await completions.check_session_completions(mock_context)
+        
+        assert len(requests) == 1
+        assert notified(mock_context) == {4}
+        # stale config menu of the finished session is removed, its status message closed
+        mock_context.bot.delete_message.assert_awaited_once_with(
+            chat_id=40, message_id=400, rate_limit_args=COMPLETION
+        )
+        mock_context.bot.edit_message_text.assert_awaited_once_with(
+            completions.STATUS_FINISHED_TEXT, chat_id=40, message_id=401, rate_limit_args=COMPLETION
+        )
+        assert storage.messages.get(4).config_message_id == 0
+        assert storage.messages.get(4).status_message_id == 0
+
+    @pytest.mark.asyncio
+    async def test_paused_sessions_are_skipped(self, storage, mock_context):
+        """Test: paused sessions are rescheduled without a backend request"""
+        storage.get(1).is_paused = True
+        api = BackendAPI()
+        api._bulk_status_retry_at = float("inf")
+        api.get_session_status = AsyncMock(return_value={"status": "InProcess"})
+        
+        with patch.object(completions, 'session_storage', storage), \
+                patch.object(completions, 'api', api):
+            await completions.check_session_completions(mock_context)
+        
+        checked = {call.args[0] for call in api.get_session_status.await_args_list}
+        assert checked == {2, 3, 4}
+    
+    def test_running_sessions_are_tracked_at_startup(self, mock_context):
+        """Test: sessions started before a restart are scheduled once, without a scan per tick"""
+        storage = SessionStorage()
+        storage.create(1).backend_started = True
+        storage.create(2)
+        scheduler = PollScheduler(min_interval=0, max_interval=0)
+        
+        with patch.object(completions, 'session_storage', storage), \
+                patch.object(completions, 'poll_scheduler', scheduler):
+            assert completions.schedule_started_sessions() == 1
+            completions.schedule_poll(3, UserSession(backend_started=True))
+        
+        assert 1 in scheduler and 3 in scheduler and 2 not in scheduler
+    
+    @pytest.mark.asyncio
+    async def test_overrun_is_detected(self, storage, mock_context, scheduler, caplog):
+        """Test: a tick that fires while the previous cycle runs is reported and skipped"""
+        scheduler.running = True
+        api = Mock()
+        
+        with patch.object(completions, 'session_storage', storage), \
+                patch.object(completions, 'api', api):
+            await completions.check_session_completions(mock_context)
+        
+        assert scheduler.overruns == 1
+        assert "overrun" in caplog.text
+        api.iter_session_statuses.assert_not_called()
+
+
+class TestPollScheduler:
+    """Test due-time ordering of session checks"""
+    
+    def make_session(self, pump_bnb_wei: int, swap_wei: int, delay_millis: int = 1000) -> UserSession:
+        return UserSession(
+            token_ca="0x123",
+            pump_amount_wei=pump_bnb_wei,
+            swap_amount_wei=swap_wei,
+            delay_millis=delay_millis,
+            backend_started=True
+        )
+    
+    def test_eta_from_amounts_and_delay(self):
+        """Test: ETA is number of swaps times delay plus overhead"""
+        scheduler = PollScheduler(min_interval=5, max_interval=60, swap_overhead_millis=1000)
+        session = self.make_session(10**18, 10**17, delay_millis=2000)
+        assert scheduler.estimate_eta(session) == 30.0
+    
+    def test_polls_more_often_near_completion(self):
+        """Test: interval shrinks as the estimated completion time approaches"""
+        scheduler = PollScheduler(min_interval=5, max_interval=60)
+        session = self.make_session(10**18, 10**16, delay_millis=2000)  # 100 swaps, 200s
+        scheduler.add(1, session, now=0)
+        
+        assert scheduler.next_interval(1, session, now=0) == 60
+        assert scheduler.next_interval(1, session, now=140) == 30
+        assert scheduler.next_interval(1, session, now=195) == 5
+        assert scheduler.next_interval(1, session, now=500) == 5
+    
+    def test_eta_counts_from_persisted_start(self):
+        """Test: a session seen for the first time after a restart is scheduled by its start time"""
+        scheduler = PollScheduler(min_interval=5, max_interval=60, clock=lambda: 1000.0)
+        session = self.make_session(10**18, 10**16, delay_millis=2000)  # 100 swaps, 200s
+        session.start(now_millis=(1000 - 190) * 1000)
+        scheduler.add(1, session, now=0)
+        
+        assert scheduler.next_interval(1, session, now=0) == 5
+    
+    def test_paused_time_is_not_counted(self):
+        """Test: time spent paused pushes the ETA back"""
+        scheduler = PollScheduler(min_interval=5, max_interval=60, clock=lambda: 1000.0)
+        session = self.make_session(10**18, 10**16, delay_millis=2000)  # 100 swaps, 200s
+        session.start(now_millis=800 * 1000)
+        session.set_paused(True, now_millis=820 * 1000)
+        session.set_paused(False, now_millis=900 * 1000)
+        
+        # 200s since start, 80s of them paused: 80s left
+        assert session.active_seconds(1000 * 1000) == 120
+        assert scheduler.next_interval(1, session, now=0) == 40
+    
+    def test_pop_due_in_order_with_limit(self):
+        """Test: only due sessions are returned, earliest first, stale entries skipped"""
+        scheduler = PollScheduler(min_interval=5, max_interval=60)
+        scheduler._push(1, 30)
+        scheduler._push(2, 10)
+        scheduler._push(3, 20)
+        scheduler._push(1, 15)  # rescheduled, (30, 1) is now stale
+        
+        assert scheduler.pop_due(now=25, limit=2) == [2, 1]
+        assert scheduler.lag(now=25) == 5
+        assert scheduler.pop_due(now=25) == [3]
+        assert scheduler.pop_due(now=100) == []
+        assert len(scheduler) == 0
+    
+    def test_first_checks_are_spread(self):
+        """Test: new sessions get random first due times instead of one burst"""
+        scheduler = PollScheduler(min_interval=10, max_interval=10)
+        session = self.make_session(10**18, 10**18)
+        for telegram_id in range(100):
+            scheduler.add(telegram_id, session, now=0)
+        
+        due_times = sorted(scheduler._due.values())
+        assert due_times[0] < 2 and due_times[-1] > 8
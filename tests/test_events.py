@@ -0,0 +1,161 @@
+"""
+Tests for the pushed session event receiver
+Uses a local stand-in for the backend that POSTs events over HTTP
+"""
+
+import asyncio
+import httpx
+import pytest
+from unittest.mock import AsyncMock, Mock, patch
+
+from models.session import SessionStorage
+from services import completions, PollScheduler, SessionEventReceiver, NotificationOutbox
+from utils.http_server import HttpServer, HttpResponse
+
+
+@pytest.fixture
+def storage():
+    storage = SessionStorage()
+    session = storage.create(42)
+    session.token_ca = "0x123"
+    session.backend_started = True
+    return storage
+
+
+@pytest.fixture
+def application():
+    """Mock Application with bot and bot_data"""
+    application = Mock()
+    application.bot_data = {}
+    application.bot.send_message = AsyncMock()
+    application.bot.send_photo = AsyncMock()
+    application.bot.delete_message = AsyncMock()
+    return application
+
+
+@pytest.fixture
+async def receiver(storage, application, tmp_path):
+    scheduler = PollScheduler(min_interval=5, max_interval=60)
+    outbox = NotificationOutbox(str(tmp_path / "outbox.db"))
+    with patch.object(completions, 'session_storage', storage), \
+            patch.object(completions, 'poll_scheduler', scheduler), \
+            patch.object(completions, 'notification_outbox', outbox):
+        receiver = SessionEventReceiver(application, "127.0.0.1", 0, secret="s3cret")
+        await receiver.start()
+        yield receiver
+        await receiver.stop()
+    outbox.close()
+
+
+async def post_event(receiver, payload, secret="s3cret"):
+    async with httpx.AsyncClient(base_url=f"http://127.0.0.1:{receiver.port}") as backend:
+        return await backend.post("/events/session", json=payload, headers={"X-Events-Secret": secret})
+
+
+class TestSessionEventReceiver:
+    """Test events posted by a stand-in backend"""
+    
+    @pytest.mark.asyncio
+    async def test_success_event_notifies_user(self, receiver, storage, application):
+        """Test: Success event sends the completion message"""
+        response = await post_event(receiver, {
+            "user_telegram_id": 42,
+            "status": {"Success": {"pumped_amount_wei": "500000000000000000"}}
+        })
+        
+        assert response.status_code == 202
+        await receiver.join()
+        application.bot.send_message.assert_awaited_once()
+        assert "0.5000 BNB" in application.bot.send_message.call_args.kwargs["text"]
+        assert not storage.get(42).backend_started
+        
+        # duplicate delivery is ignored
+        response = await post_event(receiver, {
+            "user_telegram_id": 42,
+            "status": {"Success": {}}
+        })
+        assert response.status_code == 202
+        await receiver.join()
+        application.bot.send_message.assert_awaited_once()
+    
+    @pytest.mark.asyncio
+    async def test_answers_before_notification_is_sent(self, receiver, application):
+        """Test: the backend gets 202 without waiting for the Telegram send"""
+        release = asyncio.Event()
+        
+        async def slow_send(**kwargs):
+            await release.wait()
+        
+        application.bot.send_message = AsyncMock(side_effect=slow_send)
+        response = await asyncio.wait_for(
+            post_event(receiver, {"user_telegram_id": 42, "status": {"Success": {}}}),
+            timeout=1
+        )
+        
+        assert response.status_code == 202
+        release.set()
+        await receiver.join()
+        application.bot.send_message.assert_awaited_once()
+    
+    @pytest.mark.asyncio
+    async def test_paused_event_updates_session(self, receiver, storage):
+        """Test: Paused event marks the local session paused"""
+        response = await post_event(receiver, {"user_telegram_id": 42, "status": "Paused"})
+        
+        assert response.status_code == 202
+        await receiver.join()
+        assert storage.get(42).is_paused
+    
+    @pytest.mark.asyncio
+    async def test_rejects_bad_secret_and_payload(self, receiver, application):
+        """Test: wrong secret and malformed payloads are rejected"""
+        response = await post_event(receiver, {"user_telegram_id": 42, "status": "Paused"}, secret="wrong")
+        assert response.status_code == 401
+        
+        response = await post_event(receiver, {"user_telegram_id": 42, "status": "Paused"}, secret="")
+        assert response.status_code == 401
+        
+        response = await post_event(receiver, {"status": "Paused"})
+        assert response.status_code == 400
+        
+        await receiver.join()
+        application.bot.send_message.assert_not_awaited()
+    
+    def test_secret_is_required(self, application):
+        """Test: the receiver cannot be created without a shared secret"""
+        with pytest.raises(ValueError):
+            SessionEventReceiver(application, "127.0.0.1", 0, secret="")
+
+
+class TestHttpServer:
+    """Test request parsing limits of the embedded HTTP server"""
+    
+    @pytest.fixture
+    async def server(self):
+        async def ok(request):
+            return HttpResponse(200)
+        
+        server = HttpServer("127.0.0.1", 0, max_line_bytes=256, max_headers=5)
+        server.route("POST", "/", ok)
+        await server.start()
+        yield server
+        await server.stop()
+    
+    async def raw_status(self, server, request: bytes) -> int:
+        reader, writer = await asyncio.open_connection("127.0.0.1", server.port)
+        writer.write(request)
+        await writer.drain()
+        status_line = await asyncio.wait_for(reader.readline(), timeout=1)
+        writer.close()
+        return int(status_line.split()[1])
+    
+    @pytest.mark.asyncio
+    async def test_malformed_requests_get_an_answer(self, server):
+        """Test: negative length, over-long lines and too many headers are refused, not dropped"""
+        assert await self.raw_status(server, b"POST / HTTP/1.1\r\nContent-Length: 0\r\n\r\n") == 200
+        assert await self.raw_status(server, b"POST / HTTP/1.1\r\nContent-Length: -1\r\n\r\n") == 400
+        assert await self.raw_status(server, b"POST / HTTP/1.1\r\nX-Long: " + b"a" * 1024 + b"\r\n\r\n") == 431
+        assert await self.raw_status(server, b"POST /" + b"a" * 1024 + b" HTTP/1.1\r\n\r\n") == 414
+        
+        headers = b"".join(b"X-%d: 1\r\n" % i for i in range(10))
+        assert await self.raw_status(server, b"POST / HTTP/1.1\r\n" + headers + b"\r\n") == 431
@@ -0,0 +1,130 @@
+"""
+Tests for idle per-user state eviction
+"""
+
+import pytest
+from unittest.mock import Mock, patch
+from telegram.ext import CommandHandler, ConversationHandler
+
+from models.session import SessionStorage
+from models.sqlite_storage import SqliteSessionStorage
+from services import eviction
+from services.eviction import IdleEvictor
+
+
+@pytest.fixture
+def storage():
+    storage = SessionStorage()
+    with patch.object(eviction, 'session_storage', storage):
+        yield storage
+
+
+@pytest.fixture
+def application():
+    application = Mock()
+    application.user_data = {}
+    application.bot_data = {}
+    application.handlers = {}
+    application.drop_user_data = Mock(side_effect=lambda user_id: application.user_data.pop(user_id))
+    return application
+
+
+class TestIdleEvictor:
+    """Test TTL eviction of per-user state"""
+    
+    def test_idle_user_state_is_dropped_everywhere(self, storage, application):
+        """Test: session, user_data and message record go once the TTL passes"""
+        evictor = IdleEvictor(ttl=60)
+        storage.create(1).token_ca = "0xabc"
+        application.user_data[1] = {"config_message_id": 10, "max_swap_amount_wei": "1"}
+        storage.messages.set_config_message(1, chat_id=1, message_id=10)
+        storage.messages.set_config_message(2, chat_id=2, message_id=30)
+        evictor.touch(1, now=0)
+        evictor.touch(2, now=50)
+        
+        evicted, reclaimed = evictor.evict(application, now=100)
+        
+        assert evicted == 1 and reclaimed > 0
+        assert not storage.exists(1)
+        assert 1 not in application.user_data
+        assert 1 not in storage.messages and 2 in storage.messages
+        assert len(evictor) == 1
+    
+    def test_running_sessions_are_exempt(self, storage, application):
+        """Test: a user with a session running on the backend keeps everything"""
+        evictor = IdleEvictor(ttl=60)
+        storage.create(1).backend_started = True
+        application.user_data[1] = {"config_message_id": 10}
+        evictor.touch(1, now=0)
+        
+        assert evictor.evict(application, now=1000) == (0, 0)
+        assert storage.exists(1) and 1 in application.user_data
+    
+    def test_untracked_state_starts_idle_period(self, storage, application):
+        """Test: sessions loaded without recorded activity are evicted one TTL later, not at once"""
+        evictor = IdleEvictor(ttl=60)
+        storage.create(1)
+        
+        assert evictor.evict(application, now=100) == (0, 0)
+        assert evictor.evict(application, now=161)[0] == 1
+        assert not storage.exists(1)
+    
+    def test_idle_conversation_is_ended(self, storage, application):
+        """Test: the user's conversation state goes, other users keep theirs"""
+        evictor = IdleEvictor(ttl=60)
+        conversation = ConversationHandler(
+            entry_points=[CommandHandler("start", Mock())], states={}, fallbacks=[]
+        )
+        conversation._conversations.update({(1, 1): 0, (2, 2): 0})
+        application.handlers = {0: [conversation]}
+        evictor.touch(1, now=0)
+        evictor.touch(2, now=50)
+        
+        assert evictor.evict(application, now=100)[0] == 1
+        assert dict(conversation._conversations) == {(2, 2): 0}
+    
+    @pytest.mark.asyncio
+    async def test_persisted_state_is_kept(self, application, tmp_path):
+        """Test: eviction frees memory only, the user's rows are read back on their next visit"""
+        storage = SqliteSessionStorage(str(tmp_path / "sessions.db"))
+        storage.create(1).token_ca = "0xabc"
+        storage.messages.set_config_message(1, chat_id=1, message_id=10)
+        evictor = IdleEvictor(ttl=60)
+        evictor.touch(1, now=0)
+        
+        with patch.object(eviction, 'session_storage', storage):
+            # not written yet, kept until the next flush
+            assert evictor.evict(application, now=100) == (0, 0)
+            await storage.flush()
+            assert evictor.evict(application, now=100)[0] == 1
+        
+        assert storage._loaded == {} and storage.pending == 0
+        await storage.flush()
+        restarted = SqliteSessionStorage(str(tmp_path / "sessions.db"))
+        assert restarted.get(1).token_ca == "0xabc"
+        
+        assert storage.get(1).token_ca == "0xabc"
+        assert storage.messages.get(1).config_message_id == 10
+    
+    def test_only_users_with_state_are_counted(self, storage, application):
+        """Test: a user with nothing held in memory is forgotten but not counted as evicted"""
+        evictor = IdleEvictor(ttl=60)
+        evictor.touch(1, now=0)
+        
+        assert evictor.evict(application, now=100) == (0, 0)
+        assert len(evictor) == 0
+    
+    def test_unknown_ptb_version_leaves_conversations(self, storage, application):
+        """Test: the private conversation dict is only touched on PTB versions known to have it"""
+        evictor = IdleEvictor(ttl=60)
+        conversation = ConversationHandler(
+            entry_points=[CommandHandler("start", Mock())], states={}, fallbacks=[]
+        )
+        conversation._conversations[(1, 1)] = 0
+        application.handlers = {0: [conversation]}
+        storage.create(1)
+        evictor.touch(1, now=0)
+        
+        with patch.object(eviction, 'CONVERSATION_STORE_VERSIONS', ((0, 0), (1, 0))):
+            assert evictor.evict(application, now=100)[0] == 1
+        assert (1, 1) in conversation._conversations
@@ -0,0 +1,73 @@
+"""
+Tests for concurrent backend calls inside handlers
+"""
+
+import asyncio
+import time
+import pytest
+from unittest.mock import AsyncMock, Mock, patch
+
+from handlers.session import receive_token_ca
+from models.session import SessionStorage
+from utils import fetch_all, failed
+
+
+def slow(result, delay: float):
+    """AsyncMock answering after delay"""
+    async def call(*args, **kwargs):
+        await asyncio.sleep(delay)
+        if isinstance(result, Exception):
+            raise result
+        return result
+    return AsyncMock(side_effect=call)
+
+
+class TestFetchAll:
+    """Test the concurrent fetch helper"""
+    
+    @pytest.mark.asyncio
+    async def test_failure_degrades_one_field(self):
+        """Test: one failed call doesn't cancel or fail the others"""
+        results = await fetch_all(
+            ok=slow({"ui": "1.0"}, 0.01)(),
+            broken=slow(RuntimeError("down"), 0)()
+        )
+        
+        assert results["ok"] == {"ui": "1.0"}
+        assert failed(results["broken"])
+
+
+class TestReceiveTokenCa:
+    """Test token analysis latency"""
+    
+    @pytest.mark.asyncio
+    async def test_latency_close_to_slowest_call(self):
+        """Test: handler waits about as long as its slowest backend call, not the sum"""
+        storage = SessionStorage()
+        session = storage.create(123456)
+        session.backend_started = True
+        
+        update = Mock()
+        update.effective_user.id = 123456
+        update.message.text.strip = Mock(return_value="0x718447E29B90D00461966D01E533Fa1b69574444")
+        update.message.reply_text = AsyncMock(return_value=Mock(message_id=1, chat_id=123456))
+        context = Mock()
+        context.user_data = {}
+        context.application.bot_data = {}
+        
+        with patch('handlers.session.session_storage', storage), \
+                patch('handlers.session.api') as mock_api:
+            mock_api.check_token_supported = slow({"is_supported": True}, 0.1)
+            mock_api.get_token_pools = slow({"pools": {"pairs": [1, 2]}}, 0.1)
+            mock_api.get_session_status = slow({"status": "InProcess"}, 0.1)
+            mock_api.check_wallet_balance = slow(RuntimeError("down"), 0.15)
+            
+            started = time.monotonic()
+            await receive_token_ca(update, context)
+            elapsed = time.monotonic() - started
+        
+        assert elapsed < 0.3  # sequential would be 0.45s
+        text = update.message.reply_text.call_args.args[0]
+        assert "Active Pools: 2" in text
+        assert "In Progress" in text
+        assert "Balance: **N/A BNB**" in text
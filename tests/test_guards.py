@@ -0,0 +1,123 @@
+"""
+Tests for the handlers that run before the main ones
+"""
+
+import pytest
+from unittest.mock import AsyncMock, Mock, patch
+from telegram.ext import ApplicationHandlerStop
+
+from handlers.guards import reject_if_degraded, shed_when_overloaded, BUSY_TEXT, DEGRADED_TEXT
+from utils.admission import AdmissionController
+from utils.resilience import CircuitBreaker
+
+
+def callback_update(data: str) -> Mock:
+    update = Mock()
+    update.update_id = 1
+    update.message = None
+    update.callback_query.data = data
+    update.callback_query.answer = AsyncMock()
+    return update
+
+
+def command_update(text: str) -> Mock:
+    update = Mock()
+    update.update_id = 1
+    update.callback_query = None
+    update.message.text = text
+    update.message.reply_text = AsyncMock()
+    return update
+
+
+@pytest.fixture
+def session_down():
+    """Breaker of the session endpoint group open, the others closed"""
+    breaker = CircuitBreaker("session", failure_threshold=1, recovery_timeout=60)
+    breaker.record_failure()
+    with patch.dict('handlers.guards.api._breakers', {"session": breaker}):
+        yield
+
+
+@pytest.fixture
+def overloaded():
+    """Admission controller already at its limit"""
+    admission = AdmissionController(latency_target=1.0, min_limit=1, max_limit=1)
+    admission.on_start()
+    with patch('handlers.guards.api.admission', admission):
+        yield admission
+
+
+class TestShedWhenOverloaded:
+    """Test load shedding of low-value updates"""
+    
+    @pytest.mark.asyncio
+    async def test_refresh_is_shed(self, overloaded):
+        """Test: a balance refresh gets an immediate busy answer and stops there"""
+        update = callback_update("refresh_balance")
+        
+        with pytest.raises(ApplicationHandlerStop):
+            await shed_when_overloaded(update, Mock())
+        update.callback_query.answer.assert_awaited_once_with(BUSY_TEXT)
+        assert overloaded.stats()["shed"] == 1
+    
+    @pytest.mark.asyncio
+    async def test_entry_and_config_pass(self, overloaded):
+        """Test: /start, config prompts and typed values are never shed"""
+        for data in ("set_pump_amount", "set_swap_amount"):
+            update = callback_update(data)
+            await shed_when_overloaded(update, Mock())
+            update.callback_query.answer.assert_not_awaited()
+        
+        for text in ("/start", "0.5"):
+            update = command_update(text)
+            await shed_when_overloaded(update, Mock())
+            update.message.reply_text.assert_not_awaited()
+        
+        update = command_update("/balance")
+        with pytest.raises(ApplicationHandlerStop):
+            await shed_when_overloaded(update, Mock())
+        update.message.reply_text.assert_awaited_once_with(BUSY_TEXT)
+        assert overloaded.stats()["shed"] == 1
+    
+    @pytest.mark.asyncio
+    async def test_critical_actions_pass(self, overloaded):
+        """Test: pause and resume are never shed"""
+        for data in ("pause_pump", "resume_pump", "start_pump"):
+            update = callback_update(data)
+            await shed_when_overloaded(update, Mock())
+            update.callback_query.answer.assert_not_awaited()
+    
+    @pytest.mark.asyncio
+    async def test_refresh_passes_below_limit(self):
+        """Test: refreshes go through while the backend keeps up"""
+        update = callback_update("refresh_session_status")
+        admission = AdmissionController(latency_target=1.0, min_limit=1, max_limit=10)
+        with patch('handlers.guards.api.admission', admission):
+            await shed_when_overloaded(update, Mock())
+        update.callback_query.answer.assert_not_awaited()
+
+
+class TestRejectIfDegraded:
+    """Test fast rejection of updates whose backend groups are failing fast"""
+    
+    @pytest.mark.asyncio
+    async def test_update_needing_open_group_is_rejected(self, session_down):
+        """Test: a status refresh is answered at once while the session group is open"""
+        update = callback_update("refresh_session_status")
+        
+        with pytest.raises(ApplicationHandlerStop):
+            await reject_if_degraded(update, Mock())
+        update.callback_query.answer.assert_awaited_once_with(DEGRADED_TEXT, show_alert=True)
+    
+    @pytest.mark.asyncio
+    async def test_other_groups_and_critical_actions_pass(self, session_down):
+        """Test: balance, pause/resume and local-only buttons still reach their handlers"""
+        for data in ("refresh_balance", "pause_pump", "resume_pump", "set_delay", "cancel_start"):
+            update = callback_update(data)
+            await reject_if_degraded(update, Mock())
+            update.callback_query.answer.assert_not_awaited()
+        
+        for text in ("/start", "/balance@pump_bot", "/help", "0.5"):
+            update = command_update(text)
+            await reject_if_degraded(update, Mock())
+            update.message.reply_text.assert_not_awaited()
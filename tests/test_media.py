@@ -0,0 +1,76 @@
+"""
+Tests for the media cache
+"""
+
+import pytest
+from unittest.mock import AsyncMock, Mock
+
+from telegram.error import BadRequest
+
+from services.media import MediaCache
+
+
+def photo_message(file_id: str) -> Mock:
+    message = Mock()
+    message.photo = [Mock(file_id=f"{file_id}-small"), Mock(file_id=file_id)]
+    return message
+
+
+@pytest.fixture
+def cache(tmp_path):
+    path = tmp_path / "welcome.jpg"
+    path.write_bytes(b"jpeg")
+    cache = MediaCache()
+    assert cache.preload("welcome.jpg", path)
+    return cache
+
+
+class TestMediaCache:
+    """Test upload-once behaviour"""
+    
+    @pytest.mark.asyncio
+    async def test_reuses_file_id_after_first_upload(self, cache):
+        """Test: first send uploads bytes, later sends use the file_id"""
+        bot = Mock()
+        bot.send_photo = AsyncMock(return_value=photo_message("file-1"))
+        
+        await cache.send_photo(bot, "welcome.jpg", chat_id=1)
+        await cache.send_photo(bot, "welcome.jpg", chat_id=2)
+        
+        first, second = bot.send_photo.call_args_list
+        assert not isinstance(first.kwargs["photo"], str)
+        assert second.kwargs["photo"] == "file-1"
+    
+    @pytest.mark.asyncio
+    async def test_reuploads_when_file_id_rejected(self, cache):
+        """Test: invalid file_id falls back to upload and caches the new one"""
+        cache._file_ids["welcome.jpg"] = "stale"
+        bot = Mock()
+        bot.send_photo = AsyncMock(side_effect=[
+            BadRequest("Wrong file identifier/http url specified"),
+            photo_message("file-2")
+        ])
+        
+        await cache.send_photo(bot, "welcome.jpg", chat_id=1)
+        
+        assert bot.send_photo.await_count == 2
+        assert cache.file_id("welcome.jpg") == "file-2"
+    
+    @pytest.mark.asyncio
+    async def test_other_bad_request_is_not_reuploaded(self, cache):
+        """Test: a BadRequest unrelated to the file_id is raised without a second upload"""
+        cache._file_ids["welcome.jpg"] = "file-1"
+        bot = Mock()
+        bot.send_photo = AsyncMock(side_effect=BadRequest("Can't parse entities: can't find end of the entity"))
+        
+        with pytest.raises(BadRequest):
+            await cache.send_photo(bot, "welcome.jpg", chat_id=1, caption="*oops")
+        
+        assert bot.send_photo.await_count == 1
+        assert cache.file_id("welcome.jpg") == "file-1"
+    
+    def test_missing_asset(self, tmp_path):
+        """Test: missing file is reported, not raised"""
+        cache = MediaCache()
+        assert not cache.preload("missing.jpg", tmp_path / "missing.jpg")
+        assert not cache.has("missing.jpg")
@@ -0,0 +1,100 @@
+"""
+Tests for rate limiting of outbound Telegram requests
+"""
+
+import asyncio
+import pytest
+from unittest.mock import AsyncMock
+
+from telegram.error import RetryAfter
+
+from services import PriorityRateLimiter, INTERACTIVE, COMPLETION, BROADCAST
+
+
+async def make_limiter(**kwargs) -> PriorityRateLimiter:
+    options = dict(global_rate=100.0, chat_rate=100.0, chat_burst=1.0, group_rate=100.0)
+    options.update(kwargs)
+    limiter = PriorityRateLimiter(**options)
+    await limiter.initialize()
+    return limiter
+
+
+def send(limiter, chat_id, priority=None, callback=None, order=None, name=None):
+    """process_request for one sendMessage, appending name to order when it goes out"""
+    async def default_callback():
+        order.append(name)
+    return limiter.process_request(
+        callback or default_callback, (), {}, "sendMessage", {"chat_id": chat_id}, priority
+    )
+
+
+class TestPriorityRateLimiter:
+    """Test pacing and ordering of outbound requests"""
+    
+    @pytest.mark.asyncio
+    async def test_interactive_goes_before_queued_notifications(self):
+        """Test: once the global bucket is empty, waiting requests go out by priority"""
+        limiter = await make_limiter(global_rate=20.0)
+        limiter._global.tokens = 0
+        order = []
+        
+        await asyncio.gather(
+            send(limiter, 1, BROADCAST, order=order, name="broadcast"),
+            send(limiter, 2, COMPLETION, order=order, name="completion"),
+            send(limiter, 3, None, order=order, name="interactive"),
+        )
+        
+        assert order == ["interactive", "completion", "broadcast"]
+        stats = limiter.stats()
+        assert stats["interactive"]["count"] == 1
+        assert stats["broadcast"]["queued"] == 0
+    
+    @pytest.mark.asyncio
+    async def test_throttled_chat_does_not_block_others(self):
+        """Test: a chat out of tokens waits without holding up other chats"""
+        limiter = await make_limiter(chat_rate=2.0)
+        order = []
+        
+        first = asyncio.create_task(send(limiter, 1, INTERACTIVE, order=order, name="chat 1"))
+        await first
+        second = asyncio.create_task(send(limiter, 1, INTERACTIVE, order=order, name="chat 1 again"))
+        await asyncio.sleep(0)
+        await send(limiter, 2, BROADCAST, order=order, name="chat 2")
+        
+        assert order == ["chat 1", "chat 2"]
+        await asyncio.wait_for(second, timeout=1)
+        assert order[-1] == "chat 1 again"
+    
+    @pytest.mark.asyncio
+    async def test_groups_get_stricter_limit(self):
+        """Test: negative chat IDs use the group rate and no burst"""
+        limiter = await make_limiter(chat_burst=3.0, group_rate=0.5)
+        now = limiter._global.updated
+        assert limiter._chat_bucket(-100, now).rate == 0.5
+        assert limiter._chat_bucket(-100, now).burst == 1
+        assert limiter._chat_bucket(100, now).burst == 3.0
+    
+    @pytest.mark.asyncio
+    async def test_retry_after_pauses_and_retries(self):
+        """Test: a flood limit pauses sending for retry_after, then the request is retried"""
+        limiter = await make_limiter()
+        callback = AsyncMock(side_effect=[RetryAfter(0.05), "sent"])
+        
+        loop = asyncio.get_running_loop()
+        started = loop.time()
+        result = await send(limiter, 1, COMPLETION, callback=callback)
+        
+        assert result == "sent"
+        assert callback.await_count == 2
+        assert loop.time() - started >= 0.04
+        assert limiter.retries == 1
+    
+    @pytest.mark.asyncio
+    async def test_retry_after_gives_up_after_max_retries(self):
+        """Test: RetryAfter is raised once max_retries is used up"""
+        limiter = await make_limiter(max_retries=1)
+        callback = AsyncMock(side_effect=RetryAfter(0.01))
+        
+        with pytest.raises(RetryAfter):
+            await send(limiter, 1, callback=callback)
+        assert callback.await_count == 2
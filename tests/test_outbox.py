@@ -0,0 +1,126 @@
+"""
+Tests for the durable completion notification outbox
+"""
+
+import pytest
+from unittest.mock import AsyncMock, Mock, patch
+
+from telegram.error import Forbidden, NetworkError
+
+from services import outbox as outbox_module
+from services import NotificationOutbox
+
+PAYLOAD = {"chat_id": 42, "text": "done", "delete_chat_id": 42, "delete_message_id": 7}
+
+
+@pytest.fixture
+def bot():
+    bot = Mock()
+    bot.send_message = AsyncMock()
+    bot.delete_message = AsyncMock()
+    bot.edit_message_text = AsyncMock()
+    return bot
+
+
+@pytest.fixture
+def path(tmp_path):
+    return str(tmp_path / "outbox.db")
+
+
+@pytest.fixture(autouse=True)
+def no_backoff_jitter():
+    """Retries are due exactly base_delay * 2**n later"""
+    with patch.object(outbox_module, 'backoff_delay', lambda attempt, base, cap: min(cap, base * 2 ** attempt)):
+        yield
+
+
+class TestNotificationOutbox:
+    """Test durable delivery of notifications"""
+    
+    @pytest.mark.asyncio
+    async def test_delivered_once_per_key(self, path, bot):
+        """Test: a notification is sent once however often it is enqueued or delivered"""
+        outbox = NotificationOutbox(path)
+        assert await outbox.enqueue("completion:42:1", 42, PAYLOAD)
+        assert not await outbox.enqueue("completion:42:1", 42, PAYLOAD)
+        
+        assert await outbox.deliver(bot, "completion:42:1")
+        assert not await outbox.deliver(bot, "completion:42:1")
+        
+        bot.send_message.assert_awaited_once()
+        assert bot.send_message.call_args.kwargs["text"] == "done"
+        bot.delete_message.assert_awaited_once()
+        assert await outbox.pending() == 0
+    
+    @pytest.mark.asyncio
+    async def test_failed_send_is_retried_with_backoff(self, path, bot):
+        """Test: a failed send stays pending and is retried once its backoff delay has passed"""
+        outbox = NotificationOutbox(path, base_delay=60)
+        bot.send_message.side_effect = [NetworkError("blip"), None]
+        await outbox.enqueue("completion:42:1", 42, PAYLOAD)
+        
+        assert not await outbox.deliver(bot, "completion:42:1")
+        assert await outbox.pending() == 1
+        
+        # not due yet
+        assert await outbox.run_due(bot) == 0
+        assert bot.send_message.await_count == 1
+        
+        with patch.object(outbox_module.time, 'time', return_value=outbox_module.time.time() + 61):
+            assert await outbox.run_due(bot) == 1
+        assert bot.send_message.await_count == 2
+        assert outbox.stats() == {"delivered": 1, "retried": 1, "failed": 0}
+    
+    @pytest.mark.asyncio
+    async def test_pending_notifications_survive_restart(self, path, bot):
+        """Test: a notification not sent before shutdown is delivered by the next process"""
+        outbox = NotificationOutbox(path)
+        await outbox.enqueue("completion:42:1", 42, PAYLOAD)
+        outbox.close()
+        
+        restarted = NotificationOutbox(path)
+        assert await restarted.run_due(bot) == 1
+        bot.send_message.assert_awaited_once()
+        
+        # delivered state survives as well, so a repeated report is not sent again
+        restarted.close()
+        restarted = NotificationOutbox(path)
+        assert not await restarted.enqueue("completion:42:1", 42, PAYLOAD)
+        assert await restarted.run_due(bot) == 0
+        bot.send_message.assert_awaited_once()
+    
+    @pytest.mark.asyncio
+    async def test_blocked_bot_is_not_retried(self, path, bot):
+        """Test: Forbidden marks the notification failed right away"""
+        outbox = NotificationOutbox(path)
+        bot.send_message.side_effect = Forbidden("bot was blocked by the user")
+        await outbox.enqueue("completion:42:1", 42, PAYLOAD)
+        
+        assert not await outbox.deliver(bot, "completion:42:1")
+        assert await outbox.pending() == 0
+        assert outbox.stats()["failed"] == 1
+    
+    @pytest.mark.asyncio
+    async def test_gives_up_after_max_attempts(self, path, bot):
+        """Test: a notification failing max_attempts times is dropped"""
+        outbox = NotificationOutbox(path, max_attempts=2, base_delay=0)
+        bot.send_message.side_effect = NetworkError("down")
+        await outbox.enqueue("completion:42:1", 42, PAYLOAD)
+        
+        await outbox.deliver(bot, "completion:42:1")
+        await outbox.run_due(bot)
+        
+        assert bot.send_message.await_count == 2
+        assert await outbox.pending() == 0
+        assert outbox.stats() == {"delivered": 0, "retried": 1, "failed": 1}
+    
+    @pytest.mark.asyncio
+    async def test_workers_deliver_backlog(self, path, bot):
+        """Test: run_due sends every due notification through the worker pool"""
+        outbox = NotificationOutbox(path, workers=3)
+        for telegram_id in range(10):
+            await outbox.enqueue(f"completion:{telegram_id}:1", telegram_id, {"chat_id": telegram_id, "text": "done"})
+        
+        assert await outbox.run_due(bot) == 10
+        assert {call.kwargs["chat_id"] for call in bot.send_message.await_args_list} == set(range(10))
+        bot.delete_message.assert_not_awaited()
@@ -0,0 +1,42 @@
+"""
+Tests for local BNB/USD conversion
+"""
+
+import time
+import pytest
+from decimal import Decimal
+from unittest.mock import AsyncMock, patch
+
+from services import pricing
+from services.pricing import PriceFeed
+
+
+class TestPriceFeed:
+    """Test conversions from the cached rate"""
+    
+    @pytest.mark.asyncio
+    async def test_converts_locally_with_fresh_price(self):
+        """Test: one backend call for the rate, conversions are exact and local"""
+        with patch.object(pricing, 'api') as mock_api:
+            mock_api.bnb_to_usd = AsyncMock(return_value={"amount_usd": 612.34})
+            feed = PriceFeed(max_age=60)
+            await feed.refresh()
+            
+            assert await feed.bnb_to_usd("500000000000000000") == Decimal("306.17")
+            assert await feed.bnb_to_usd("1") == Decimal("0.00000000000000061234")
+            mock_api.bnb_to_usd.assert_awaited_once_with("1000000000000000000")
+    
+    @pytest.mark.asyncio
+    async def test_stale_price_falls_back_to_backend(self):
+        """Test: stale or missing rate converts through the backend endpoint"""
+        with patch.object(pricing, 'api') as mock_api:
+            mock_api.bnb_to_usd = AsyncMock(return_value={"amount_usd": 10.5})
+            feed = PriceFeed(max_age=60)
+            
+            assert await feed.bnb_to_usd("123") == Decimal("10.5")
+            
+            await feed.refresh()
+            feed._updated_at = time.monotonic() - 61
+            assert feed.price() is None
+            await feed.bnb_to_usd("123")
+            assert mock_api.bnb_to_usd.await_args.args == ("123",)
@@ -0,0 +1,89 @@
+"""
+Tests for durable session storage
+"""
+
+import pytest
+
+from models.sqlite_storage import SqliteSessionStorage
+
+
+@pytest.fixture
+def db_path(tmp_path):
+    return str(tmp_path / "sessions.db")
+
+
+class TestSqliteSessionStorage:
+    """Test SQLite-backed SessionStorage"""
+    
+    @pytest.mark.asyncio
+    async def test_sessions_survive_restart(self, db_path):
+        """Test: saved configuration and backend flags are loaded by a new instance"""
+        storage = SqliteSessionStorage(db_path)
+        session = storage.create(1)
+        session.token_ca = "0xabc"
+        session.backend_started = True
+        session.is_paused = True
+        storage.save(1)
+        storage.create(2)
+        storage.delete(2)
+        await storage.flush()
+        storage.close()
+        
+        restarted = SqliteSessionStorage(db_path)
+        restored = restarted.get(1)
+        assert restored.token_ca == "0xabc"
+        assert restored.backend_started and restored.is_paused
+        assert not restarted.exists(2)
+        assert [telegram_id for telegram_id, _ in restarted.items()] == [1]
+    
+    @pytest.mark.asyncio
+    async def test_writes_are_batched(self, db_path):
+        """Test: nothing reaches the database until flush, then one batch holds every change"""
+        storage = SqliteSessionStorage(db_path)
+        for telegram_id in range(100):
+            storage.create(telegram_id)
+        
+        reader = SqliteSessionStorage(db_path)
+        assert not reader.exists(0)
+        assert storage.pending == 100
+        
+        await storage.flush()
+        assert storage.pending == 0
+        assert len(list(SqliteSessionStorage(db_path).items())) == 100
+    
+    def test_loaded_lazily(self, db_path):
+        """Test: the database is read on first use, not on construction"""
+        storage = SqliteSessionStorage(db_path)
+        assert storage._loaded is None
+        assert storage.get(1) is None
+        assert storage._loaded == {}
+    
+    def test_string_amounts_are_restored_as_ints(self, db_path):
+        """Test: rows written with decimal string amounts load as int wei"""
+        storage = SqliteSessionStorage(db_path)
+        storage._db.execute(
+            "INSERT INTO sessions VALUES (1, ?)",
+            ('{"token_ca": "0xabc", "pump_amount_wei": "1000000000000000000", "swap_amount_wei": ""}',)
+        )
+        storage._db.commit()
+        
+        session = storage.get(1)
+        assert session.pump_amount_wei == 10**18 and session.pump_configured
+        assert session.swap_amount_wei == 0 and not session.swap_configured
+    
+    @pytest.mark.asyncio
+    async def test_message_registry_is_persisted(self, db_path):
+        """Test: config and status message IDs are batched with sessions and survive restart"""
+        storage = SqliteSessionStorage(db_path)
+        storage.messages.set_config_message(1, chat_id=10, message_id=100)
+        storage.messages.set_status_message(1, chat_id=10, message_id=101)
+        storage.messages.set_config_message(2, chat_id=20, message_id=200)
+        storage.messages.delete(2)
+        assert storage.pending == 2
+        await storage.flush()
+        storage.close()
+        
+        restarted = SqliteSessionStorage(db_path)
+        record = restarted.messages.get(1)
+        assert (record.chat_id, record.config_message_id, record.status_message_id) == (10, 100, 101)
+        assert restarted.messages.get(2) is None
@@ -10,14 +10,12 @@ import pytest
 from unittest.mock import AsyncMock, Mock, patch, MagicMock
 from decimal import Decimal
 
-# Mock telegram imports
+# Mock telegram imports, only while importing the handlers so later test modules get the real package
 import sys
-sys.modules['telegram'] = MagicMock()
-sys.modules['telegram.ext'] = MagicMock()
-
-from handlers.session import receive_swap_amount, receive_delay
-from models.session import UserSession, SessionStorage
-from states import ConversationState
+with patch.dict(sys.modules, {'telegram': MagicMock(), 'telegram.ext': MagicMock()}):
+    from handlers.session import receive_swap_amount, receive_delay
+    from models.session import UserSession, SessionStorage
+    from states import ConversationState
 
 
 @pytest.fixture
@@ -93,7 +91,7 @@ class TestSwapAmountUpdate:
         
         # Assert
         assert result == ConversationState.WAITING_TOKEN_CA
-        assert session.swap_amount_wei == "50000000000000000"  # 0.05 BNB in wei
+        assert session.swap_amount_wei == 50000000000000000  # 0.05 BNB in wei
         # Should NOT call backend API (session not started)
         mock_api.set_session_swap_amount.assert_not_called()
         mock_update_menu.assert_called_once()
@@ -132,7 +130,7 @@ class TestSwapAmountUpdate:
         
         # Assert
         assert result == ConversationState.WAITING_TOKEN_CA
-        assert session.swap_amount_wei == "50000000000000000"
+        assert session.swap_amount_wei == 50000000000000000
         # Should CALL backend API (session is running)
         mock_api.set_session_swap_amount.assert_called_once_with(
             telegram_id, 
@@ -174,7 +172,7 @@ class TestSwapAmountUpdate:
         
         # Assert
         assert result == ConversationState.WAITING_TOKEN_CA
-        assert session.swap_amount_wei == "50000000000000000"
+        assert session.swap_amount_wei == 50000000000000000
         # Should STILL call backend API (even when paused)
         mock_api.set_session_swap_amount.assert_called_once_with(
             telegram_id, 
@@ -0,0 +1,169 @@
+"""
+Tests for the Telegram webhook receiver
+Posts recorded updates to a local receiver the way Telegram does
+"""
+
+import asyncio
+import httpx
+import pytest
+from unittest.mock import patch
+from telegram import User
+from telegram.ext import Application, CommandHandler, CallbackQueryHandler, ExtBot
+
+from services import WebhookReceiver
+
+SECRET = "s3cret"
+
+USER = {"id": 42, "is_bot": False, "first_name": "Test"}
+
+START_UPDATE = {
+    "update_id": 1001,
+    "message": {
+        "message_id": 10,
+        "date": 1700000000,
+        "chat": {"id": 42, "type": "private", "first_name": "Test"},
+        "from": USER,
+        "text": "/start",
+        "entities": [{"type": "bot_command", "offset": 0, "length": 6}]
+    }
+}
+
+REFRESH_UPDATE = {
+    "update_id": 1002,
+    "callback_query": {
+        "id": "cq1",
+        "from": USER,
+        "chat_instance": "1",
+        "data": "refresh_balance",
+        "message": {
+            "message_id": 11,
+            "date": 1700000000,
+            "chat": {"id": 42, "type": "private", "first_name": "Test"},
+            "text": "Balance"
+        }
+    }
+}
+
+
+@pytest.fixture
+def handled():
+    return []
+
+
+@pytest.fixture
+async def application(handled):
+    """Real application with handlers that record what they received"""
+    application = Application.builder().token("123:TEST").build()
+    
+    async def start(update, context):
+        handled.append(("start", update.effective_user.id))
+    
+    async def refresh(update, context):
+        handled.append((update.callback_query.data, update.effective_user.id))
+    
+    application.add_handler(CommandHandler("start", start))
+    application.add_handler(CallbackQueryHandler(refresh, pattern="^refresh_balance$"))
+    
+    # bot initialization calls getMe, which caches the bot user for command matching
+    async def get_me(*args, **kwargs):
+        application.bot._bot_user = User(id=123, is_bot=True, first_name="Bot", username="test_bot")
+        return application.bot._bot_user
+    
+    with patch.object(ExtBot, 'get_me', get_me):
+        await application.initialize()
+    yield application
+    await application.shutdown()
+
+
+@pytest.fixture
+async def receiver(application):
+    receiver = WebhookReceiver(application, "127.0.0.1", 0, "/telegram/webhook", SECRET, queue_size=2)
+    await receiver.start()
+    yield receiver
+    await receiver.stop()
+
+
+async def post_update(receiver, update, secret=SECRET):
+    async with httpx.AsyncClient(base_url=f"http://127.0.0.1:{receiver.port}") as telegram:
+        return await telegram.post(
+            "/telegram/webhook",
+            json=update,
+            headers={"X-Telegram-Bot-Api-Secret-Token": secret}
+        )
+
+
+class TestWebhookReceiver:
+    """Test updates posted by a stand-in for Telegram"""
+    
+    @pytest.mark.asyncio
+    async def test_recorded_updates_reach_handlers(self, receiver, handled):
+        """Test: message and callback query updates are acknowledged and dispatched"""
+        assert (await post_update(receiver, START_UPDATE)).status_code == 200
+        assert (await post_update(receiver, REFRESH_UPDATE)).status_code == 200
+        
+        await asyncio.wait_for(receiver.queue.join(), timeout=1)
+        assert handled == [("start", 42), ("refresh_balance", 42)]
+    
+    @pytest.mark.asyncio
+    async def test_wrong_secret_is_refused(self, receiver, handled):
+        """Test: updates without the setWebhook secret token are not processed"""
+        response = await post_update(receiver, START_UPDATE, secret="guess")
+        assert response.status_code == 403
+        
+        response = await post_update(receiver, START_UPDATE, secret="")
+        assert response.status_code == 403
+        
+        await receiver.queue.join()
+        assert handled == []
+    
+    @pytest.mark.asyncio
+    async def test_malformed_update_is_rejected(self, receiver):
+        """Test: a body that is not an update gets 400"""
+        async with httpx.AsyncClient(base_url=f"http://127.0.0.1:{receiver.port}") as telegram:
+            response = await telegram.post(
+                "/telegram/webhook",
+                content=b"not json",
+                headers={"X-Telegram-Bot-Api-Secret-Token": SECRET}
+            )
+        assert response.status_code == 400
+    
+    @pytest.mark.asyncio
+    async def test_full_queue_answers_busy(self, application, receiver, handled):
+        """Test: updates beyond the queue bound get 503 so Telegram redelivers them"""
+        release = asyncio.Event()
+        
+        async def slow(update, context):
+            await release.wait()
+        
+        application.add_handler(CommandHandler("start", slow), group=-1)
+        
+        statuses = []
+        for update_id in range(4):
+            statuses.append((await post_update(receiver, {**START_UPDATE, "update_id": update_id})).status_code)
+            await asyncio.sleep(0.01)
+        
+        # one update in the worker, two queued, the last one refused
+        assert statuses == [200, 200, 200, 503]
+        assert receiver.stats()["rejected"] == 1
+        
+        release.set()
+        await asyncio.wait_for(receiver.queue.join(), timeout=1)
+        assert len(handled) == 3
+    
+    @pytest.mark.asyncio
+    async def test_stop_gives_up_on_stuck_updates(self, application, handled):
+        """Test: shutdown waits for queued updates only up to the drain timeout"""
+        receiver = WebhookReceiver(
+            application, "127.0.0.1", 0, "/telegram/webhook", SECRET, queue_size=2, drain_timeout=0.05
+        )
+        await receiver.start()
+        
+        async def stuck(update, context):
+            await asyncio.Event().wait()
+        
+        application.add_handler(CommandHandler("start", stuck), group=-1)
+        assert (await post_update(receiver, START_UPDATE)).status_code == 200
+        await asyncio.sleep(0.01)
+        
+        await asyncio.wait_for(receiver.stop(), timeout=1)
+        assert receiver._workers == []
@@ -1,5 +1,8 @@
 """Utils module exports"""
 
 from .converters import bnb_to_wei, wei_to_bnb
+from .http_server import HttpServer, HttpRequest, HttpResponse
+from .concurrency import fetch_all, failed
+from .deadline import DeadlineExceeded, with_deadline
 
-__all__ = ['bnb_to_wei', 'wei_to_bnb']
+__all__ = ['bnb_to_wei', 'wei_to_bnb', 'HttpServer', 'HttpRequest', 'HttpResponse', 'fetch_all', 'failed', 'DeadlineExceeded', 'with_deadline']
@@ -0,0 +1,60 @@
+"""Adaptive concurrency limit used to shed low-value work when the backend slows down"""
+
+import time
+
+
+class AdmissionController:
+    """
+    AIMD limit on in-flight backend requests
+    
+    Every request that finishes within latency_target and without error raises
+    the limit by 1/limit, so it grows by about one per full window of requests.
+    A slow or failed request cuts it by backoff_ratio, at most once per
+    latency_target so a burst of slow answers counts as one signal.
+    """
+    
+    def __init__(
+        self,
+        latency_target: float,
+        min_limit: int,
+        max_limit: int,
+        backoff_ratio: float = 0.9
+    ):
+        self.latency_target = latency_target
+        self.min_limit = max(1, min_limit)
+        self.max_limit = max(self.min_limit, max_limit)
+        self.backoff_ratio = backoff_ratio
+        self.limit = float(self.max_limit)
+        self.in_flight = 0
+        self.shed = 0
+        self._last_decrease = float("-inf")
+    
+    def on_start(self) -> None:
+        self.in_flight += 1
+    
+    def on_finish(self, latency: float, ok: bool | None) -> None:
+        """Count a finished request; ok None (cancelled) leaves the limit alone"""
+        self.in_flight -= 1
+        if ok is None:
+            return
+        if ok and latency <= self.latency_target:
+            self.limit = min(self.max_limit, self.limit + 1 / self.limit)
+            return
+        now = time.monotonic()
+        if now - self._last_decrease >= self.latency_target:
+            self._last_decrease = now
+            self.limit = max(self.min_limit, self.limit * self.backoff_ratio)
+    
+    def overloaded(self) -> bool:
+        """Whether in-flight requests have reached the current limit"""
+        return self.in_flight >= int(self.limit)
+    
+    def try_admit(self) -> bool:
+        """Admit a piece of sheddable work, counting it as shed if the limit is reached"""
+        if self.overloaded():
+            self.shed += 1
+            return False
+        return True
+    
+    def stats(self) -> dict[str, float]:
+        return {"limit": int(self.limit), "in_flight": self.in_flight, "shed": self.shed}
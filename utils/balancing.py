@@ -0,0 +1,136 @@
+"""Client-side load balancing over backend replicas"""
+
+import asyncio
+import hashlib
+import time
+from typing import Awaitable, Callable, Hashable, Iterable
+
+
+class Replica:
+    """One backend base URL with its load and health"""
+    
+    def __init__(self, base_url: str):
+        self.base_url = base_url.rstrip("/")
+        self.outstanding = 0
+        self.ewma: float | None = None
+        self.failures = 0
+        self.ejected_until = 0.0
+        self.ejections = 0
+    
+    def ejected(self, now: float) -> bool:
+        return now < self.ejected_until
+    
+    def stats(self) -> dict[str, float]:
+        return {
+            "outstanding": self.outstanding,
+            "ewma": self.ewma or 0.0,
+            "ejected": self.ejected(time.monotonic()),
+            "ejections": self.ejections,
+        }
+
+
+class ReplicaBalancer:
+    """
+    Pick a replica per request by least outstanding requests or EWMA latency
+    
+    Passive health: consecutive failures eject a replica for ejection_seconds,
+    after which it is tried again. Active health: check() probes every replica
+    and ejects or restores it by the answer. Keyed picks (per-user stickiness)
+    use rendezvous hashing, so only users of an ejected replica move.
+    """
+    
+    LEAST_OUTSTANDING = "least_outstanding"
+    EWMA = "ewma"
+    
+    def __init__(
+        self,
+        base_urls: Iterable[str],
+        strategy: str = LEAST_OUTSTANDING,
+        failure_threshold: int = 3,
+        ejection_seconds: float = 30.0,
+        ewma_decay: float = 0.3
+    ):
+        self.replicas = [Replica(url) for url in dict.fromkeys(base_urls)]
+        if not self.replicas:
+            raise ValueError("At least one backend base URL is required")
+        self.strategy = strategy
+        self.failure_threshold = failure_threshold
+        self.ejection_seconds = ejection_seconds
+        self.ewma_decay = ewma_decay
+    
+    def _load(self, replica: Replica) -> float:
+        if self.strategy == self.EWMA:
+            # unmeasured replicas look fastest so they get sampled
+            return (replica.ewma or 0.0) * (replica.outstanding + 1)
+        return replica.outstanding
+    
+    @staticmethod
+    def _rank(key: Hashable, replica: Replica) -> bytes:
+        return hashlib.blake2b(f"{key}|{replica.base_url}".encode(), digest_size=8).digest()
+    
+    def pick(self, key: Hashable | None = None, exclude: Iterable[Replica] = ()) -> Replica:
+        """
+        Choose a replica for one request
+        
+        Args:
+            key: Stickiness key (e.g. telegram ID), None spreads by load
+            exclude: Replicas already tried for this call, avoided if anything else is left
+        """
+        now = time.monotonic()
+        candidates = [replica for replica in self.replicas if not replica.ejected(now)]
+        # with everything ejected, failing open beats refusing every request
+        candidates = candidates or list(self.replicas)
+        excluded = set(exclude)
+        candidates = [replica for replica in candidates if replica not in excluded] or candidates
+        
+        if key is not None:
+            return max(candidates, key=lambda replica: self._rank(key, replica))
+        return min(candidates, key=lambda replica: (self._load(replica), replica.ewma or 0.0))
+    
+    def on_start(self, replica: Replica) -> None:
+        replica.outstanding += 1
+    
+    def on_finish(self, replica: Replica, latency: float, ok: bool | None) -> None:
+        """Record a finished request; ok None (cancelled) counts toward neither health nor latency"""
+        replica.outstanding -= 1
+        if ok is None:
+            return
+        if not ok:
+            # a replica failing fast must not look fast
+            latency = max(latency, 2 * (replica.ewma or latency))
+        if replica.ewma is None:
+            replica.ewma = latency
+        else:
+            replica.ewma += self.ewma_decay * (latency - replica.ewma)
+        if ok:
+            replica.failures = 0
+            return
+        replica.failures += 1
+        if replica.failures >= self.failure_threshold:
+            self.eject(replica)
+    
+    def eject(self, replica: Replica) -> None:
+        now = time.monotonic()
+        if not replica.ejected(now):
+            replica.ejections += 1
+        replica.ejected_until = now + self.ejection_seconds
+        replica.failures = 0
+    
+    def restore(self, replica: Replica) -> None:
+        replica.ejected_until = 0.0
+        replica.failures = 0
+    
+    async def check(self, probe: Callable[[str], Awaitable[bool]]) -> None:
+        """Active health check: probe(base_url) True restores a replica, False or an error ejects it"""
+        results = await asyncio.gather(
+            *(probe(replica.base_url) for replica in self.replicas),
+            return_exceptions=True
+        )
+        for replica, healthy in zip(self.replicas, results):
+            if healthy is True:
+                self.restore(replica)
+            else:
+                self.eject(replica)
+    
+    def stats(self) -> dict[str, dict[str, float]]:
+        return {replica.base_url: replica.stats() for replica in self.replicas}
@@ -0,0 +1,161 @@
+"""In-memory caches"""
+
+import functools
+import inspect
+import time
+from collections import OrderedDict
+from dataclasses import dataclass
+from typing import Any, Callable, Hashable
+
+
+@dataclass(frozen=True)
+class CachePolicy:
+    """How responses of one endpoint are cached"""
+    ttl: float | None = None  # None keeps entries until evicted or invalidated
+    max_entries: int | None = None  # least recently used entries are evicted above this
+    negative_ttl: float | None = None  # TTL for answers matched by is_negative
+    is_negative: Callable[[Any], bool] | None = None
+    key: Callable[..., Hashable] | None = None  # builds cache key from call arguments
+
+
+class TTLCache:
+    """LRU cache with per-entry expiry where every read can state how old a value it accepts"""
+    
+    def __init__(self, ttl: float | None = None, max_entries: int | None = None):
+        self.ttl = ttl
+        self.max_entries = max_entries
+        # key -> (stored_at, expires_at, value), ordered from least to most recently used
+        self._entries: OrderedDict[Hashable, tuple[float, float | None, Any]] = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        # key -> generation of its last invalidation, least recent first; keys dropped from
+        # here raise the floor, so a fill racing them is discarded rather than kept by mistake
+        self._invalidated: OrderedDict[Hashable, int] = OrderedDict()
+        self._clock = 0
+        self._floor = 0
+    
+    def __len__(self) -> int:
+        return len(self._entries)
+    
+    def get(self, key: Hashable, max_age: float | None = None) -> Any | None:
+        """
+        Get cached value
+        
+        Args:
+            key: Cache key
+            max_age: Oldest acceptable value in seconds, defaults to the entry TTL
+            
+        Returns:
+            Cached value, or None if missing, expired or older than max_age
+        """
+        entry = self._entries.get(key)
+        if entry is None:
+            self.misses += 1
+            return None
+        
+        stored_at, expires_at, value = entry
+        now = time.monotonic()
+        if expires_at is not None and now > expires_at:
+            del self._entries[key]
+            self.misses += 1
+            return None
+        if max_age is not None and now - stored_at > max_age:
+            self.misses += 1
+            return None
+        
+        self._entries.move_to_end(key)
+        self.hits += 1
+        return value
+    
+    def generation(self, key: Hashable) -> int:
+        """Changes whenever key is invalidated, taken before a fill to pass on to set()"""
+        return self._invalidated.get(key, self._floor)
+    
+    def set(self, key: Hashable, value: Any, ttl: float | None = None, generation: int | None = None) -> None:
+        """
+        Store value, ttl overrides the cache TTL for this entry
+        
+        With generation, a value fetched before key was last invalidated is dropped.
+        """
+        if generation is not None and self.generation(key) != generation:
+            return
+        ttl = self.ttl if ttl is None else ttl
+        now = time.monotonic()
+        self._entries[key] = (now, None if ttl is None else now + ttl, value)
+        self._entries.move_to_end(key)
+        
+        if self.max_entries is not None:
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+                self.evictions += 1
+    
+    def invalidate(self, key: Hashable) -> None:
+        self._entries.pop(key, None)
+        self._clock += 1
+        self._invalidated[key] = self._clock
+        self._invalidated.move_to_end(key)
+        if self.max_entries is not None:
+            while len(self._invalidated) > self.max_entries:
+                _, self._floor = self._invalidated.popitem(last=False)
+    
+    def clear(self) -> None:
+        self._entries.clear()
+        self._invalidated.clear()
+        self._clock += 1
+        self._floor = self._clock
+    
+    def stats(self) -> dict[str, int]:
+        return {
+            "size": len(self._entries),
+            "hits": self.hits,
+            "misses": self.misses,
+            "evictions": self.evictions,
+        }
+
+
+def bind_call(signature: inspect.Signature, instance, args: tuple, kwargs: dict) -> tuple[tuple, Any]:
+    """Method arguments in declaration order without self and max_age, and max_age (None if absent)"""
+    bound = signature.bind(instance, *args, **kwargs)
+    bound.apply_defaults()
+    max_age = bound.arguments.pop("max_age", None)
+    return tuple(bound.arguments.values())[1:], max_age
+
+
+def cached(endpoint: str):
+    """
+    Cache an async client method by the policy registered for endpoint
+    
+    The instance must have a `_caches` dict of endpoint -> TTLCache and a
+    `cache_policies` dict of endpoint -> CachePolicy. A `max_age` argument,
+    if the method has one, bounds how old a cached answer may be;
+    max_age=0 always calls through. Answers to calls that were in flight
+    when their key was invalidated are returned but not cached.
+    """
+    def decorator(method):
+        signature = inspect.signature(method)
+        
+        @functools.wraps(method)
+        async def wrapper(self, *args, **kwargs):
+            policy: CachePolicy = self.cache_policies[endpoint]
+            cache: TTLCache = self._caches[endpoint]
+            
+            key_args, max_age = bind_call(signature, self, args, kwargs)
+            key = policy.key(*key_args) if policy.key else key_args
+            
+            if max_age != 0:
+                value = cache.get(key, max_age)
+                if value is not None:
+                    return value
+            
+            # an invalidate() while the call is out means its answer may predate the change
+            generation = cache.generation(key)
+            value = await method(self, *args, **kwargs)
+            if policy.is_negative and policy.is_negative(value):
+                if policy.negative_ttl:
+                    cache.set(key, value, ttl=policy.negative_ttl, generation=generation)
+            else:
+                cache.set(key, value, generation=generation)
+            return value
+        return wrapper
+    return decorator
@@ -0,0 +1,24 @@
+"""Helpers for running independent async calls together"""
+
+import asyncio
+from typing import Any, Awaitable
+
+
+async def fetch_all(**calls: Awaitable) -> dict[str, Any]:
+    """
+    Run independent calls concurrently
+    
+    Args:
+        calls: Awaitables by field name
+        
+    Returns:
+        Result by field name. A failed call gives its exception instead of a result
+        and does not cancel the others.
+    """
+    results = await asyncio.gather(*calls.values(), return_exceptions=True)
+    return dict(zip(calls.keys(), results))
+
+
+def failed(result: Any) -> bool:
+    """Check if a fetch_all result is an exception"""
+    return isinstance(result, BaseException)
@@ -0,0 +1,51 @@
+"""Per-update time budget shared by every backend call made while handling it"""
+
+import asyncio
+import contextvars
+import functools
+import time
+from contextvars import ContextVar
+
+_deadline: ContextVar[float | None] = ContextVar("deadline", default=None)
+
+
+class DeadlineExceeded(Exception):
+    """Raised instead of starting or finishing a call once the update's budget is spent"""
+
+
+# cancel message of a shared call dropped because every caller's deadline passed
+EXPIRED = "deadline expired"
+
+
+def cancelled_by_deadline(error: asyncio.CancelledError) -> bool:
+    """Check if a call was cancelled because the deadlines of everyone waiting on it passed"""
+    return EXPIRED in error.args
+
+
+def remaining() -> float | None:
+    """Seconds left in the current budget, None if no deadline is set"""
+    deadline = _deadline.get()
+    if deadline is None:
+        return None
+    return deadline - time.monotonic()
+
+
+def detached_context() -> contextvars.Context:
+    """Copy of the current context without a deadline, for work shared by several callers"""
+    context = contextvars.copy_context()
+    context.run(_deadline.set, None)
+    return context
+
+
+def with_deadline(seconds: float):
+    """Give every call of an async handler a fresh budget of seconds"""
+    def decorator(handler):
+        @functools.wraps(handler)
+        async def wrapper(*args, **kwargs):
+            token = _deadline.set(time.monotonic() + seconds)
+            try:
+                return await handler(*args, **kwargs)
+            finally:
+                _deadline.reset(token)
+        return wrapper
+    return decorator
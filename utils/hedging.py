@@ -0,0 +1,81 @@
+"""Hedged requests: a backup copy of a slow idempotent call, first answer wins"""
+
+import asyncio
+from typing import Any, Awaitable, Callable
+
+
+class HedgeBudget:
+    """Token bucket capping hedges to a fraction of primary calls"""
+    
+    def __init__(self, ratio: float, burst: float):
+        self.ratio = ratio
+        self.burst = burst
+        self._tokens = burst
+        self.hedges = 0
+        self.wins = 0
+        self.denied = 0
+    
+    def on_call(self) -> None:
+        """Earn budget for one primary call"""
+        self._tokens = min(self.burst, self._tokens + self.ratio)
+    
+    def try_acquire(self) -> bool:
+        """Spend budget on one hedge"""
+        if self._tokens >= 1:
+            self._tokens -= 1
+            self.hedges += 1
+            return True
+        self.denied += 1
+        return False
+    
+    def stats(self) -> dict[str, int]:
+        return {"hedges": self.hedges, "wins": self.wins, "denied": self.denied}
+
+
+async def hedged(
+    send: Callable[[], Awaitable[Any]],
+    delay: float,
+    budget: HedgeBudget,
+    is_failure: Callable[[Any], bool] | None = None
+) -> Any:
+    """
+    Call send; if it hasn't answered after delay, call it again and return the
+    first successful answer. The slower call is cancelled, as are both when the
+    caller is.
+    
+    A result for which is_failure returns True (e.g. a 503) loses the race like
+    an exception; it is returned only if no copy succeeds.
+    """
+    budget.on_call()
+    primary = asyncio.ensure_future(send())
+    backup = None
+    try:
+        done, _ = await asyncio.wait({primary}, timeout=delay)
+        if done or not budget.try_acquire():
+            return await primary
+        
+        backup = asyncio.ensure_future(send())
+        pending = {primary, backup}
+        error = None
+        failed_result = None
+        has_failed_result = False
+        while pending:
+            done, pending = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+            for task in done:
+                if task.exception() is not None:
+                    error = task.exception()
+                    continue
+                result = task.result()
+                if is_failure and is_failure(result):
+                    failed_result, has_failed_result = result, True
+                    continue
+                if task is backup:
+                    budget.wins += 1
+                return result
+        if has_failed_result:
+            return failed_result
+        raise error
+    finally:
+        for task in (primary, backup):
+            if task is not None and not task.done():
+                task.cancel()
@@ -0,0 +1,182 @@
+"""Minimal HTTP/1.1 server on asyncio streams for small JSON endpoints"""
+
+import asyncio
+import json
+import logging
+from dataclasses import dataclass, field
+from typing import Any, Awaitable, Callable
+
+logger = logging.getLogger(__name__)
+
+REASONS = {
+    200: "OK",
+    202: "Accepted",
+    400: "Bad Request",
+    401: "Unauthorized",
+    403: "Forbidden",
+    404: "Not Found",
+    405: "Method Not Allowed",
+    413: "Payload Too Large",
+    414: "URI Too Long",
+    431: "Request Header Fields Too Large",
+    500: "Internal Server Error",
+    503: "Service Unavailable",
+}
+
+
+@dataclass
+class HttpRequest:
+    """Parsed HTTP request"""
+    method: str
+    path: str
+    headers: dict[str, str] = field(default_factory=dict)  # lower-cased names
+    body: bytes = b""
+    
+    def json(self) -> Any:
+        return json.loads(self.body)
+
+
+@dataclass
+class HttpResponse:
+    """HTTP response with an optional JSON body"""
+    status: int = 200
+    body: Any = None
+
+
+Handler = Callable[[HttpRequest], Awaitable[HttpResponse]]
+
+
+class HttpServer:
+    """Serves registered (method, path) routes inside the running event loop"""
+    
+    def __init__(
+        self,
+        host: str,
+        port: int,
+        max_body_bytes: int = 1024 * 1024,
+        read_timeout: float = 30.0,
+        max_line_bytes: int = 8192,
+        max_headers: int = 100
+    ):
+        self.host = host
+        self.port = port
+        self.max_body_bytes = max_body_bytes
+        self.read_timeout = read_timeout
+        self.max_line_bytes = max_line_bytes
+        self.max_headers = max_headers
+        self._routes: dict[tuple[str, str], Handler] = {}
+        self._server: asyncio.AbstractServer | None = None
+    
+    def route(self, method: str, path: str, handler: Handler) -> None:
+        """Register handler for method and path"""
+        self._routes[(method.upper(), path)] = handler
+    
+    async def start(self) -> None:
+        # the stream limit bounds every readline(), i.e. the request line and each header line
+        self._server = await asyncio.start_server(
+            self._handle_connection, self.host, self.port, limit=self.max_line_bytes
+        )
+        # pick up the real port when started with port 0
+        self.port = self._server.sockets[0].getsockname()[1]
+        logger.info(f"HTTP server listening on {self.host}:{self.port}")
+    
+    async def stop(self) -> None:
+        if self._server:
+            self._server.close()
+            await self._server.wait_closed()
+            self._server = None
+    
+    async def _handle_connection(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter) -> None:
+        try:
+            while True:
+                try:
+                    request = await asyncio.wait_for(self._read_request(reader), self.read_timeout)
+                except _BadRequest as e:
+                    await self._write_response(writer, HttpResponse(e.status, {"error": e.message}), keep_alive=False)
+                    return
+                if request is None:
+                    return
+                
+                response = await self._dispatch(request)
+                keep_alive = request.headers.get("connection", "").lower() != "close"
+                await self._write_response(writer, response, keep_alive)
+                if not keep_alive:
+                    return
+        except (asyncio.TimeoutError, ConnectionError, asyncio.IncompleteReadError):
+            pass
+        finally:
+            writer.close()
+            try:
+                await writer.wait_closed()
+            except Exception:
+                pass
+    
+    async def _dispatch(self, request: HttpRequest) -> HttpResponse:
+        handler = self._routes.get((request.method, request.path))
+        if handler is None:
+            if any(path == request.path for _, path in self._routes):
+                return HttpResponse(405, {"error": "method not allowed"})
+            return HttpResponse(404, {"error": "not found"})
+        try:
+            return await handler(request)
+        except Exception as e:
+            logger.error(f"Error handling {request.method} {request.path}: {e}", exc_info=True)
+            return HttpResponse(500, {"error": "internal error"})
+    
+    @staticmethod
+    async def _readline(reader: asyncio.StreamReader, status: int) -> bytes:
+        """Read one line, a line over the stream limit is answered with status"""
+        try:
+            return await reader.readline()
+        except (asyncio.LimitOverrunError, ValueError):
+            raise _BadRequest(status, REASONS[status].lower())
+    
+    async def _read_request(self, reader: asyncio.StreamReader) -> HttpRequest | None:
+        request_line = await self._readline(reader, 414)
+        if not request_line:
+            return None
+        try:
+            method, target, _ = request_line.decode("latin-1").split(" ", 2)
+        except ValueError:
+            raise _BadRequest(400, "malformed request line")
+        
+        headers = {}
+        while True:
+            line = await self._readline(reader, 431)
+            if line in (b"\r\n", b"\n", b""):
+                break
+            if len(headers) >= self.max_headers:
+                raise _BadRequest(431, "too many header fields")
+            name, _, value = line.decode("latin-1").partition(":")
+            headers[name.strip().lower()] = value.strip()
+        
+        try:
+            length = int(headers.get("content-length", "0"))
+        except ValueError:
+            raise _BadRequest(400, "invalid content-length")
+        if length < 0:
+            raise _BadRequest(400, "invalid content-length")
+        if length > self.max_body_bytes:
+            raise _BadRequest(413, "payload too large")
+        body = await reader.readexactly(length) if length else b""
+        
+        path = target.split("?", 1)[0]
+        return HttpRequest(method=method.upper(), path=path, headers=headers, body=body)
+    
+    async def _write_response(self, writer: asyncio.StreamWriter, response: HttpResponse, keep_alive: bool) -> None:
+        body = b"" if response.body is None else json.dumps(response.body).encode()
+        head = (
+            f"HTTP/1.1 {response.status} {REASONS.get(response.status, 'Unknown')}\r\n"
+            f"Content-Type: application/json\r\n"
+            f"Content-Length: {len(body)}\r\n"
+            f"Connection: {'keep-alive' if keep_alive else 'close'}\r\n\r\n"
+        )
+        writer.write(head.encode("latin-1") + body)
+        await writer.drain()
+
+
+class _BadRequest(Exception):
+    def __init__(self, status: int, message: str):
+        super().__init__(message)
+        self.status = status
+        self.message = message
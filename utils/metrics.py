@@ -0,0 +1,39 @@
+"""Lightweight in-process metrics"""
+
+from collections import deque
+
+
+class LatencyRecorder:
+    """Keeps the most recent samples (seconds) for percentiles plus running totals"""
+    
+    def __init__(self, window: int = 1000):
+        self._samples: deque[float] = deque(maxlen=window)
+        self.count = 0
+        self.total = 0.0
+        self.max = 0.0
+    
+    def __len__(self) -> int:
+        return len(self._samples)
+    
+    def record(self, value: float) -> None:
+        self._samples.append(value)
+        self.count += 1
+        self.total += value
+        self.max = max(self.max, value)
+    
+    def percentile(self, q: float) -> float | None:
+        """q-th percentile (0-100) of the recent window, None without samples"""
+        if not self._samples:
+            return None
+        ordered = sorted(self._samples)
+        index = min(int(len(ordered) * q / 100), len(ordered) - 1)
+        return ordered[index]
+    
+    def stats(self) -> dict[str, float]:
+        return {
+            "count": self.count,
+            "mean": self.total / self.count if self.count else 0.0,
+            "p50": self.percentile(50) or 0.0,
+            "p95": self.percentile(95) or 0.0,
+            "max": self.max,
+        }
@@ -0,0 +1,115 @@
+"""Priority dispatch of backend requests between interactive and background traffic"""
+
+import asyncio
+import contextlib
+import functools
+import time
+from collections import deque
+from contextvars import ContextVar
+
+from .metrics import LatencyRecorder
+
+INTERACTIVE = "interactive"
+BACKGROUND = "background"
+
+_traffic_class: ContextVar[str] = ContextVar("traffic_class", default=INTERACTIVE)
+
+
+def current_class() -> str:
+    """Traffic class of the running task, interactive unless marked otherwise"""
+    return _traffic_class.get()
+
+
+def background(fn):
+    """Mark every backend request made by an async job as background traffic"""
+    @functools.wraps(fn)
+    async def wrapper(*args, **kwargs):
+        token = _traffic_class.set(BACKGROUND)
+        try:
+            return await fn(*args, **kwargs)
+        finally:
+            _traffic_class.reset(token)
+    return wrapper
+
+
+class PriorityDispatcher:
+    """
+    Hands out request slots, interactive waiters first
+    
+    Neither class can starve the other: background traffic never holds more
+    than background_max slots, so interactive requests always have the rest,
+    and interactive traffic never holds more than capacity - background_min,
+    so background work always keeps a share of its own.
+    """
+    
+    def __init__(self, capacity: int, background_max: int, background_min: int):
+        capacity = max(1, capacity)
+        background_max = max(1, min(background_max, capacity))
+        background_min = max(0, min(background_min, background_max, capacity - 1))
+        self.capacity = capacity
+        self._limits = {INTERACTIVE: capacity - background_min, BACKGROUND: background_max}
+        self._in_flight = {INTERACTIVE: 0, BACKGROUND: 0}
+        self._waiters: dict[str, deque[asyncio.Future]] = {INTERACTIVE: deque(), BACKGROUND: deque()}
+        self._queue_wait = {INTERACTIVE: LatencyRecorder(), BACKGROUND: LatencyRecorder()}
+    
+    def _has_room(self, traffic_class: str) -> bool:
+        return (
+            sum(self._in_flight.values()) < self.capacity
+            and self._in_flight[traffic_class] < self._limits[traffic_class]
+        )
+    
+    def _wake(self) -> None:
+        """Grant free slots to waiters, interactive ones first"""
+        for traffic_class in (INTERACTIVE, BACKGROUND):
+            waiters = self._waiters[traffic_class]
+            while waiters and self._has_room(traffic_class):
+                waiter = waiters.popleft()
+                if not waiter.done():
+                    self._in_flight[traffic_class] += 1
+                    waiter.set_result(None)
+    
+    async def acquire(self, traffic_class: str) -> None:
+        """Wait for a slot for traffic_class"""
+        started = time.monotonic()
+        if not self._waiters[traffic_class] and self._has_room(traffic_class):
+            self._in_flight[traffic_class] += 1
+        else:
+            waiter = asyncio.get_running_loop().create_future()
+            self._waiters[traffic_class].append(waiter)
+            try:
+                await waiter
+            except asyncio.CancelledError:
+                if waiter.done() and not waiter.cancelled():
+                    # slot was granted as we were cancelled, pass it on
+                    self.release(traffic_class)
+                else:
+                    with contextlib.suppress(ValueError):
+                        self._waiters[traffic_class].remove(waiter)
+                raise
+        self._queue_wait[traffic_class].record(time.monotonic() - started)
+    
+    def release(self, traffic_class: str) -> None:
+        self._in_flight[traffic_class] -= 1
+        self._wake()
+    
+    @contextlib.asynccontextmanager
+    async def slot(self, traffic_class: str | None = None):
+        """Hold a slot for the current task's traffic class while the block runs"""
+        traffic_class = traffic_class or current_class()
+        await self.acquire(traffic_class)
+        try:
+            yield
+        finally:
+            self.release(traffic_class)
+    
+    def stats(self) -> dict[str, dict[str, float]]:
+        """In-flight and queued requests plus queue wait (seconds) per class"""
+        return {
+            traffic_class: {
+                "in_flight": self._in_flight[traffic_class],
+                "waiting": len(self._waiters[traffic_class]),
+                "limit": self._limits[traffic_class],
+                **self._queue_wait[traffic_class].stats(),
+            }
+            for traffic_class in (INTERACTIVE, BACKGROUND)
+        }
@@ -0,0 +1,79 @@
+"""Retries and circuit breaking for backend calls"""
+
+import logging
+import random
+import time
+
+logger = logging.getLogger(__name__)
+
+
+class CircuitOpenError(Exception):
+    """Raised instead of calling a backend endpoint group whose breaker is open"""
+    
+    def __init__(self, name: str, retry_after: float):
+        super().__init__(f"Circuit '{name}' is open, retry in {retry_after:.1f}s")
+        self.name = name
+        self.retry_after = retry_after
+
+
+class CircuitBreaker:
+    """
+    Opens after failure_threshold consecutive failures and fails fast while open.
+    After recovery_timeout one probe call is let through (half-open): success
+    closes the breaker, failure opens it again.
+    """
+    
+    CLOSED = "closed"
+    OPEN = "open"
+    HALF_OPEN = "half_open"
+    
+    def __init__(self, name: str, failure_threshold: int, recovery_timeout: float):
+        self.name = name
+        self.failure_threshold = failure_threshold
+        self.recovery_timeout = recovery_timeout
+        self._state = self.CLOSED
+        self._failures = 0
+        self._opened_at = 0.0
+        self._probing = False
+    
+    @property
+    def state(self) -> str:
+        if self._state == self.OPEN and time.monotonic() - self._opened_at >= self.recovery_timeout:
+            return self.HALF_OPEN
+        return self._state
+    
+    def before_call(self) -> None:
+        """Raise CircuitOpenError unless the call may go ahead"""
+        state = self.state
+        if state == self.CLOSED:
+            return
+        if state == self.HALF_OPEN and not self._probing:
+            self._probing = True
+            return
+        retry_after = max(self._opened_at + self.recovery_timeout - time.monotonic(), 0.0)
+        raise CircuitOpenError(self.name, retry_after)
+    
+    def record_success(self) -> None:
+        if self._state != self.CLOSED:
+            logger.info(f"Circuit '{self.name}' closed, backend recovered")
+        self._state = self.CLOSED
+        self._failures = 0
+        self._probing = False
+    
+    def record_failure(self) -> None:
+        self._failures += 1
+        if self._probing or self._failures >= self.failure_threshold:
+            if self._state != self.OPEN or self._probing:
+                logger.warning(f"Circuit '{self.name}' opened after {self._failures} failures")
+            self._state = self.OPEN
+            self._opened_at = time.monotonic()
+        self._probing = False
+    
+    def release(self) -> None:
+        """Give back the probe slot of a call that ended without a result (e.g. cancelled)"""
+        self._probing = False
+
+
+def backoff_delay(attempt: int, base: float, cap: float) -> float:
+    """Full-jitter exponential backoff for retry number attempt (0-based)"""
+    return random.uniform(0, min(cap, base * 2 ** attempt))
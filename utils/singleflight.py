@@ -0,0 +1,94 @@
+"""Coalescing of identical concurrent calls"""
+
+import asyncio
+import functools
+import inspect
+from typing import Any, Awaitable, Callable, Hashable
+
+from .cache import bind_call
+from . import deadline
+from .deadline import DeadlineExceeded
+from .priority import current_class
+
+
+class SingleFlight:
+    """Concurrent calls with the same key share one in-flight task"""
+    
+    def __init__(self):
+        # key -> (task, number of callers waiting on it)
+        self._inflight: dict[Hashable, list] = {}
+        self.calls = 0
+        self.coalesced = 0
+    
+    def __len__(self) -> int:
+        return len(self._inflight)
+    
+    async def do(self, key: Hashable, fn: Callable[[], Awaitable[Any]]) -> Any:
+        """
+        Run fn, or join the call already running for key
+        
+        A caller that is cancelled, or whose deadline passes, stops waiting
+        without cancelling the shared call; the call is cancelled only once
+        every caller has given up. The call itself runs without the first
+        caller's deadline, each caller waits only as long as its own allows.
+        """
+        self.calls += 1
+        entry = self._inflight.get(key)
+        if entry is None:
+            task = deadline.detached_context().run(lambda: asyncio.ensure_future(fn()))
+            entry = [task, 0]
+            self._inflight[key] = entry
+            task.add_done_callback(functools.partial(self._forget, key))
+        else:
+            self.coalesced += 1
+        
+        task = entry[0]
+        entry[1] += 1
+        try:
+            budget = deadline.remaining()
+            if budget is None:
+                return await asyncio.shield(task)
+            try:
+                return await asyncio.wait_for(asyncio.shield(task), max(budget, 0.0))
+            except asyncio.TimeoutError:
+                if task.done():
+                    raise
+                raise DeadlineExceeded("Update deadline passed while waiting for a shared call")
+        except (asyncio.CancelledError, DeadlineExceeded) as e:
+            if not task.done() and entry[1] == 1:
+                task.cancel(deadline.EXPIRED if isinstance(e, DeadlineExceeded) else None)
+            raise
+        finally:
+            entry[1] -= 1
+    
+    def stats(self) -> dict[str, int]:
+        return {"calls": self.calls, "coalesced": self.coalesced, "in_flight": len(self._inflight)}
+    
+    def _forget(self, key: Hashable, task: asyncio.Future) -> None:
+        entry = self._inflight.get(key)
+        if entry is not None and entry[0] is task:
+            del self._inflight[key]
+        # mark exception as retrieved when every caller has gone
+        if not task.cancelled():
+            task.exception()
+
+
+def coalesced(method):
+    """
+    Share one in-flight request between identical concurrent calls of an idempotent client method
+    
+    Interactive and background callers never share a call, which would run
+    at the priority of whoever came first. A forced-fresh read (max_age=0)
+    is never shared: a call already in flight may have started before the
+    change the caller wants to see.
+    """
+    signature = inspect.signature(method)
+    
+    @functools.wraps(method)
+    async def wrapper(self, *args, **kwargs):
+        key_args, max_age = bind_call(signature, self, args, kwargs)
+        if max_age == 0:
+            return await method(self, *args, **kwargs)
+        key = (method.__name__, current_class(), key_args)
+        return await self._singleflight.do(key, lambda: method(self, *args, **kwargs))
+    return wrapper